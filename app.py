@@ -1,19 +1,29 @@
 from flask import Flask, send_from_directory, render_template, request, jsonify, Response, stream_with_context
 import os
 import json
+import time
 import logging
 from dotenv import load_dotenv
 
 # Import Services
 from services.llm_service import call_llm
-from services.prompt_builder import build_prompt
 from services.places_service import get_places_by_name, get_coordinates
 from services.mappls_service import get_map_data, get_access_token, get_distance_info
-from services.local_db_service import load_local_db, upsert_destination, build_destination_from_api, find_destination, save_local_db
+from services.local_db_service import persist_upsert
+from services.catalog import get_catalog
 from services.image_service import get_place_images
 from services.rag import query_rag
+from services.context_gatherer import gather_context
+from services.itinerary_cache import get_itinerary_cache, make_trip_key
+from services.single_flight import SingleFlight
+from services.warmup import start_warmup, is_ready, warmup_status
+from services.metrics import stage_timer, observe_stage, begin_request_timing, render_prometheus, plan_trip_series
+from services.trip_pipeline import trip_params, run_recommender, rag_query, rag_context_or_none, context_stages, \
+    new_destination, rank_places, build_trip_prompt, cache_itinerary
 
-from ml_engine.recommender import get_recommendations
+# ml_engine (pandas / scikit-learn) is imported inside the handlers that use
+# it: the server starts answering without it and warmup preloads it in the
+# background (python -m loadtest.importtime shows what startup still loads)
 
 load_dotenv()
 
@@ -23,6 +33,14 @@ logger = logging.getLogger(__name__)
 
 app = Flask(__name__, static_folder='static', template_folder='templates')
 PORT = 5000
+LLM_STREAMING = os.getenv("LLM_STREAMING", "true").lower() != "false"
+# Largest request list accepted by /api/recommend/batch
+RECOMMEND_BATCH_MAX = int(os.getenv("RECOMMEND_BATCH_MAX", "10000"))
+# Results per request are clamped to 1..RECOMMEND_TOP_N_MAX
+RECOMMEND_TOP_N_MAX = 100
+
+# Coalesces identical in-flight plan-trip requests
+trip_flights = SingleFlight("plan-trip")
 
 # Validation Checks
 required_env_vars = ["GEOAPIFY_API_KEY", "GROQ_API_KEY"]
@@ -33,6 +51,9 @@ if missing_vars:
 else:
     logger.info("✅ All required API keys configured")
 
+# Preload catalog, RAG index and models before /ready reports healthy
+start_warmup()
+
 @app.route('/')
 def home():
     return render_template('index.html')
@@ -49,6 +70,63 @@ def itinerary_display_pro():
 def itinerary_display():
     return render_template('itinerary-display.html')
 
+def fetch_rag_context(destination):
+    # RAG Context Retrieval (Safe - won't break if fails)
+    try:
+        return rag_context_or_none(query_rag(rag_query(destination)))
+    except Exception as rag_err:
+        logger.warning(f"⚠️ RAG Query failed (continuing without): {rag_err}")
+    return None
+
+def run_trip_pipeline(data, local_dest, cache_key):
+    """Gather context, build the prompt and stream the LLM itinerary."""
+    trip = trip_params(data)
+    destination = trip['destination']
+
+    try:
+        # 2. Context Gathering (independent stages run concurrently)
+        stages, travel_options = context_stages(trip, local_dest, fetch_rag_context, get_distance_info, get_coordinates)
+        context = gather_context(stages)
+        coords = context.get("geocode")
+        ml_recs = context["recommend"]
+
+        new_dest = None
+        if not local_dest and coords:
+            # Fetch fresh
+            new_dest = new_destination(destination, coords, get_places_by_name(destination, coords))
+            # Persists just this destination (change-log line or SQLite rows)
+            persist_upsert(new_dest)
+            # The concurrent recommender ran before this destination existed
+            ml_recs = run_recommender(destination, trip['preferences'], trip['days'], trip['budget'], trip['people'])
+
+        # 3. Prompt Construction
+        prompt = build_trip_prompt(trip, rank_places(local_dest, new_dest, ml_recs),
+                                   context.get("distance"), travel_options, context["rag"])
+
+        logger.info("Calling LLM...")
+
+        # 4. LLM Call
+        llm_started = time.perf_counter()
+        if LLM_STREAMING:
+            # Forward tokens as they arrive to cut time-to-first-byte
+            chunks = []
+            for chunk in call_llm(prompt, stream=True):
+                if not chunks:
+                    observe_stage("llm_first_token", time.perf_counter() - llm_started)
+                chunks.append(chunk)
+                yield chunk
+            itinerary = "".join(chunks)
+        else:
+            itinerary = call_llm(prompt)
+            yield itinerary
+        observe_stage("llm", time.perf_counter() - llm_started)
+
+        cache_itinerary(cache_key, itinerary, prompt)
+
+    except Exception as e:
+        logger.error(f"Error generating itinerary: {e}")
+        yield json.dumps({"error": str(e)})
+
 @app.route('/api/plan-trip', methods=['POST'])
 def plan_trip():
     data = request.json
@@ -57,8 +135,6 @@ def plan_trip():
     people = data.get('people')
     days = data.get('days')
     source = data.get('source')
-    transport = data.get('transport')
-    preferences = data.get('preferences', [])
     
     if not all([destination, budget, people, days, source]):
         return jsonify({"message": "All fields are required"}), 400
@@ -69,97 +145,30 @@ def plan_trip():
     def generate():
         try:
             # 1. Load DB
-            all_places = load_local_db()
-            
-            # 2. Context Gathering
-            coords = get_coordinates(destination)
-            
-            local_dest = find_destination(all_places, destination)
-            ranked_places = []
-            
-            if local_dest: 
-                # Use local attractions if available
-                 if local_dest.get("attractions"):
-                    ranked_places = local_dest["attractions"]
-            elif coords:
-                 # Fetch fresh
-                 logger.info(f"🆕 {destination} not in DB. Fetching from API...")
-                 api_places = get_places_by_name(destination)
-                 new_dest = build_destination_from_api({
-                    "destinationName": destination,
-                    "coords": coords,
-                    "places": api_places
-                 }, all_places)
-                 
-                 result = upsert_destination(all_places, new_dest)
-                 all_places = result["db"]
-                 if result["created"] or result["updated"]:
-                     save_local_db(all_places)
-                 
-                 ranked_places = new_dest.get("attractions", [])
-
-            # 3. Distance Info
-            distance_info = get_distance_info(source, destination)
-
-            # 4. ML Recommendation
-            logger.info("🧠 Running ML Recommender...")
-            try:
-                ml_recs = get_recommendations(destination, preferences, days, budget)
-                if ml_recs:
-                    logger.info(f"✅ ML Recommender returned {len(ml_recs)} places")
-                    ranked_places = ml_recs
-                else:
-                    logger.info("⚠️ ML Recommender returned no results, using default ranking")
-            except Exception as ml_err:
-                logger.error(f"❌ ML Recommender Error: {ml_err}")
-                # Fallback to default ranking if ML fails
-
-            # 5. RAG Context Retrieval (Safe - won't break if fails)
-            rag_context = None
-            try:
-                logger.info("📚 Querying RAG for travel context...")
-                rag_query = f"{destination} travel tips safety best time to visit"
-                rag_context = query_rag(rag_query)
-                if rag_context and rag_context != "No relevant information found in knowledge base.":
-                    logger.info("✅ RAG context retrieved successfully")
-                else:
-                    rag_context = None
-                    logger.info("ℹ️ No relevant RAG context found")
-            except Exception as rag_err:
-                logger.warning(f"⚠️ RAG Query failed (continuing without): {rag_err}")
-                rag_context = None
-
-            # 6. Prompt Construction
-            # Format preferences
-            user_prefs_str = ", ".join(preferences) if preferences else "General sightseeing"
-            
-            prompt_context = {
-                "places": ranked_places,
-                "distanceInfo": distance_info,
-                "ragContext": rag_context
-            }
-            
-            prompt = build_prompt({
-                "destination": destination,
-                "source": source,
-                "budget": budget,
-                "people": people,
-                "days": days,
-                "transportMode": transport,
-                "preferences": user_prefs_str
-            }, prompt_context)
-            
-            logger.info("Calling LLM...")
-            
-            # 5. LLM Call
-            itinerary = call_llm(prompt)
-            yield itinerary
+            with stage_timer("db_load"):
+                local_dest = get_catalog().find(destination)
+
+            # Serve repeated trips straight from the itinerary cache
+            itinerary_cache = get_itinerary_cache()
+            cache_key = make_trip_key(data, local_dest)
+            cached = itinerary_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"⚡ Itinerary cache hit for {destination}")
+                yield cached
+                return
+
+            # Identical concurrent requests share one pipeline run
+            producer = lambda: run_trip_pipeline(data, local_dest, cache_key)
+            for chunk in trip_flights.stream(cache_key, producer):
+                yield chunk
 
         except Exception as e:
             logger.error(f"Error generating itinerary: {e}")
             yield json.dumps({"error": str(e)})
 
-    return Response(stream_with_context(generate()), content_type='text/plain; charset=utf-8')
+    # Disable proxy buffering so streamed chunks reach the browser immediately
+    return Response(stream_with_context(generate()), content_type='text/plain; charset=utf-8',
+                    headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"})
 
 @app.route('/api/map-data', methods=['POST'])
 def map_data_route():
@@ -170,12 +179,15 @@ def map_data_route():
     if not source or not destination:
         return jsonify({"message": "Source and destination required"}), 400
         
+    timings = begin_request_timing()
     try:
         map_info = get_map_data(source, destination)
         token = get_access_token()
         
         map_info["accessToken"] = token
-        return jsonify(map_info)
+        response = jsonify(map_info)
+        response.headers["Server-Timing"] = timings.header()
+        return response
     except Exception as e:
         logger.error(f"Error getting map data: {e}")
         return jsonify({"message": "Error fetching map data"}), 500
@@ -191,12 +203,68 @@ def place_images_route():
             return jsonify({"images": {}})
         
         # Fetch images using the image service
-        image_map = get_place_images(places, destination)
-        return jsonify({"images": image_map})
+        timings = begin_request_timing()
+        with stage_timer("place_images"):
+            image_map = get_place_images(places, destination)
+        response = jsonify({"images": image_map})
+        response.headers["Server-Timing"] = timings.header()
+        return response
     except Exception as e:
         logger.error(f"Error fetching place images: {e}")
         return jsonify({"images": {}})
 
+@app.route('/api/recommend/batch', methods=['POST'])
+def recommend_batch_route():
+    """
+    Body: {"requests": [{destination, preferences, days, budget, people}], "top_n": 15}
+    Streams one JSON line per request (with its "index"), grouped by destination.
+    """
+    data = request.json or {}
+    requests_list = data.get('requests')
+    if not isinstance(requests_list, list) or not all(isinstance(r, dict) and isinstance(r.get('destination'), str) for r in requests_list):
+        return jsonify({"message": "requests must be a list of objects with a destination"}), 400
+    if len(requests_list) > RECOMMEND_BATCH_MAX:
+        return jsonify({"message": f"At most {RECOMMEND_BATCH_MAX} requests per batch"}), 400
+    try:
+        top_n = int(data.get('top_n', 15))
+    except (TypeError, ValueError):
+        return jsonify({"message": "top_n must be an integer"}), 400
+    top_n = max(1, min(top_n, RECOMMEND_TOP_N_MAX))
+    from ml_engine.recommender import get_recommendations_batch
+
+    def generate():
+        try:
+            for result in get_recommendations_batch(requests_list, top_n):
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            logger.error(f"Error in batch recommendations: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), content_type='application/x-ndjson',
+                    headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"})
+
+@app.route('/api/similar/<spot_id>')
+def similar_attractions_route(spot_id):
+    """"More like this": precomputed nearest attractions (?k=, up to SIMILAR_TOP_K)."""
+    from ml_engine.similar import get_similar_attractions, SIMILAR_TOP_K
+    try:
+        k = int(request.args.get('k', SIMILAR_TOP_K))
+    except ValueError:
+        return jsonify({"message": "k must be an integer"}), 400
+    similar = get_similar_attractions(spot_id, k)
+    if similar is None:
+        return jsonify({"message": "Unknown attraction or similarity index not built"}), 404
+    return jsonify({"spot_id": spot_id, "similar": similar})
+
+@app.route('/ready')
+def ready():
+    return jsonify(warmup_status()), 200 if is_ready() else 503
+
+@app.route('/metrics')
+def metrics():
+    extra = plan_trip_series(get_itinerary_cache().stats(), trip_flights.stats())
+    return Response(render_prometheus(extra), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 if __name__ == '__main__':
     logger.info(f"🚀 Server running on http://localhost:{PORT}")
     app.run(port=PORT, debug=True)
@@ -0,0 +1,276 @@
+"""
+Async App - asyncio-native entry point for the trip planning API
+Serves the same routes and request/response contracts as app.py, but every
+external provider call runs on one event loop through httpx/AsyncGroq, so
+a single process can hold hundreds of plans waiting on the LLM.
+
+Run with: hypercorn async_app:app --bind 0.0.0.0:5000
+"""
+from quart import Quart, render_template, request, jsonify, Response
+import os
+import json
+import time
+import asyncio
+import logging
+from dotenv import load_dotenv
+
+# Import Services
+from services.llm_service import call_llm_async
+from services.places_service import get_places_by_name_async, get_coordinates_async
+from services.mappls_service import get_map_data_async, get_access_token_async, get_distance_info_async
+from services.local_db_service import persist_upsert
+from services.catalog import get_catalog
+from services.image_service import get_place_images_async
+from services.rag import query_rag_async
+from services.async_http import close_async_client
+from services.context_gatherer import gather_context_async
+from services.itinerary_cache import get_itinerary_cache, make_trip_key
+from services.single_flight import AsyncSingleFlight
+from services.warmup import start_warmup, is_ready, warmup_status
+from services.metrics import stage_timer, observe_stage, begin_request_timing, render_prometheus, plan_trip_series
+from services.trip_pipeline import trip_params, run_recommender, rag_query, rag_context_or_none, context_stages, \
+    new_destination, rank_places, build_trip_prompt, cache_itinerary
+
+# ml_engine (pandas / scikit-learn) is imported inside the handlers that use
+# it: the server starts answering without it and warmup preloads it in the
+# background (python -m loadtest.importtime shows what startup still loads)
+
+load_dotenv()
+
+# Configure Logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+app = Quart(__name__, static_folder='static', template_folder='templates')
+PORT = 5000
+LLM_STREAMING = os.getenv("LLM_STREAMING", "true").lower() != "false"
+# Largest request list accepted by /api/recommend/batch
+RECOMMEND_BATCH_MAX = int(os.getenv("RECOMMEND_BATCH_MAX", "10000"))
+# Results per request are clamped to 1..RECOMMEND_TOP_N_MAX
+RECOMMEND_TOP_N_MAX = 100
+
+# Coalesces identical in-flight plan-trip requests
+trip_flights = AsyncSingleFlight("plan-trip")
+
+@app.before_serving
+async def startup():
+    # Preload catalog, RAG index and models on a background thread
+    start_warmup()
+
+@app.after_serving
+async def shutdown():
+    await close_async_client()
+
+@app.route('/')
+async def home():
+    return await render_template('index.html')
+
+@app.route('/agent')
+async def agent():
+    return await render_template('agent.html')
+
+@app.route('/itinerary-display-pro.html')
+async def itinerary_display_pro():
+    return await render_template('itinerary-display-pro.html')
+
+@app.route('/itinerary-display.html')
+async def itinerary_display():
+    return await render_template('itinerary-display.html')
+
+async def fetch_rag_context(destination):
+    try:
+        return rag_context_or_none(await query_rag_async(rag_query(destination)))
+    except Exception as rag_err:
+        logger.warning(f"⚠️ RAG Query failed (continuing without): {rag_err}")
+    return None
+
+async def run_trip_pipeline(data, local_dest, cache_key):
+    """Gather context, build the prompt and stream the LLM itinerary."""
+    trip = trip_params(data)
+    destination = trip['destination']
+
+    try:
+        # 2. Context Gathering (network stages are coroutines, ML runs on a thread)
+        # Travel-option lookup may decode/index the destination; keep it off the loop
+        stages, travel_options = await asyncio.to_thread(context_stages, trip, local_dest, fetch_rag_context,
+                                                         get_distance_info_async, get_coordinates_async)
+        context = await gather_context_async(stages)
+        coords = context.get("geocode")
+        ml_recs = context["recommend"]
+
+        new_dest = None
+        if not local_dest and coords:
+            api_places = await get_places_by_name_async(destination, coords)
+            new_dest = new_destination(destination, coords, api_places)
+            # Persists just this destination (change-log line or SQLite rows)
+            await asyncio.to_thread(persist_upsert, new_dest)
+            ml_recs = await asyncio.to_thread(run_recommender, destination, trip['preferences'], trip['days'],
+                                              trip['budget'], trip['people'])
+
+        # 3. Prompt Construction
+        prompt = build_trip_prompt(trip, rank_places(local_dest, new_dest, ml_recs),
+                                   context.get("distance"), travel_options, context["rag"])
+
+        logger.info("Calling LLM...")
+
+        # 4. LLM Call
+        llm_started = time.perf_counter()
+        if LLM_STREAMING:
+            chunks = []
+            async for chunk in await call_llm_async(prompt, stream=True):
+                if not chunks:
+                    observe_stage("llm_first_token", time.perf_counter() - llm_started)
+                chunks.append(chunk)
+                yield chunk
+            itinerary = "".join(chunks)
+        else:
+            itinerary = await call_llm_async(prompt)
+            yield itinerary
+        observe_stage("llm", time.perf_counter() - llm_started)
+
+        cache_itinerary(cache_key, itinerary, prompt)
+
+    except Exception as e:
+        logger.error(f"Error generating itinerary: {e}")
+        yield json.dumps({"error": str(e)})
+
+@app.route('/api/plan-trip', methods=['POST'])
+async def plan_trip():
+    data = await request.get_json()
+    destination = data.get('destination')
+    budget = data.get('budget')
+    people = data.get('people')
+    days = data.get('days')
+    source = data.get('source')
+
+    if not all([destination, budget, people, days, source]):
+        return jsonify({"message": "All fields are required"}), 400
+
+    logger.info(f"🚀 Plan-Trip Request: {destination} ({days} days)")
+
+    async def generate():
+        try:
+            # 1. Load DB
+            with stage_timer("db_load"):
+                local_dest = await asyncio.to_thread(get_catalog().find, destination)
+
+            itinerary_cache = get_itinerary_cache()
+            cache_key = make_trip_key(data, local_dest)
+            cached = itinerary_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"⚡ Itinerary cache hit for {destination}")
+                yield cached
+                return
+
+            producer = lambda: run_trip_pipeline(data, local_dest, cache_key)
+            async for chunk in trip_flights.stream(cache_key, producer):
+                yield chunk
+
+        except Exception as e:
+            logger.error(f"Error generating itinerary: {e}")
+            yield json.dumps({"error": str(e)})
+
+    return Response(generate(), content_type='text/plain; charset=utf-8',
+                    headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"})
+
+@app.route('/api/map-data', methods=['POST'])
+async def map_data_route():
+    data = await request.get_json()
+    source = data.get('source')
+    destination = data.get('destination')
+
+    if not source or not destination:
+        return jsonify({"message": "Source and destination required"}), 400
+
+    timings = begin_request_timing()
+    try:
+        map_info, token = await asyncio.gather(
+            get_map_data_async(source, destination),
+            get_access_token_async()
+        )
+
+        map_info["accessToken"] = token
+        response = jsonify(map_info)
+        response.headers["Server-Timing"] = timings.header()
+        return response
+    except Exception as e:
+        logger.error(f"Error getting map data: {e}")
+        return jsonify({"message": "Error fetching map data"}), 500
+
+@app.route('/api/place-images', methods=['POST'])
+async def place_images_route():
+    try:
+        data = await request.get_json()
+        places = data.get('places', [])
+        destination = data.get('destination', '')
+
+        if not places:
+            return jsonify({"images": {}})
+
+        timings = begin_request_timing()
+        with stage_timer("place_images"):
+            image_map = await get_place_images_async(places, destination)
+        response = jsonify({"images": image_map})
+        response.headers["Server-Timing"] = timings.header()
+        return response
+    except Exception as e:
+        logger.error(f"Error fetching place images: {e}")
+        return jsonify({"images": {}})
+
+@app.route('/api/recommend/batch', methods=['POST'])
+async def recommend_batch_route():
+    """
+    Body: {"requests": [{destination, preferences, days, budget, people}], "top_n": 15}
+    Streams one JSON line per request (with its "index"), grouped by destination.
+    """
+    data = await request.get_json() or {}
+    requests_list = data.get('requests')
+    if not isinstance(requests_list, list) or not all(isinstance(r, dict) and isinstance(r.get('destination'), str) for r in requests_list):
+        return jsonify({"message": "requests must be a list of objects with a destination"}), 400
+    if len(requests_list) > RECOMMEND_BATCH_MAX:
+        return jsonify({"message": f"At most {RECOMMEND_BATCH_MAX} requests per batch"}), 400
+    try:
+        top_n = int(data.get('top_n', 15))
+    except (TypeError, ValueError):
+        return jsonify({"message": "top_n must be an integer"}), 400
+    top_n = max(1, min(top_n, RECOMMEND_TOP_N_MAX))
+    from ml_engine.recommender import get_recommendations_batch
+
+    async def generate():
+        # Scoring is CPU work: advance the generator on a worker thread
+        results = get_recommendations_batch(requests_list, top_n)
+        try:
+            while (result := await asyncio.to_thread(next, results, None)) is not None:
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            logger.error(f"Error in batch recommendations: {e}")
+            yield json.dumps({"error": str(e)}) + "\n"
+
+    return Response(generate(), content_type='application/x-ndjson',
+                    headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"})
+
+@app.route('/api/similar/<spot_id>')
+async def similar_attractions_route(spot_id):
+    """"More like this": precomputed nearest attractions (?k=, up to SIMILAR_TOP_K)."""
+    from ml_engine.similar import get_similar_attractions, SIMILAR_TOP_K
+    try:
+        k = int(request.args.get('k', SIMILAR_TOP_K))
+    except ValueError:
+        return jsonify({"message": "k must be an integer"}), 400
+    similar = get_similar_attractions(spot_id, k)
+    if similar is None:
+        return jsonify({"message": "Unknown attraction or similarity index not built"}), 404
+    return jsonify({"spot_id": spot_id, "similar": similar})
+
+@app.route('/ready')
+async def ready():
+    return jsonify(warmup_status()), 200 if is_ready() else 503
+
+@app.route('/metrics')
+async def metrics():
+    extra = plan_trip_series(get_itinerary_cache().stats(), trip_flights.stats())
+    return Response(render_prometheus(extra), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+if __name__ == '__main__':
+    logger.info(f"🚀 Async server running on http://localhost:{PORT}")
+    app.run(port=PORT)
@@ -0,0 +1,245 @@
+"""
+Load Test Driver - Open-loop request generator for the trip planning API
+Fires plan-trip, map-data and place-images requests at a fixed arrival rate
+(independent of response times, so queueing shows up as latency) and reports
+throughput, latency percentiles and a per-stage breakdown taken from the
+server's /metrics histograms and Server-Timing headers.
+
+Usage:
+    python -m loadtest.driver --url http://localhost:5000 --rps 5 --duration 60
+"""
+import re
+import json
+import time
+import random
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Catalog destinations and source cities with travel options to them, so
+# requests exercise the catalog hit, travel-index, recommender and cache paths
+DESTINATIONS = ["Mahabaleshwar", "Lonavala", "Khandala", "Matheran", "Alibaug", "Panchgani",
+                "Nashik", "Shirdi", "Kolhapur", "Aurangabad", "Ratnagiri", "Igatpuri"]
+SOURCES = ["Mumbai", "Pune", "Nagpur", "Nashik", "Thane"]
+# Not in the catalog: geocoded, fetched and auto-added (see --unknown-share)
+UNKNOWN_DESTINATIONS = ["Goa", "Manali", "Jaipur", "Munnar", "Rishikesh", "Udaipur", "Ooty", "Darjeeling"]
+PREFERENCES = ["sightseeing", "adventure", "food", "nature", "culture", "relaxation"]
+
+DEFAULT_MIX = {"plan-trip": 0.5, "map-data": 0.3, "place-images": 0.2}
+
+_SERVER_TIMING_RE = re.compile(r'([\w-]+)(?:;desc="[^"]*")?;dur=([\d.]+)')
+_STAGE_SUM_RE = re.compile(r'tripsync_(stage|provider_request)_duration_seconds_(sum|count)\{\w+="([^"]+)"\} ([\d.eE+-]+)')
+
+
+def plan_trip_payload(rng: random.Random, distinct: int, unknown_share: float = 0.0) -> dict:
+    # A small pool of distinct trips makes cache and coalescing behaviour visible
+    trip = random.Random(rng.randrange(distinct))
+    unknown = trip.random() < unknown_share
+    return {
+        "destination": trip.choice(UNKNOWN_DESTINATIONS if unknown else DESTINATIONS),
+        "source": trip.choice(SOURCES),
+        "budget": trip.choice([15000, 25000, 40000]),
+        "people": trip.choice([1, 2, 4]),
+        "days": trip.choice([2, 3, 5]),
+        "transport": trip.choice(["car", "train", "flight"]),
+        "preferences": trip.sample(PREFERENCES, 2),
+    }
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def scrape_stage_totals(base_url: str) -> dict:
+    """Return {(kind, label): [sum, count]} from the server's /metrics."""
+    totals = {}
+    try:
+        text = requests.get(f"{base_url}/metrics", timeout=10).text
+    except requests.RequestException:
+        return totals
+    for kind, field, label, value in _STAGE_SUM_RE.findall(text):
+        entry = totals.setdefault((kind, label), [0.0, 0])
+        if field == "sum":
+            entry[0] = float(value)
+        else:
+            entry[1] = int(float(value))
+    return totals
+
+
+def diff_stage_totals(before: dict, after: dict) -> dict:
+    """Mean latency per stage/provider for calls made during the run."""
+    breakdown = {}
+    for key, (total, count) in after.items():
+        prev_total, prev_count = before.get(key, (0.0, 0))
+        calls = count - prev_count
+        if calls > 0:
+            kind, label = key
+            breakdown[f"{kind}:{label}"] = {"calls": calls, "mean_ms": round((total - prev_total) / calls * 1000, 1)}
+    return breakdown
+
+
+class LoadTest:
+    def __init__(self, base_url, rps, duration, mix=None, distinct_trips=20, timeout=120, seed=None,
+                 unknown_share=0.0):
+        self.base_url = base_url.rstrip("/")
+        self.rps = rps
+        self.duration = duration
+        self.mix = mix or DEFAULT_MIX
+        self.distinct_trips = distinct_trips
+        self.unknown_share = unknown_share
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.results = []
+        self._lock = threading.Lock()
+        self._session = requests.Session()
+        self._session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=256))
+
+    def _pick_route(self) -> str:
+        roll = self.rng.random()
+        cumulative = 0.0
+        for route, weight in self.mix.items():
+            cumulative += weight
+            if roll < cumulative:
+                return route
+        return list(self.mix)[-1]
+
+    def _payload(self, route: str) -> dict:
+        trip = plan_trip_payload(self.rng, self.distinct_trips, self.unknown_share)
+        if route == "map-data":
+            return {"source": trip["source"], "destination": trip["destination"]}
+        if route == "place-images":
+            return {"destination": trip["destination"],
+                    "places": [{"name": f"Fake Attraction {i + 1}"} for i in range(6)]}
+        return trip
+
+    def _send(self, route: str, payload: dict, scheduled: float):
+        result = {"route": route, "ok": False, "status": None, "latency": None, "ttfb": None,
+                  "lag": time.perf_counter() - scheduled, "server_timing": {}}
+        started = time.perf_counter()
+        try:
+            with self._session.post(f"{self.base_url}/api/{route}", json=payload,
+                                    stream=True, timeout=self.timeout) as response:
+                result["status"] = response.status_code
+                first = True
+                body = []
+                for chunk in response.iter_content(chunk_size=None):
+                    if first and chunk:
+                        result["ttfb"] = time.perf_counter() - started
+                        first = False
+                    body.append(chunk)
+                result["latency"] = time.perf_counter() - started
+                result["ok"] = response.status_code < 400 and b'"error"' not in b"".join(body)[:200]
+                timing = response.headers.get("Server-Timing", "")
+                result["server_timing"] = {name: float(ms) for name, ms in _SERVER_TIMING_RE.findall(timing)}
+        except requests.RequestException as e:
+            result["error"] = str(e)
+            result["latency"] = time.perf_counter() - started
+        with self._lock:
+            self.results.append(result)
+
+    def run(self) -> dict:
+        before = scrape_stage_totals(self.base_url)
+        total = int(self.rps * self.duration)
+        # Enough workers that arrivals never wait on a free thread
+        workers = max(8, int(self.rps * 60))
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="loadtest") as pool:
+            next_at = started
+            for _ in range(total):
+                # Poisson arrivals at the target rate
+                next_at += self.rng.expovariate(self.rps)
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                route = self._pick_route()
+                pool.submit(self._send, route, self._payload(route), next_at)
+
+        elapsed = time.perf_counter() - started
+        after = scrape_stage_totals(self.base_url)
+        return self.report(elapsed, diff_stage_totals(before, after))
+
+    def report(self, elapsed: float, stage_breakdown: dict) -> dict:
+        summary = {
+            "target_rps": self.rps,
+            "elapsed_seconds": round(elapsed, 2),
+            "requests": len(self.results),
+            "throughput_rps": round(len(self.results) / elapsed, 2) if elapsed else 0.0,
+            "routes": {},
+            "stages": stage_breakdown,
+        }
+        for route in self.mix:
+            rows = [r for r in self.results if r["route"] == route]
+            if not rows:
+                continue
+            latencies = [r["latency"] for r in rows if r["latency"] is not None]
+            ttfbs = [r["ttfb"] for r in rows if r["ttfb"] is not None]
+            route_summary = {
+                "requests": len(rows),
+                "errors": sum(1 for r in rows if not r["ok"]),
+                "latency_ms": {f"p{p}": round(percentile(latencies, p) * 1000, 1) for p in (50, 95, 99)},
+                "ttfb_ms": {f"p{p}": round(percentile(ttfbs, p) * 1000, 1) for p in (50, 95, 99)},
+            }
+            timings = {}
+            for row in rows:
+                for name, ms in row["server_timing"].items():
+                    timings.setdefault(name, []).append(ms)
+            if timings:
+                route_summary["server_timing_p50_ms"] = {name: round(percentile(values, 50), 1)
+                                                         for name, values in sorted(timings.items())}
+            summary["routes"][route] = route_summary
+        return summary
+
+
+def print_report(summary: dict):
+    print(f"\nTarget {summary['target_rps']} rps | sent {summary['requests']} in {summary['elapsed_seconds']}s "
+          f"| achieved {summary['throughput_rps']} rps")
+    print(f"\n{'route':<14}{'reqs':>6}{'errs':>6}{'p50':>10}{'p95':>10}{'p99':>10}{'ttfb p50':>11}{'ttfb p95':>11}")
+    for route, stats in summary["routes"].items():
+        lat, ttfb = stats["latency_ms"], stats["ttfb_ms"]
+        print(f"{route:<14}{stats['requests']:>6}{stats['errors']:>6}{lat['p50']:>10}{lat['p95']:>10}{lat['p99']:>10}"
+              f"{ttfb['p50']:>11}{ttfb['p95']:>11}")
+        for name, ms in stats.get("server_timing_p50_ms", {}).items():
+            print(f"    server-timing {name:<20}{ms:>10} ms (p50)")
+
+    if summary["stages"]:
+        print(f"\n{'stage / provider (from /metrics)':<44}{'calls':>8}{'mean ms':>10}")
+        for name, stats in sorted(summary["stages"].items()):
+            print(f"{name:<44}{stats['calls']:>8}{stats['mean_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open-loop load test for the trip planning API")
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--rps", type=float, default=2.0, help="Target arrival rate (requests/second)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to generate load for")
+    parser.add_argument("--mix", help='Route weights as JSON, e.g. {"plan-trip": 1.0}')
+    parser.add_argument("--distinct-trips", type=int, default=20, help="Distinct plan-trip payloads to cycle through")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--unknown-share", type=float, default=0.0,
+                        help="Share of trips to destinations not in the catalog (auto-added by the app; "
+                             "run it against the scratch CATALOG_PATH printed by fake_providers)")
+    parser.add_argument("--output", help="Write the JSON summary to this file")
+    args = parser.parse_args()
+
+    mix = json.loads(args.mix) if args.mix else None
+    test = LoadTest(args.url, args.rps, args.duration, mix, args.distinct_trips, args.timeout, args.seed,
+                    args.unknown_share)
+    summary = test.run()
+    print_report(summary)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nSummary written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
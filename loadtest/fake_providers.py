@@ -0,0 +1,346 @@
+"""
+Fake Providers - Local stand-ins for every external API the app calls
+One threaded HTTP server answers Geoapify, Nominatim, Mappls, Overpass,
+Google Places, OpenRouter and Groq under a path prefix each, with latency
+and error rates drawn from a per-provider profile.
+
+Usage:
+    python -m loadtest.fake_providers --port 9100 --profile loadtest/profiles/default.json
+
+Point the app at it with the environment printed on startup.
+"""
+import os
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import shutil
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+SOURCE_CATALOG = os.path.join(os.path.dirname(__file__), "../data/processed/database.json")
+
+DEFAULT_PROFILE = {
+    "geoapify": {"latency_ms": {"dist": "lognormal", "median": 120, "sigma": 0.5}, "error_rate": 0.01},
+    "nominatim": {"latency_ms": {"dist": "lognormal", "median": 300, "sigma": 0.6}, "error_rate": 0.02},
+    "mappls": {"latency_ms": {"dist": "lognormal", "median": 250, "sigma": 0.5}, "error_rate": 0.01},
+    "overpass": {"latency_ms": {"dist": "lognormal", "median": 800, "sigma": 0.7}, "error_rate": 0.05},
+    "google": {"latency_ms": {"dist": "lognormal", "median": 150, "sigma": 0.4}, "error_rate": 0.01},
+    "openrouter": {"latency_ms": {"dist": "lognormal", "median": 200, "sigma": 0.4}, "error_rate": 0.01},
+    "groq": {
+        "latency_ms": {"dist": "lognormal", "median": 400, "sigma": 0.5},
+        "error_rate": 0.02,
+        "tokens_per_second": 250,
+        "chunk_chars": 16
+    },
+}
+
+# Prefix each provider is mounted under; the matching app env var
+PROVIDER_ENV = {
+    "geoapify": ("GEOAPIFY_BASE_URL", "/geoapify"),
+    "nominatim": ("NOMINATIM_BASE_URL", "/nominatim"),
+    "mappls-outpost": ("MAPPLS_OUTPOST_URL", "/mappls-outpost"),
+    "mappls": ("MAPPLS_API_URL", "/mappls"),
+    "overpass": ("OVERPASS_URL", "/overpass/api/interpreter"),
+    "google": ("GOOGLE_MAPS_BASE_URL", "/google"),
+    "openrouter": ("OPENROUTER_BASE_URL", "/openrouter"),
+    "groq": ("GROQ_BASE_URL", "/groq"),
+}
+
+
+def sample_latency(spec: dict) -> float:
+    """Draw one latency in seconds from a profile distribution."""
+    dist = spec.get("dist", "constant")
+    if dist == "uniform":
+        ms = random.uniform(spec.get("min", 0), spec.get("max", 0))
+    elif dist == "lognormal":
+        ms = random.lognormvariate(math.log(max(spec.get("median", 1), 1e-3)), spec.get("sigma", 0.5))
+    elif dist == "exponential":
+        ms = random.expovariate(1.0 / max(spec.get("mean", 1), 1e-3))
+    else:
+        ms = spec.get("value", 0)
+    return max(0.0, ms) / 1000.0
+
+
+def _seeded(text: str) -> random.Random:
+    # Deterministic per query so repeated lookups return the same data
+    return random.Random(int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16))
+
+
+def _coords(text: str) -> tuple:
+    rng = _seeded(text)
+    return round(rng.uniform(8.0, 32.0), 5), round(rng.uniform(68.0, 92.0), 5)
+
+
+def geoapify_geocode(query):
+    text = query.get("text", ["somewhere"])[0]
+    lat, lon = _coords(text)
+    return {"features": [{"properties": {"lat": lat, "lon": lon, "formatted": f"{text}, India"}}]}
+
+
+def geoapify_places(query):
+    seed = query.get("filter", [""])[0]
+    rng = _seeded(seed)
+    features = []
+    for i in range(15):
+        features.append({"properties": {
+            "name": f"Fake Attraction {i + 1}",
+            "address_line2": f"{i + 1} Fake Road",
+            "category": "tourism.sights",
+            "categories": ["tourism.sights"],
+            "place_type": "attraction",
+            "lat": round(rng.uniform(8.0, 32.0), 5),
+            "lon": round(rng.uniform(68.0, 92.0), 5),
+        }})
+    return {"features": features}
+
+
+def nominatim_search(query):
+    text = query.get("q", ["somewhere"])[0]
+    lat, lon = _coords(text)
+    return [{"lat": str(lat), "lon": str(lon), "display_name": f"{text}, India"}]
+
+
+def mappls_route(path):
+    rng = _seeded(path)
+    distance = rng.uniform(50_000, 900_000)
+    return {"routes": [{
+        "distance": distance,
+        "duration": distance / 15.0,
+        "geometry": "_p~iF~ps|U_ulLnnqC_mqNvxq`@",
+        "legs": [{"steps": []}],
+    }]}
+
+
+def overpass(_body):
+    elements = []
+    for i in range(12):
+        elements.append({
+            "type": "node", "lat": 18.5 + i * 0.001, "lon": 73.8 + i * 0.001,
+            "tags": {"name": f"Fake Place {i + 1}", "amenity": "restaurant", "tourism": "hotel", "cuisine": "indian"},
+        })
+    return {"elements": elements}
+
+
+def google_text_search(query):
+    name = query.get("query", ["place"])[0]
+    return {"status": "OK", "results": [{"name": name, "photos": [{"photo_reference": hashlib.md5(name.encode()).hexdigest()}]}]}
+
+
+def openrouter_embeddings(body):
+    rng = _seeded(str(body.get("input", "")))
+    return {"data": [{"embedding": [rng.random() for _ in range(1536)]}]}
+
+
+def fake_itinerary(prompt: str) -> str:
+    days = 3
+    for line in prompt.splitlines():
+        if "Duration:" in line:
+            try:
+                days = int(line.split("Duration:")[1].split()[0])
+            except (ValueError, IndexError):
+                pass
+            break
+    slot = {"activity": "Sightseeing", "cost": "₹500", "place": "Fake Attraction 1", "tip": "Start early"}
+    return json.dumps({
+        "overview": {"title": "Load Test Trip", "vibe": "Synthetic", "highlights": ["A", "B", "C"]},
+        "transportation": {"mode": "Car", "cost": "₹2000"},
+        "budget": {"total": "₹20,000"},
+        "days": [{"day": d + 1, "title": f"Day {d + 1}", "morning": slot, "lunch": slot, "afternoon": slot,
+                  "evening": slot, "dinner": slot, "accommodation": slot} for d in range(days)],
+        "tips": ["Tip 1", "Tip 2"],
+    }, indent=2, ensure_ascii=False)
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    profile = DEFAULT_PROFILE
+    stats = {}
+    stats_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self, provider, failed):
+        with self.stats_lock:
+            entry = self.stats.setdefault(provider, {"requests": 0, "errors": 0})
+            entry["requests"] += 1
+            entry["errors"] += int(failed)
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _simulate(self, provider) -> bool:
+        """Sleep for the sampled latency; return True if this call should fail."""
+        spec = self.profile.get(provider, {})
+        time.sleep(sample_latency(spec.get("latency_ms", {})))
+        failed = random.random() < spec.get("error_rate", 0.0)
+        self._count(provider, failed)
+        if failed:
+            self._send_json({"error": "injected failure"}, status=spec.get("error_status", 503))
+        return failed
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        path = url.path
+
+        if path == "/_stats":
+            with self.stats_lock:
+                return self._send_json(self.stats)
+        if path.startswith("/geoapify/v1/geocode"):
+            if not self._simulate("geoapify"):
+                self._send_json(geoapify_geocode(query))
+        elif path.startswith("/geoapify/v2/places"):
+            if not self._simulate("geoapify"):
+                self._send_json(geoapify_places(query))
+        elif path.startswith("/nominatim/search"):
+            if not self._simulate("nominatim"):
+                self._send_json(nominatim_search(query))
+        elif path.startswith("/mappls/advancedmaps/"):
+            if not self._simulate("mappls"):
+                self._send_json(mappls_route(path))
+        elif path.startswith("/google/maps/api/place/textsearch"):
+            if not self._simulate("google"):
+                self._send_json(google_text_search(query))
+        else:
+            self._send_json({"error": f"unknown path {path}"}, status=404)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        raw = self._read_body()
+
+        if path.startswith("/mappls-outpost/api/security/oauth/token"):
+            if not self._simulate("mappls"):
+                self._send_json({"access_token": "fake-token", "expires_in": 86400})
+        elif path.startswith("/overpass"):
+            if not self._simulate("overpass"):
+                self._send_json(overpass(raw))
+        elif path.startswith("/openrouter/embeddings"):
+            if not self._simulate("openrouter"):
+                self._send_json(openrouter_embeddings(json.loads(raw or b"{}")))
+        elif path.startswith("/groq/openai/v1/chat/completions"):
+            if not self._simulate("groq"):
+                self._groq_completion(json.loads(raw or b"{}"))
+        else:
+            self._send_json({"error": f"unknown path {path}"}, status=404)
+
+    def _groq_completion(self, body):
+        spec = self.profile.get("groq", {})
+        prompt = body.get("messages", [{}])[-1].get("content", "")
+        content = fake_itinerary(prompt)
+        model = body.get("model", "fake-model")
+
+        if not body.get("stream"):
+            return self._send_json({
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                          "total_tokens": (len(prompt) + len(content)) // 4},
+            })
+
+        # Server-sent events, paced like a real token stream (~4 chars per token)
+        chunk_chars = spec.get("chunk_chars", 16)
+        delay = (chunk_chars / 4.0) / max(spec.get("tokens_per_second", 250), 1)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_event(payload):
+            data = f"data: {payload}\n\n".encode("utf-8")
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+            self.wfile.flush()
+
+        for start in range(0, len(content), chunk_chars):
+            write_event(json.dumps({
+                "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + chunk_chars]}, "finish_reason": None}],
+            }))
+            time.sleep(delay)
+        write_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def load_profile(path: str = None) -> dict:
+    """Merge a JSON profile file over the defaults."""
+    profile = json.loads(json.dumps(DEFAULT_PROFILE))
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            for provider, spec in json.load(f).items():
+                profile.setdefault(provider, {}).update(spec)
+    return profile
+
+
+def scratch_catalog(source: str = SOURCE_CATALOG) -> str:
+    """
+    Copy the catalog into a temp dir for the app under test.
+
+    Destinations the app auto-adds during a run (unknown destinations,
+    answered with fake places) then land in the copy's change log instead
+    of data/processed.
+    """
+    path = os.path.join(tempfile.mkdtemp(prefix="tripsync-loadtest-"), "database.json")
+    shutil.copyfile(source, path)
+    return path
+
+
+def app_environment(host: str, port: int, catalog_path: str = None) -> dict:
+    """Environment variables that point the app at this server (and a scratch catalog)."""
+    base = f"http://{host}:{port}"
+    env = {name: f"{base}{prefix}" for name, prefix in PROVIDER_ENV.values()}
+    # Keys only need to be present; the fakes never check them
+    env.update({
+        "GEOAPIFY_API_KEY": "fake", "GROQ_API_KEY": "fake", "GOOGLE_API_KEY": "fake",
+        "OPENAI_API_KEY": "fake", "MAPPLS_CLIENT_ID": "fake", "MAPPLS_CLIENT_SECRET": "fake",
+    })
+    if catalog_path:
+        env["CATALOG_PATH"] = catalog_path
+    return env
+
+
+def serve(host="127.0.0.1", port=9100, profile=None) -> ThreadingHTTPServer:
+    """Start the fake provider server on a background thread."""
+    handler = type("ConfiguredHandler", (FakeProviderHandler,), {"profile": profile or DEFAULT_PROFILE, "stats": {}})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-providers", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run local stand-ins for all external providers")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--profile", help="JSON file with per-provider latency/error settings")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, load_profile(args.profile))
+    print(f"Fake providers listening on http://{args.host}:{args.port}")
+    print("Start the app with:")
+    for name, value in sorted(app_environment(args.host, args.port, scratch_catalog()).items()):
+        print(f"  export {name}={value}")
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Import Time Report - Cold-start cost of importing the app
+Runs `python -X importtime -c "import <module>"` in fresh interpreters
+(warmup disabled, so only what module load itself pulls in is counted),
+takes the median per module across runs and prints the total plus the
+most expensive imports. Fails when a library that should only load lazily
+(pandas, scikit-learn, SciPy, the Groq SDK) is imported at startup, or
+when the total exceeds --budget-ms, so cold start cannot creep back up.
+
+Usage:
+    python -m loadtest.importtime --module app --runs 5 --budget-ms 1000
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Loaded by warmup / on first use, never by importing the app
+LAZY_MODULES = ("pandas", "sklearn", "scipy", "groq")
+
+
+def parse_importtime(stderr: str) -> list:
+    """
+    Parse -X importtime output.
+
+    Returns:
+        [(module, depth, self_us, cumulative_us)] in import order
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip(" "))) // 2
+        rows.append((name.strip(), depth, int(fields[0]), int(fields[1])))
+    return rows
+
+
+def measure(module: str, runs: int) -> dict:
+    """Median cumulative/self import time (µs) per module over fresh interpreters."""
+    env = dict(os.environ, WARMUP_ENABLED="false", PYTHONDONTWRITEBYTECODE="1")
+    samples = {}
+    totals = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                capture_output=True, text=True, env=env)
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+        rows = parse_importtime(result.stderr)
+        totals.append(next(cumulative for name, depth, _, cumulative in rows if name == module and depth == 0))
+        for name, depth, self_us, cumulative in rows:
+            samples.setdefault(name, (depth, [], []))
+            samples[name][1].append(self_us)
+            samples[name][2].append(cumulative)
+
+    modules = {
+        name: {"depth": depth, "self_ms": statistics.median(selfs) / 1000,
+               "cumulative_ms": statistics.median(cumulatives) / 1000}
+        for name, (depth, selfs, cumulatives) in samples.items()
+    }
+    return {"module": module, "runs": runs, "total_ms": statistics.median(totals) / 1000, "modules": modules}
+
+
+def print_report(report: dict, top: int):
+    print(f"\n=== import {report['module']}: {report['total_ms']:.0f} ms "
+          f"(median of {report['runs']} cold interpreters) ===")
+    print(f"  {'cumulative':>10}  {'self':>8}  module")
+    ranked = sorted(report["modules"].items(), key=lambda item: -item[1]["cumulative_ms"])
+    for name, stats in ranked[:top]:
+        print(f"  {stats['cumulative_ms']:>8.1f}ms  {stats['self_ms']:>6.1f}ms  {'  ' * stats['depth']}{name}")
+
+    lazy = [name for name in LAZY_MODULES if name in report["modules"]]
+    if lazy:
+        print(f"\n  Loaded at import (should be lazy): {', '.join(lazy)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of the app")
+    parser.add_argument("--module", default="app", help="Module to import (app or async_app)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20, help="Most expensive imports to list")
+    parser.add_argument("--budget-ms", type=float, default=None, help="Fail if the total exceeds this")
+    parser.add_argument("--output", help="Write the full report as JSON")
+    args = parser.parse_args()
+
+    report = measure(args.module, args.runs)
+    print_report(report, args.top)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = any(name in report["modules"] for name in LAZY_MODULES)
+    if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+        print(f"\n  Over budget: {report['total_ms']:.0f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Model artifacts - versioned, memory-mappable storage for trained models
+Each training run writes ml_engine/models/<version>/<name>.joblib plus an
+entry in models/manifest.json; "current" points at the newest complete
+version. Artifacts are uncompressed joblib dumps, so their NumPy arrays
+(TF-IDF matrix, idf vector, cluster centers) load with mmap_mode='r' and
+every web worker shares the same pages instead of holding its own copy.
+"""
+import os
+import json
+import time
+import shutil
+import logging
+
+import joblib
+import sklearn
+
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+# Older versions kept next to the current one (for rollback)
+MODEL_KEEP_VERSIONS = int(os.getenv("MODEL_KEEP_VERSIONS", "3"))
+
+
+def manifest_path(model_dir: str = MODEL_DIR) -> str:
+    return os.path.join(model_dir, "manifest.json")
+
+
+def read_manifest(model_dir: str = MODEL_DIR) -> dict:
+    try:
+        with open(manifest_path(model_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"current": None, "versions": {}}
+
+
+def _write_manifest(manifest: dict, model_dir: str):
+    path = manifest_path(model_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def save_artifacts(models: dict, meta: dict = None, model_dir: str = MODEL_DIR) -> str:
+    """
+    Write a new model version and make it current.
+
+    Args:
+        models: {artifact name: fitted object}
+        meta: Extra fields for the manifest entry (catalog digest, counts, ...)
+        model_dir: Root of the versioned model store
+
+    Returns:
+        The new version string
+    """
+    version = time.strftime("%Y%m%d-%H%M%S")
+    version_dir = os.path.join(model_dir, version)
+    suffix = 1
+    while os.path.exists(version_dir):
+        suffix += 1
+        version_dir = os.path.join(model_dir, f"{version}.{suffix}")
+    version = os.path.basename(version_dir)
+    os.makedirs(version_dir)
+
+    files = {}
+    for name, model in models.items():
+        path = os.path.join(version_dir, f"{name}.joblib")
+        joblib.dump(model, path)  # uncompressed: required for mmap loading
+        files[name] = {"file": os.path.relpath(path, model_dir), "bytes": os.path.getsize(path)}
+
+    # The manifest is only updated once every file is on disk
+    manifest = read_manifest(model_dir)
+    manifest["versions"][version] = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "sklearn": sklearn.__version__,
+        "files": files,
+        **(meta or {}),
+    }
+    manifest["current"] = version
+
+    # Oldest first in manifest order: a name pruned earlier in the same second
+    # can be reused, so the names themselves do not sort by age
+    stale = list(manifest["versions"])[:-(MODEL_KEEP_VERSIONS + 1)]
+    for old in stale:
+        manifest["versions"].pop(old, None)
+    _write_manifest(manifest, model_dir)
+    for old in stale:
+        shutil.rmtree(os.path.join(model_dir, old), ignore_errors=True)
+
+    return version
+
+
+def set_current_version(version: str = None, model_dir: str = MODEL_DIR) -> str:
+    """
+    Point "current" at a kept version (rollback); web workers pick it up on restart.
+
+    Args:
+        version: Version to serve; defaults to the one before the current one
+        model_dir: Root of the versioned model store
+
+    Returns:
+        The version now current
+
+    Raises:
+        ValueError: If there is no such version (or nothing older to roll back to)
+    """
+    manifest = read_manifest(model_dir)
+    versions = list(manifest["versions"])
+    if version is None:
+        current = manifest.get("current")
+        older = versions[:versions.index(current)] if current in versions else versions
+        if not older:
+            raise ValueError("No older model version to roll back to")
+        version = older[-1]
+    if version not in manifest["versions"]:
+        raise ValueError(f"Unknown model version {version!r} (kept: {', '.join(versions) or 'none'})")
+    manifest["current"] = version
+    _write_manifest(manifest, model_dir)
+    return version
+
+
+def load_artifact(name: str, version: str = None, model_dir: str = MODEL_DIR):
+    """
+    Load one artifact of the current (or given) version, memory-mapped.
+
+    Returns:
+        (object, manifest entry), or (None, None) if there is no usable
+        artifact (missing, or trained with another scikit-learn version)
+    """
+    manifest = read_manifest(model_dir)
+    version = version or manifest.get("current")
+    entry = manifest.get("versions", {}).get(version)
+    if not entry or name not in entry.get("files", {}):
+        return None, None
+    if entry.get("sklearn") != sklearn.__version__:
+        logger.warning(f"⚠️ Model {version} was trained with scikit-learn {entry.get('sklearn')}, "
+                       f"running {sklearn.__version__}; ignoring it")
+        return None, None
+    try:
+        started = time.perf_counter()
+        model = joblib.load(os.path.join(model_dir, entry["files"][name]["file"]), mmap_mode="r")
+        logger.info(f"📦 Loaded model '{name}' ({version}) in {time.perf_counter() - started:.2f}s")
+        return model, dict(entry, version=version)
+    except Exception as e:
+        logger.error(f"❌ Failed to load model '{name}' ({version}): {e}")
+        return None, None
@@ -1,56 +1,108 @@
+import os
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
+import threading
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
+from ml_engine.artifacts import load_artifact
+
+# Above this many points "auto" mode fits MiniBatchKMeans instead of KMeans
+MINIBATCH_THRESHOLD = int(os.getenv("CLUSTERING_MINIBATCH_THRESHOLD", "10000"))
 
 class PlaceClustering:
-    def __init__(self, n_clusters=5):
+    def __init__(self, n_clusters=5, mode="auto", batch_size=4096):
+        """
+        mode: "full" (KMeans), "minibatch" (MiniBatchKMeans) or "auto"
+              (mini-batch above MINIBATCH_THRESHOLD points)
+        """
         self.n_clusters = n_clusters
+        self.mode = mode
+        self.batch_size = batch_size
         self.scaler = StandardScaler()
         self.kmeans = None
         
-    def train(self, places_data):
+    def _features(self, places_data):
+        """(n, 2) float lat/lon array plus the mask of rows with usable coordinates."""
+        df = places_data if isinstance(places_data, pd.DataFrame) else pd.DataFrame(places_data)
+        coords = np.column_stack([
+            pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float) if col in df.columns else np.full(len(df), np.nan)
+            for col in ('lat', 'lon')
+        ]) if len(df) else np.empty((0, 2))
+        valid = ~np.isnan(coords).any(axis=1)
+        return df, coords, valid
+
+    def train(self, places_data, id_key='place_id'):
         """
         Expects a list of dicts with 'lat', 'lon'.
         Automatically determines optimal k if data is small.
+
+        Returns:
+            {str(id): cluster} for rows with coordinates and an id_key value
         """
-        df = pd.DataFrame(places_data)
-        
-        # Filter valid coordinates
-        df = df.dropna(subset=['lat', 'lon'])
+        df, coords, valid = self._features(places_data)
+        features = coords[valid]
+        if len(features) == 0:
+            return {}
         
-        if len(df) < self.n_clusters:
-            self.n_clusters = max(1, len(df))
-            
-        self.kmeans = KMeans(n_clusters=self.n_clusters, random_state=42, n_init=10)
+        if len(features) < self.n_clusters:
+            self.n_clusters = max(1, len(features))
+
+        if self.mode == "minibatch" or (self.mode == "auto" and len(features) > MINIBATCH_THRESHOLD):
+            self.kmeans = MiniBatchKMeans(n_clusters=self.n_clusters, random_state=42, n_init=3,
+                                          batch_size=self.batch_size)
+        else:
+            self.kmeans = KMeans(n_clusters=self.n_clusters, random_state=42, n_init=10)
         
         # Feature Engineering: Use Lat/Lon for geographical clustering
-        # Multiply Latitude by 111 (approx km per degree) for better scaling
-        features = df[['lat', 'lon']].copy()
-        
-        self.scaler.fit(features)
-        scaled_features = self.scaler.transform(features)
+        scaled_features = self.scaler.fit_transform(features)
         
-        # Fit model
+        # Fit model; labels_ are the training assignments, in row order
         self.kmeans.fit(scaled_features)
+        labels = self.kmeans.labels_
         
-        # Assign clusters to original data
-        # We need to map back to original indices
-        labels = self.kmeans.predict(scaled_features)
-        
-        # Create a map of place_id -> cluster_id
-        cluster_map = {}
-        for idx, row in df.iterrows():
-            # Adjust index if df was filtered
-            # Assuming places_data has unique place_id
-            pid = row.get('place_id')
-            if pid:
-                cluster_map[str(pid)] = int(labels[idx])
-                
-        return cluster_map
+        # Map labels back by position among the rows that had coordinates
+        if id_key not in df.columns:
+            return {}
+        ids = df[id_key].to_numpy(dtype=object)[valid]
+        return {str(pid): int(label) for pid, label in zip(ids, labels) if pid and not pd.isnull(pid)}
 
     def predict(self, lat, lon):
         if self.kmeans is None:
             return 0
-        scaled = self.scaler.transform([[lat, lon]])
-        return int(self.kmeans.predict(scaled)[0])
+        return int(self.predict_many([[lat, lon]])[0])
+
+    def predict_many(self, coords):
+        """
+        Cluster of many points in one call.
+
+        Args:
+            coords: (n, 2) lat/lon array-like, or a list of dicts with lat/lon
+
+        Returns:
+            int array of cluster ids; -1 for points without valid coordinates
+        """
+        if coords is not None and len(coords) and isinstance(coords[0], dict):
+            _, coords, valid = self._features(coords)
+        else:
+            coords = np.asarray(coords, dtype=float).reshape(-1, 2)
+            valid = ~np.isnan(coords).any(axis=1)
+        labels = np.full(len(coords), -1 if self.kmeans is not None else 0)
+        if self.kmeans is not None and valid.any():
+            labels[valid] = self.kmeans.predict(self.scaler.transform(coords[valid]))
+        return labels
+
+_clusterings_lock = threading.Lock()
+_clusterings = None
+
+def get_destination_clustering(destination_name):
+    """
+    Trained PlaceClustering for a destination's attractions, from the current
+    model artifacts (python -m ml_engine.train_models); None if not trained.
+    """
+    global _clusterings
+    if _clusterings is None:
+        with _clusterings_lock:
+            if _clusterings is None:
+                trained, _ = load_artifact("clustering")
+                _clusterings = trained or {}
+    return _clusterings.get(str(destination_name).strip().lower() if destination_name else "")
@@ -0,0 +1,186 @@
+"""
+Day planner - balanced, walkable split of selected places into trip days
+Places are grouped geographically under a per-day capacity (days differ by
+at most one place), then each day is ordered as a short path: nearest
+neighbour from one end, improved with 2-opt. Plans depend only on the
+coordinates and day count, so they are cached by that place set.
+"""
+import os
+import math
+from functools import lru_cache
+
+import numpy as np
+
+DAY_PLAN_CACHE_SIZE = int(os.getenv("DAY_PLAN_CACHE_SIZE", "1024"))
+# Assignment/centre refinement rounds; plans for a few dozen places settle in 2-4
+MAX_ROUNDS = 10
+
+
+def _coord(place):
+    try:
+        lat, lon = float(place.get('lat')), float(place.get('lon'))
+    except (TypeError, ValueError):
+        return None
+    # 0 / NaN count as "no location", like the truthiness check this replaces
+    if not lat or not lon or math.isnan(lat) or math.isnan(lon):
+        return None
+    return (lat, lon)
+
+
+def _capacities(n, days):
+    base, extra = divmod(n, days)
+    return [base + 1 if d < extra else base for d in range(days)]
+
+
+def _seed_centres(xy, k):
+    """Farthest-point seeds: deterministic and spread over the whole area."""
+    first = int(np.argmax(((xy - xy.mean(axis=0)) ** 2).sum(axis=1)))
+    seeds = [first]
+    nearest = ((xy - xy[first]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        nxt = int(np.argmax(nearest))
+        seeds.append(nxt)
+        nearest = np.minimum(nearest, ((xy - xy[nxt]) ** 2).sum(axis=1))
+    return xy[seeds].copy()
+
+
+def _assign(xy, centres, capacity):
+    """Greedy capacity-constrained assignment, closest (point, centre) pairs first."""
+    dist = ((xy[:, None, :] - centres[None, :, :]) ** 2).sum(axis=2)
+    labels = np.full(len(xy), -1)
+    room = list(capacity)
+    for flat in np.argsort(dist, axis=None, kind='stable'):
+        point, centre = divmod(int(flat), len(centres))
+        if labels[point] < 0 and room[centre] > 0:
+            labels[point] = centre
+            room[centre] -= 1
+    return labels
+
+
+def _improve_by_swaps(xy, labels, centres):
+    """Swap pairs of points between days while that tightens both days (sizes stay fixed)."""
+    for _ in range(len(xy)):
+        dist = ((xy[:, None, :] - centres[None, :, :]) ** 2).sum(axis=2)
+        own = dist[np.arange(len(xy)), labels]
+        cross = dist[:, labels]  # cross[i, j]: i's distance to j's day
+        # gain[i, j]: saving if i and j trade days (0 for two points of one day)
+        gain = own[:, None] + own[None, :] - cross - cross.T
+        i, j = np.unravel_index(int(np.argmax(gain)), gain.shape)
+        if gain[i, j] <= 1e-9:
+            break
+        labels[i], labels[j] = labels[j], labels[i]
+        centres = np.array([xy[labels == c].mean(axis=0) for c in range(len(centres))])
+    return labels, centres
+
+
+def order_route(xy):
+    """
+    Visiting order for one day's points (open path).
+
+    Nearest neighbour from the point farthest from the day's centre, then
+    2-opt segment reversals until no reversal shortens the path.
+    """
+    n = len(xy)
+    if n <= 2:
+        return list(range(n))
+    dist = np.sqrt(((xy[:, None, :] - xy[None, :, :]) ** 2).sum(axis=2))
+
+    start = int(np.argmax(((xy - xy.mean(axis=0)) ** 2).sum(axis=1)))
+    order, left = [start], set(range(n)) - {start}
+    while left:
+        here = order[-1]
+        nxt = min(left, key=lambda j: (dist[here, j], j))
+        order.append(nxt)
+        left.remove(nxt)
+
+    improved = True
+    while improved:
+        improved = False
+        for i in range(n - 2):
+            for j in range(i + 2, n):
+                a, b = order[i], order[i + 1]
+                c = order[j]
+                d = order[j + 1] if j + 1 < n else None
+                before = dist[a, b] + (dist[c, d] if d is not None else 0)
+                after = dist[a, c] + (dist[b, d] if d is not None else 0)
+                if after < before - 1e-9:
+                    order[i + 1:j + 1] = reversed(order[i + 1:j + 1])
+                    improved = True
+    return order
+
+
+@lru_cache(maxsize=DAY_PLAN_CACHE_SIZE)
+def _plan(coords, days):
+    """
+    Day plan for a place set as indices into coords.
+
+    Args:
+        coords: Tuple of (lat, lon) per located place, canonical order
+        days: Number of days
+
+    Returns:
+        Tuple of per-day index tuples, in visiting order
+    """
+    latlon = np.array(coords, dtype=float)
+    # Local equirectangular projection to km; accurate enough within a city/region
+    lat0 = math.radians(latlon[:, 0].mean())
+    xy = np.column_stack([latlon[:, 1] * 111.32 * math.cos(lat0), latlon[:, 0] * 110.57])
+
+    k = min(days, len(xy))
+    capacity = _capacities(len(xy), k)
+    centres = _seed_centres(xy, k)
+    labels = None
+    for _ in range(MAX_ROUNDS):
+        new_labels = _assign(xy, centres, capacity)
+        if labels is not None and np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        centres = np.array([xy[labels == c].mean(axis=0) for c in range(k)])
+    labels, centres = _improve_by_swaps(xy, labels, centres)
+
+    # Days follow each other geographically too: chain the day centres
+    chain = [int(np.argmax(((centres - xy.mean(axis=0)) ** 2).sum(axis=1)))]
+    while len(chain) < k:
+        here = centres[chain[-1]]
+        rest = [c for c in range(k) if c not in chain]
+        chain.append(min(rest, key=lambda c: (((centres[c] - here) ** 2).sum(), c)))
+
+    plan = []
+    for c in chain:
+        members = np.flatnonzero(labels == c)
+        plan.append(tuple(int(members[i]) for i in order_route(xy[members])))
+    return tuple(plan)
+
+
+def allocate_days(places, days):
+    """
+    Split places into balanced, geographically compact, ordered days.
+
+    Args:
+        places: Place/attraction dicts (lat/lon used when present)
+        days: Number of days
+
+    Returns:
+        {day_num: [places]} - None when fewer than half the places have
+        coordinates (callers fall back to plain chunking)
+    """
+    located, unlocated = [], []
+    for place in places:
+        coord = _coord(place)
+        (located if coord else unlocated).append((coord, place))
+    if len(located) <= len(places) / 2:
+        return None
+
+    # Canonical order so the same set hits the cache whatever order it came in
+    located.sort(key=lambda item: item[0])
+    plan = _plan(tuple(coord for coord, _ in located), days)
+
+    day_groups = {}
+    for day_num, indices in enumerate(plan, start=1):
+        day_groups[day_num] = [located[i][1] for i in indices]
+
+    # Places without coordinates top up the lightest days
+    for _, place in unlocated:
+        lightest = min(range(1, days + 1), key=lambda d: (len(day_groups.get(d, [])), d))
+        day_groups.setdefault(lightest, []).append(place)
+    return dict(sorted(day_groups.items()))
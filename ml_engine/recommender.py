@@ -1,131 +1,341 @@
-import pandas as pd
 import numpy as np
 import os
-import json
+import threading
+import scipy.sparse as sp
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import linear_kernel
 from ml_engine.clustering import PlaceClustering
+from ml_engine.artifacts import load_artifact
+from ml_engine.day_planner import allocate_days
+from services.catalog import get_catalog, normalize_name, attractions_fingerprint, destination_fingerprint
+from services.prompt_builder import BUDGET_SPLIT
+
+# Budget fit assumptions: paid meals per day, travellers sharing a room
+MEALS_PER_DAY = 2
+PEOPLE_PER_ROOM = 2
+
+# Attraction rows appended to the shared model (new/changed destinations)
+# before it is refitted in the background; bounds its growth between refits
+RECOMMENDER_MAX_APPENDED_ROWS = int(os.getenv("RECOMMENDER_MAX_APPENDED_ROWS", "5000"))
+
+def _price_stats(options, key):
+    """(min, avg, max) of the numeric `key` values in options; NaNs if none."""
+    prices = []
+    for option in options or []:
+        try:
+            prices.append(float(option.get(key)))
+        except (TypeError, ValueError):
+            continue
+    if not prices:
+        return (np.nan, np.nan, np.nan)
+    return (min(prices), sum(prices) / len(prices), max(prices))
+
+def _fit_scores(allowance, low, avg):
+    """
+    1.0 when the average option fits the allowance, 0.5-1.0 when only the
+    cheaper options do, below 0.5 (shrinking with the overshoot) when even
+    the cheapest does not; NaN where the spot has no prices.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        partial = 0.5 + 0.5 * np.clip((allowance - low) / np.maximum(avg - low, 1e-9), 0, 1)
+        return np.where(avg <= allowance, 1.0, np.where(low <= allowance, partial, 0.5 * allowance / low))
+
+def _coord(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    # 0 / missing counted as "no location", as the per-row truthiness check did
+    return value if value else np.nan
+
+def spot_features(spots):
+    """
+    What the model keeps per attraction, for one block of attractions.
+
+    Returns:
+        (content strings, lat, lon, dining (min, avg, max), stay (min, avg, max))
+    """
+    # Attractions might not have 'category', so we focus on name + description
+    fields = ['category'] if any('category' in s for s in spots) else []
+    fields += ['spot_name' if any('spot_name' in s for s in spots) else 'place_name', 'description']
+    content = [' '.join('' if s.get(f) is None else str(s.get(f)) for f in fields) for s in spots]
+
+    lat = np.array([_coord(s.get('lat')) for s in spots], dtype=float)
+    lon = np.array([_coord(s.get('lon')) for s in spots], dtype=float)
+    # Per-spot (min, avg, max) prices: meal per person, room per night
+    dining = np.array([_price_stats(s.get('dining'), 'price_per_person') for s in spots], dtype=float).reshape(-1, 3)
+    stay = np.array([_price_stats(s.get('accommodation'), 'price_per_night') for s in spots], dtype=float).reshape(-1, 3)
+    return content, lat, lon, dining, stay
+
+def _concat(blocks):
+    """spot_features of consecutive blocks, joined into one."""
+    content = [text for block in blocks for text in block[0]]
+    return (content,) + tuple(np.concatenate([block[i] for block in blocks]) for i in range(1, 5))
 
 class ContentRecommender:
     def __init__(self):
-        self.tfidf = TfidfVectorizer(stop_words='english')
+        # float32: half the memory of the default float64 for the same ranking
+        self.tfidf = TfidfVectorizer(stop_words='english', dtype=np.float32)
         self.tfidf_matrix = None
         self.indices = None
-        self.df = None
         self.clustering = PlaceClustering(n_clusters=5)
         self.cluster_map = {}
+        # Attraction dicts behind the rows; None for a catalog-wide model,
+        # whose callers pass the destination's current records instead
+        self.records = []
+        # Catalog-wide model: destination name key -> (start, stop) rows, and
+        # a fingerprint of the attractions those rows were built from
+        self.ranges = {}
+        self.fingerprints = {}
+        # Rows added by extend() since the last full fit
+        self.appended_rows = 0
 
-    def train(self, places_data):
-        self.df = pd.DataFrame(places_data)
-        
-        # 1. Text Features (Handle missing columns)
-        # Attractions might not have 'category', so we focus on name + description
-        content_parts = []
-        if 'category' in self.df.columns:
-            content_parts.append(self.df['category'].fillna(''))
-            
-        content_parts.append(self.df['spot_name'].fillna('') if 'spot_name' in self.df.columns else self.df['place_name'].fillna(''))
-        content_parts.append(self.df['description'].fillna(''))
-        
-        # Join all available text parts
-        self.df['content'] = pd.concat(content_parts, axis=1).apply(lambda x: ' '.join(x), axis=1)
-            
-        self.tfidf_matrix = self.tfidf.fit_transform(self.df['content'])
-        
-        # Reset index to ensure we can look up by position
-        self.df = self.df.reset_index(drop=True)
-        
+    def train(self, places_data, fit=True):
+        """Fit on one list of attractions (e.g. a single destination's)."""
+        self.records = list(places_data)
+        self._set_features(*spot_features(self.records), fit=fit)
+        return self
+
+    def _set_features(self, content, lat, lon, dining, stay, fit=True):
+        # fit=False reuses an already fitted vocabulary/IDF (see extend)
+        if fit:
+            self.tfidf_matrix = self.tfidf.fit_transform(content)
+        else:
+            self.tfidf_matrix = self.tfidf.transform(content)
+
+        # Column arrays for vectorized scoring (NaN = no usable coordinate / price)
+        self.content = np.array(content, dtype=object)
+        self.lat = lat
+        self.lon = lon
+        self.dining_prices = dining
+        self.stay_prices = stay
+
+    def train_catalog(self, places):
+        """
+        Fit one model over the attractions of every destination.
+
+        Each destination's attractions occupy a contiguous block of rows, so
+        a request scores just its slice of the shared TF-IDF matrix. Places
+        are consumed one at a time and only their derived features are kept,
+        so a stream such as get_catalog().iter_places() never materializes
+        the catalog; recommend() then needs records=.
+
+        Args:
+            places: Iterable of destination dicts
+        """
+        blocks = []
+        rows = 0
+        for place in places:
+            key = normalize_name(place.get('place_name'))
+            spots = place.get('attractions') or []
+            if not key or not spots or key in self.ranges:
+                continue
+            self.ranges[key] = (rows, rows + len(spots))
+            self.fingerprints[key] = attractions_fingerprint(spots)
+            blocks.append(spot_features(spots))
+            rows += len(spots)
+
+        if blocks:
+            self._set_features(*_concat(blocks))
+        self.records = None
         return self
 
+    def extend(self, places):
+        """
+        Copy of this model with the attractions of places appended as new rows.
+
+        Text is vectorized with the already fitted vocabulary and IDF, so the
+        existing corpus is not refitted and the feature space (and with it
+        the size of each row) stays fixed. A destination already in the
+        model gets a new block; its old rows are simply no longer referenced
+        until the next full fit.
+
+        Args:
+            places: List of new or changed destination dicts
+        """
+        ranges, fingerprints = dict(self.ranges), dict(self.fingerprints)
+        offset = self.tfidf_matrix.shape[0] if self.tfidf_matrix is not None else 0
+        blocks = []
+        rows = 0
+        for place in places:
+            key = normalize_name(place.get('place_name'))
+            spots = place.get('attractions') or []
+            if not key or not spots:
+                continue
+            ranges[key] = (offset + rows, offset + rows + len(spots))
+            fingerprints[key] = attractions_fingerprint(spots)
+            blocks.append(spot_features(spots))
+            rows += len(spots)
+        if not blocks:
+            return self
+        if self.tfidf_matrix is None:
+            return ContentRecommender().train_catalog(places)
+
+        content, lat, lon, dining, stay = _concat(blocks)
+        grown = ContentRecommender()
+        grown.tfidf = self.tfidf
+        grown.tfidf_matrix = sp.vstack([self.tfidf_matrix, self.tfidf.transform(content)], format='csr', dtype=np.float32)
+        grown.content = np.concatenate([self.content, np.array(content, dtype=object)])
+        grown.lat = np.concatenate([self.lat, lat])
+        grown.lon = np.concatenate([self.lon, lon])
+        grown.dining_prices = np.concatenate([self.dining_prices, dining])
+        grown.stay_prices = np.concatenate([self.stay_prices, stay])
+        grown.records = None
+        grown.ranges, grown.fingerprints = ranges, fingerprints
+        grown.appended_rows = getattr(self, 'appended_rows', 0) + rows
+        return grown
+
     def _haversine(self, lat1, lon1, lat2, lon2):
-        if pd.isnull(lat1) or pd.isnull(lat2) or lat1 is None or lat2 is None: 
-            return 1000 # Max distance penalty
+        """Great-circle km from one point to arrays of points; NaN -> max distance penalty."""
         R = 6371
         phi1, phi2 = np.radians(lat1), np.radians(lat2)
         dphi = np.radians(lat2 - lat1)
         dlambda = np.radians(lon2 - lon1)
         a = np.sin(dphi/2)**2 + np.cos(phi1)*np.cos(phi2)*np.sin(dlambda/2)**2
-        return R * 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+        d = R * 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+        return np.where(np.isnan(d), 1000, d)
 
-    def recommend(self, user_profile, context, top_n=15):
+    def _budget_scores(self, context, start, stop):
+        """
+        How well each spot's dining and stay prices fit the per-person,
+        per-day budget (split like calculate_budget_distribution).
+        1.0 everywhere if there is no usable budget; 0.5 for spots without prices.
+        """
+        n = stop - start
+        try:
+            daily = float(context.get('budget')) / max(int(context.get('days') or 1), 1) / max(int(context.get('people') or 1), 1)
+        except (TypeError, ValueError):
+            return np.ones(n)
+        if daily <= 0 or getattr(self, 'dining_prices', None) is None:
+            return np.ones(n)
+
+        people = max(int(context.get('people') or 1), 1)
+        dining = self.dining_prices[start:stop]
+        stay = self.stay_prices[start:stop] / min(people, PEOPLE_PER_ROOM)
+        food_fit = _fit_scores(daily * BUDGET_SPLIT['food'] / MEALS_PER_DAY, dining[:, 0], dining[:, 1])
+        stay_fit = _fit_scores(daily * BUDGET_SPLIT['accommodation'], stay[:, 0], stay[:, 1])
+
+        # Weighted by each category's budget share, over the categories the spot has prices for
+        weights = np.array([BUDGET_SPLIT['food'], BUDGET_SPLIT['accommodation']])
+        fits = np.column_stack([food_fit, stay_fit])
+        known = ~np.isnan(fits)
+        total = (known * weights).sum(axis=1)
+        with np.errstate(invalid='ignore'):
+            scores = (np.where(known, fits, 0) * weights).sum(axis=1) / total
+        return np.where(total > 0, scores, 0.5)
+
+    @staticmethod
+    def _top_n(scores, top_n):
+        """
+        Positions of the top_n scores, best first.
+
+        Selection is O(n) (np.partition) and only the winners are sorted;
+        ties keep catalog order, exactly as a stable full sort would.
+        """
+        n = len(scores)
+        if top_n < n:
+            kth = np.partition(scores, n - top_n)[n - top_n]
+            above = np.flatnonzero(scores > kth)
+            ties = np.flatnonzero(scores == kth)[:top_n - len(above)]
+            picks = np.concatenate([above, ties])
+        else:
+            picks = np.arange(n)
+        return picks[np.lexsort((picks, -scores[picks]))]
+
+    def recommend(self, user_profile, context, top_n=15, rows=None, records=None):
         """
         Multi-Objective Recommendation Logic
-        context: { user_lat, user_lon, budget, days }
+        context: { user_lat, user_lon, budget, days, people }
+        rows: (start, stop) slice to score, e.g. one destination of a catalog model
+        records: current dicts for those rows (defaults to the training records)
         """
-        if self.tfidf_matrix is None or self.df.empty: return []
+        return self.recommend_many([user_profile], [context], top_n, rows, records)[0]
 
-        # 1. Preference Score (TF-IDF)
-        user_tfidf = self.tfidf.transform([user_profile])
-        cosine_sim = linear_kernel(user_tfidf, self.tfidf_matrix).flatten()
-        
+    def recommend_many(self, user_profiles, contexts, top_n=15, rows=None, records=None):
+        """
+        recommend() for many profiles against the same rows: all profiles are
+        transformed together and scored with one sparse matrix product.
+
+        Returns:
+            One top-n list per profile, in input order
+        """
+        n = self.tfidf_matrix.shape[0] if self.tfidf_matrix is not None else 0
+        if n == 0: return [[] for _ in user_profiles]
+        start, stop = rows if rows else (0, n)
+        if stop <= start or top_n <= 0: return [[] for _ in user_profiles]
+        if records is None:
+            if self.records is None:
+                raise ValueError("records= is required to score a catalog-wide model")
+            records = self.records[start:stop]
+
+        # --- Feature 1: Preference (TF-IDF) - transform only, the model is already fitted ---
+        user_tfidf = self.tfidf.transform(list(user_profiles))
+        pref_matrix = linear_kernel(user_tfidf, self.tfidf_matrix[start:stop])
+
+        budget_memo = {}
         results = []
-        
-        for idx, row in self.df.iterrows():
-            # --- Feature 1: Preference ---
-            pref_score = cosine_sim[idx]
-            
+        for pref_scores, context in zip(pref_matrix, contexts):
             # --- Feature 2: Distance ---
-            # Attractions often lack lat/lon in this specific dataset struct, so we might skip or use parent
-            dist_score = 0
-            if context.get('user_lat') and row.get('lat'):
-                d = self._haversine(context['user_lat'], context['user_lon'], row.get('lat'), row.get('lon'))
-                dist_score = np.exp(-(d/50)**2) # Gaussian decay
-            else:
-                dist_score = 0.5 # Neutral if no location
-                
-            # --- Feature 3: Budget ---
-            # Parsing dining/accomodation costs is complex, simple heuristic for now
-            budget_score = 1.0
-            
+            dist_scores = self._distance_scores(context, start, stop)
+
+            # --- Feature 3: Budget --- (identical budgets in a batch are scored once)
+            budget_key = (context.get('budget'), context.get('days'), context.get('people'))
+            if budget_key not in budget_memo:
+                budget_memo[budget_key] = self._budget_scores(context, start, stop)
+            budget_scores = budget_memo[budget_key]
+
             # --- Score Aggregation ---
             # Weights: Pref(0.6) + Dist(0.2) + Budget(0.2)
             # Increased preference weight since distance is often missing for attractions
-            final_score = (pref_score * 0.6) + (dist_score * 0.2) + (budget_score * 0.2)
-            
-            results.append({
-                **row.to_dict(),
-                'ml_score': float(final_score),
-                'scores': {
-                    'preference': float(pref_score),
-                    'distance': float(dist_score)
-                }
-            })
-            
-        # Sort and Pick
-        results = sorted(results, key=lambda x: x['ml_score'], reverse=True)
-        top_picks = results[:top_n]
+            final_scores = (pref_scores * 0.6) + (dist_scores * 0.2) + (budget_scores * 0.2)
+
+            # Pick, then build dicts for the winners only
+            top_picks = []
+            for pos in self._top_n(final_scores, top_n):
+                idx = start + pos
+                top_picks.append({
+                    # The source dict, not the DataFrame row: a catalog-wide frame
+                    # carries NaN for columns other destinations have
+                    **records[pos],
+                    'content': self.content[idx],
+                    'ml_score': float(final_scores[pos]),
+                    'scores': {
+                        'preference': float(pref_scores[pos]),
+                        'distance': float(dist_scores[pos]),
+                        'budget': float(budget_scores[pos])
+                    }
+                })
+            results.append(top_picks)
             
-        return top_picks
+        return results
+
+    def _distance_scores(self, context, start, stop):
+        # Attractions often lack lat/lon in this dataset, those stay neutral (0.5)
+        dist_scores = np.full(stop - start, 0.5)
+        if context.get('user_lat'):
+            lat = self.lat[start:stop]
+            located = ~np.isnan(lat)
+            d = self._haversine(context['user_lat'], context['user_lon'], lat[located], self.lon[start:stop][located])
+            dist_scores[located] = np.exp(-(d/50)**2) # Gaussian decay
+        return dist_scores
 
     def allocate_itinerary(self, places, days):
         """
         Groups selected places into 'days'.
-        If lat/lon exists, use clustering. Otherwise, simple chunking.
+        If lat/lon exists, use the balanced day planner. Otherwise, simple chunking.
         """
         if not places or days < 1: return {}
         
-        # Check if we have valid coordinates for at least 50% of places
-        has_coords = sum(1 for p in places if p.get('lat') and p.get('lon'))
-        use_clustering = has_coords > (len(places) / 2)
+        # Capacity-balanced geographic split with walkable in-day order,
+        # cached per place set (None if fewer than half the places have coords)
+        try:
+            day_groups = allocate_days(places, days)
+            if day_groups:
+                return day_groups
+        except Exception as e:
+            print(f"Day planner failed, chunking instead: {e}")
         
         day_groups = {}
-        
-        if use_clustering:
-            try:
-                coords = [[p.get('lat', 0), p.get('lon', 0)] for p in places]
-                k = min(len(places), days)
-                # Lazy import to avoid circular dependency if called earlier
-                from sklearn.cluster import KMeans
-                day_kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-                labels = day_kmeans.fit_predict(coords)
-                
-                for idx, label in enumerate(labels):
-                    day_num = int(label) + 1
-                    if day_num not in day_groups: day_groups[day_num] = []
-                    day_groups[day_num].append(places[idx])
-                return day_groups
-            except Exception as e:
-                pass # Fallback to chunking
                 
         # Fallback: Simple chunking
         # Distribute places evenly across days
@@ -139,19 +349,103 @@ class ContentRecommender:
                 
         return day_groups
 
-def get_recommendations(destination, preferences, days=3, budget=5000):
+_model_lock = threading.Lock()
+_refit_lock = threading.Lock()
+_model = (None, None)  # (catalog version() it is in sync with, ContentRecommender)
+
+def _load_trained():
+    trained, _ = load_artifact("recommender")
+    # Models trained before fingerprints were digests would re-append everything
+    if trained is not None and not all(isinstance(f, str) for f in trained.fingerprints.values()):
+        print("Recommender artifact predates the current format, fitting instead (re-run train_models)")
+        return None
+    return trained
+
+def _refit(catalog):
+    global _model
     try:
-        # Resolve path relative to this file
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        data_path = os.path.join(base_dir, '../data/processed/database.json')
+        version = catalog.version()
+        fresh = ContentRecommender().train_catalog(catalog.iter_places())
+        with _model_lock:
+            # Changes since `version` are appended again by the next sync
+            _model = (version, fresh)
+    except Exception as e:
+        print(f"Error refitting recommender: {e}")
+    finally:
+        _refit_lock.release()
 
-        if not os.path.exists(data_path):
-            return []
+def _sync(model, catalog, since):
+    """
+    Append destinations that are new or changed since the catalog version
+    `since`; returns (current version, model).
 
-        with open(data_path, 'r', encoding='utf-8') as f:
-            all_places = json.load(f)
-            
-        destination_obj = next((p for p in all_places if p['place_name'].lower() == destination.lower()), None)
+    The catalog works out what changed from its change log (or, for the
+    mmap backend after a compaction, from the fingerprints stored in the
+    snapshot), so this costs O(changes), not O(catalog).
+    """
+    version, changed = catalog.changed_destinations(since, model.fingerprints)
+    if changed:
+        model = model.extend(changed)
+        print(f"Recommender: appended {len(changed)} destination(s), {model.appended_rows} rows since last fit")
+    return version, model
+
+def get_catalog_recommender():
+    """
+    Shared catalog-wide recommender.
+
+    Loaded (memory-mapped) from the current trained artifact when there is
+    one (python -m ml_engine.train_models), otherwise fitted synchronously
+    the first time, streaming the catalog; warmup does either at boot. When
+    the catalog changes afterwards (e.g. a destination auto-added by
+    plan-trip), only the new or changed destinations are vectorized and
+    appended (see extend). Once RECOMMENDER_MAX_APPENDED_ROWS rows have
+    been appended, a background thread refits the whole catalog while the
+    current model keeps serving.
+    """
+    global _model
+    catalog = get_catalog()
+    version = catalog.version()
+    synced_with, model = _model
+    if synced_with is version:
+        return model
+    with _model_lock:
+        synced_with, model = _model
+        if synced_with is not version:
+            if model is None:
+                model = _load_trained()
+                if model is None:
+                    synced_with = version
+                    model = ContentRecommender().train_catalog(catalog.iter_places())
+            _model = _sync(model, catalog, synced_with)
+            model = _model[1]
+    if getattr(model, 'appended_rows', 0) > RECOMMENDER_MAX_APPENDED_ROWS and _refit_lock.acquire(blocking=False):
+        threading.Thread(target=_refit, args=(catalog,), name="recommender-refit", daemon=True).start()
+    return model
+
+def _resolve(destination_obj):
+    """
+    (recommender, rows) to score a destination with: its slice of the shared
+    model (new/changed destinations are appended to it on sync), or a model
+    fitted on just its attractions if the catalog changed again in between.
+    """
+    attractions_data = destination_obj.get('attractions', [])
+    recommender = get_catalog_recommender()
+    key = normalize_name(destination_obj.get('place_name'))
+    rows = recommender.ranges.get(key)
+    if rows is None or recommender.fingerprints.get(key) != destination_fingerprint(destination_obj):
+        recommender = ContentRecommender()
+        recommender.train(attractions_data)
+        rows = None
+    return recommender, rows
+
+def _profile(preferences):
+    # User profile is just the preferences string for now
+    return " ".join(preferences) if isinstance(preferences, list) else str(preferences)
+
+def get_recommendations(destination, preferences, days=3, budget=5000, people=1):
+    try:
+        # Shared with the request path; resolves aliases and misspellings too
+        destination_obj = get_catalog().find(destination)
         
         if not destination_obj:
             return []
@@ -160,21 +454,76 @@ def get_recommendations(destination, preferences, days=3, budget=5000):
         if not attractions_data:
             return []
             
-        recommender = ContentRecommender()
-        recommender.train(attractions_data)
+        recommender, rows = _resolve(destination_obj)
         
         context = {
             'user_lat': None, 
             'user_lon': None,
             'budget': budget,
-            'days': days
+            'days': days,
+            'people': people
         }
         
-        # User profile is just the preferences string for now
-        user_profile = " ".join(preferences) if isinstance(preferences, list) else str(preferences)
-        
-        return recommender.recommend(user_profile, context)
+        return recommender.recommend(_profile(preferences), context, rows=rows, records=attractions_data)
         
     except Exception as e:
         print(f"Error getting recommendations: {e}")
         return []
+
+def get_recommendations_batch(requests, top_n=15):
+    """
+    Recommendations for many (destination, preferences) requests.
+
+    Requests for the same destination are scored together: one transform of
+    all their preference strings and one sparse product against that
+    destination's rows of the shared model.
+
+    Args:
+        requests: Dicts with destination, preferences, days, budget, people
+        top_n: Recommendations per request
+
+    Yields:
+        {"index", "destination", "place_name", "recommendations"} per
+        request (grouped by destination, not in input order); an "error"
+        key instead of results when the destination is unknown
+    """
+    catalog = get_catalog()
+    found = {}
+    groups = {}
+    for index, req in enumerate(requests):
+        name = req.get('destination')
+        if name not in found:
+            found[name] = catalog.find(name)
+        destination_obj = found[name]
+        key = normalize_name(destination_obj.get('place_name')) if destination_obj else None
+        groups.setdefault(key, (destination_obj, []))[1].append(index)
+
+    for key, (destination_obj, indices) in groups.items():
+        if destination_obj is None or not destination_obj.get('attractions'):
+            for index in indices:
+                result = {"index": index, "destination": requests[index].get('destination'),
+                          "place_name": destination_obj.get('place_name') if destination_obj else None,
+                          "recommendations": []}
+                if destination_obj is None:
+                    result["error"] = "Unknown destination"
+                yield result
+            continue
+
+        try:
+            recommender, rows = _resolve(destination_obj)
+            contexts = [{
+                'user_lat': None,
+                'user_lon': None,
+                'budget': requests[i].get('budget', 5000),
+                'days': requests[i].get('days', 3),
+                'people': requests[i].get('people', 1)
+            } for i in indices]
+            profiles = [_profile(requests[i].get('preferences', [])) for i in indices]
+            results = recommender.recommend_many(profiles, contexts, top_n, rows, destination_obj['attractions'])
+        except Exception as e:
+            print(f"Error getting batch recommendations for {key}: {e}")
+            results = [[] for _ in indices]
+
+        for index, recs in zip(indices, results):
+            yield {"index": index, "destination": requests[index].get('destination'),
+                   "place_name": destination_obj.get('place_name'), "recommendations": recs}
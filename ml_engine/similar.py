@@ -0,0 +1,182 @@
+"""
+Similar attractions - offline top-k "more like this" table
+For every attraction in the catalog, the k others that are closest in
+TF-IDF content and geography, computed once by train_models and stored as
+an int32 neighbour table plus float32 scores (one row per attraction).
+A lookup is a dict hit and a k-element slice; no model runs per request.
+
+Catalog attractions carry no lat/lon today, so in practice the geographic
+term is a flat GEO_WEIGHT (0.3) bonus for attractions of the same
+destination; distance only matters for rows that do have coordinates.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from ml_engine.artifacts import load_artifact
+from services.catalog import normalize_name
+
+SIMILAR_TOP_K = int(os.getenv("SIMILAR_TOP_K", "10"))
+# Blend of content similarity and geographic proximity
+TEXT_WEIGHT = 0.7
+GEO_WEIGHT = 0.3
+# Proximity halves roughly every 17 km (exp(-km / 25))
+GEO_SCALE_KM = 25.0
+# Attractions scored against the whole catalog per step (bounds peak memory)
+BLOCK_ROWS = 512
+
+class SimilarityIndex:
+    def __init__(self, spots, neighbors, scores):
+        """
+        Args:
+            spots: (spot_id, spot_name, place_name) per row; None for rows
+                without a spot id (never looked up or returned)
+            neighbors: int32 (rows, k) row indices, best first, -1 padded
+            scores: float32 (rows, k) blended similarity of each neighbour
+        """
+        self.spots = spots
+        self.neighbors = neighbors
+        self.scores = scores
+        self.rows = {spot[0]: row for row, spot in enumerate(spots) if spot is not None}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Plain ndarray views of the memory-mapped tables: same pages, without
+        # np.memmap's per-slice overhead on the lookup path
+        self.neighbors = np.asarray(self.neighbors)
+        self.scores = np.asarray(self.scores)
+
+    def __len__(self):
+        return len(self.spots)
+
+    def similar(self, spot_id, k=None):
+        """
+        Most similar attractions to spot_id.
+
+        Returns:
+            [{spot_id, spot_name, place_name, score}] (at most k), or None
+            if the attraction is not in the index
+        """
+        row = self.rows.get(str(spot_id))
+        if row is None:
+            return None
+        k = self.neighbors.shape[1] if k is None else max(0, min(int(k), self.neighbors.shape[1]))
+        results = []
+        for neighbor, score in zip(self.neighbors[row, :k].tolist(), self.scores[row, :k].tolist()):
+            if neighbor < 0:
+                break
+            if self.spots[neighbor] is None:
+                continue
+            other_id, spot_name, place_name = self.spots[neighbor]
+            results.append({'spot_id': other_id, 'spot_name': spot_name, 'place_name': place_name,
+                            'score': round(score, 4)})
+        return results
+
+def _unit_vectors(lat, lon):
+    """Points on the unit sphere (NaN rows where there is no coordinate)."""
+    phi, lam = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)]).astype(np.float32)
+
+def _proximity(xyz, dest, rows):
+    """exp(-km / GEO_SCALE_KM) from each of rows to every attraction; same destination counts as 1 when unlocated."""
+    # Chord length between unit vectors: one small matmul per block, and the
+    # same as the great-circle distance at the scales where proximity matters
+    km = 6371 * np.sqrt(np.maximum(2 - 2 * (xyz[rows] @ xyz.T), 0))
+    same_destination = (dest[rows][:, None] == dest[None, :]).astype(np.float32)
+    return np.where(np.isnan(km), same_destination, np.exp(-km / GEO_SCALE_KM))
+
+def build_similarity_index(recommender, places, k=SIMILAR_TOP_K, workers=None):
+    """
+    Top-k neighbour table over a catalog-wide recommender.
+
+    Args:
+        recommender: ContentRecommender fitted with train_catalog(places)
+        places: The destinations it was fitted on (for spot ids and names)
+        k: Neighbours kept per attraction
+        workers: Threads scoring blocks in parallel (default: per core)
+
+    Returns:
+        SimilarityIndex (empty if the recommender has no rows)
+    """
+    n = recommender.tfidf_matrix.shape[0] if recommender.tfidf_matrix is not None else 0
+    spots = [None] * n
+    dest = np.full(n, -1, dtype=np.int32)
+    seen = set()
+    for number, place in enumerate(places):
+        key = normalize_name(place.get('place_name'))
+        if key in seen or key not in recommender.ranges:
+            continue
+        seen.add(key)
+        start, stop = recommender.ranges[key]
+        dest[start:stop] = number
+        for row, spot in enumerate(place.get('attractions') or [], start=start):
+            # Attractions without an id cannot be looked up; their rows stay None
+            if spot.get('spot_id') is not None:
+                spots[row] = (str(spot.get('spot_id')), spot.get('spot_name'), place.get('place_name'))
+    missing = np.array([spot is None for spot in spots], dtype=bool)
+
+    k = max(0, min(k, n - 1))
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if k == 0:
+        return SimilarityIndex(spots, neighbors, scores)
+
+    # TF-IDF rows are L2-normalised, so the sparse product is cosine similarity
+    matrix = recommender.tfidf_matrix.tocsr().astype(np.float32)
+    xyz = _unit_vectors(recommender.lat, recommender.lon)
+    def score_block(start):
+        rows = np.arange(start, min(start + BLOCK_ROWS, n))
+        blended = TEXT_WEIGHT * (matrix[rows] @ matrix.T).toarray()
+        blended += GEO_WEIGHT * _proximity(xyz, dest, rows)
+        blended[np.arange(len(rows)), rows] = -np.inf
+        blended[:, missing] = -np.inf
+
+        # Unordered top-k per row, then sorted best first (lower row wins ties)
+        top = np.sort(np.argpartition(-blended, k - 1, axis=1)[:, :k], axis=1)
+        top_scores = np.take_along_axis(blended, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        # Nothing in common at all (no shared terms, far apart) is not "similar"
+        keep = top_scores > 0
+        neighbors[rows] = np.where(keep, top, -1)
+        scores[rows] = np.where(keep, top_scores, 0)
+
+    # Blocks write disjoint rows; NumPy/SciPy release the GIL for the heavy parts
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(score_block, range(0, n, BLOCK_ROWS)))
+
+    return SimilarityIndex(spots, neighbors, scores)
+
+_index_lock = threading.Lock()
+_index = None
+
+def get_similarity_index():
+    """Neighbour table from the current model artifacts (None if not trained yet)."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                trained, _ = load_artifact("similar")
+                _index = trained or False
+    return _index or None
+
+def get_similar_attractions(spot_id, k=SIMILAR_TOP_K):
+    """
+    Attractions most like spot_id, from the precomputed table.
+
+    Returns:
+        List of {spot_id, spot_name, place_name, score}; None when there is
+        no trained table or the spot is not in it
+    """
+    try:
+        index = get_similarity_index()
+        if index is None:
+            return None
+        return index.similar(spot_id, k)
+    except Exception as e:
+        print(f"Error looking up similar attractions: {e}")
+        return None
@@ -1,84 +1,137 @@
-import json
+"""
+Offline training: fit the recommender and per-destination clustering models,
+precompute the similar-attractions table, and write them as a new versioned
+artifact set (see ml_engine/artifacts.py).
+
+    python -m ml_engine.train_models [--db data/processed/database.json] [--workers N]
+
+The web process loads the current version memory-mapped at startup instead
+of fitting anything itself.
+"""
 import os
-import pandas as pd
-import pickle
-from clustering import PlaceClustering
-from recommender import ContentRecommender
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from ml_engine.clustering import PlaceClustering
+from ml_engine.recommender import ContentRecommender
+from ml_engine.similar import build_similarity_index
+from ml_engine.artifacts import save_artifacts, set_current_version, MODEL_DIR
+from services.catalog import get_catalog, normalize_name
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(BASE_DIR, '../data/processed/database.json')
-MODEL_DIR = os.path.join(BASE_DIR, 'models')
 
-def load_data():
-    if not os.path.exists(DATA_PATH):
-        raise FileNotFoundError(f"Processed data not found at {DATA_PATH}. Run ingestion first.")
-    
-    with open(DATA_PATH, 'r') as f:
-        data = json.load(f)
-    return data
+def load_catalog(db_path=DATA_PATH):
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Processed data not found at {db_path}. Run `python -m services.ingest` first.")
+    # Through the catalog so pending change-log entries are included
+    return get_catalog(db_path)
+
+def _has_coords(spot):
+    try:
+        return bool(float(spot.get('lat')) and float(spot.get('lon')))
+    except (TypeError, ValueError):
+        return False
+
+def fit_recommender(db_path):
+    # Streams the catalog in the worker (one destination at a time on the
+    # mmap backend) instead of receiving all of it pickled from the parent
+    return ContentRecommender().train_catalog(load_catalog(db_path).iter_places())
+
+def clustering_input(place):
+    """(name key, located spots as id + coordinates) if the destination has >= 2 of them, else None."""
+    spots = [{'spot_id': s.get('spot_id'), 'lat': s.get('lat'), 'lon': s.get('lon')}
+             for s in place.get('attractions') or [] if _has_coords(s)]
+    if len(spots) < 2:
+        return None
+    return normalize_name(place.get('place_name')), spots
+
+def fit_clustering(item):
+    """Geographic clusters of one destination's located attractions."""
+    key, spots = item
+    clustering = PlaceClustering(n_clusters=min(5, len(spots)))
+    clustering.train(spots, id_key='spot_id')
+    return key, clustering
 
-def train():
+def train(db_path=DATA_PATH, workers=None, model_dir=MODEL_DIR):
     print("Loading data...")
-    print(f"Reading from: {DATA_PATH}")
+    print(f"Reading from: {db_path}")
     
     try:
-        raw_data = load_data()
+        catalog = load_catalog(db_path)
     except FileNotFoundError as e:
         print(f"Error: {e}")
-        return
-
-    # Flatten data for ML
-    places_list = []
-    for place in raw_data:
-        places_list.append({
-            'name': place['place_name'],
-            'lat': 19.0760, # Placeholder defaults if missing in raw txt
-            'lon': 72.8777,
-            'category': 'Tourist Attraction', # Default
-            'description': place.get('description', '')
-        })
-        
-    print(f"Training on {len(places_list)} places...")
-    
-    # 1. Train Clustering Model
-    print("Training K-Means Clustering...")
-    # Add dummy lat/lon if not properly geocoded yet, just to show it works
-    # In real pipeline, ingestor.js should ensure these exist
-    clustering = PlaceClustering(n_clusters=min(5, len(places_list)))
-    # For demo, generate fake lat/lon if missing (since places.txt didn't have coords)
-    for i, p in enumerate(places_list):
-        p['lat'] = 19.0 + (i * 0.01) 
-        p['lon'] = 73.0 + (i * 0.01)
-
-    clustered_df = clustering.train(places_list)
-    print("Clustering complete.")
-    print(clustered_df[['name', 'cluster']].head())
-
-    # 2. Train Recommender
-    print("Training Content Recommender...")
-    recommender = ContentRecommender()
-    recommender.train(places_list)
-    print("Recommender trained.")
-    
-    # Test Recommendation
-    test_place = places_list[0]['name']
-    print(f"Recommendations for '{test_place}':")
-    recs = recommender.get_recommendations(test_place)
-    for r in recs:
-        print(f"- {r['name']}")
-
-    # Save Models (Optional - placeholder for pickle logic)
-    if not os.path.exists(MODEL_DIR):
-        os.makedirs(MODEL_DIR)
-        
-    with open(os.path.join(MODEL_DIR, 'kmeans.pkl'), 'wb') as f:
-        pickle.dump(clustering, f)
-        
-    with open(os.path.join(MODEL_DIR, 'tfidf.pkl'), 'wb') as f:
-        pickle.dump(recommender, f)
-        
-    print(f"Models saved to {MODEL_DIR}")
+        return None
+
+    started = time.perf_counter()
+
+    # The recommender is one catalog-wide fit; clustering is one fit per
+    # destination. All of it runs in parallel across cores. The catalog is
+    # read one destination at a time and only what each job needs is kept.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        recommender_job = pool.submit(fit_recommender, db_path)
+
+        destinations = attractions = 0
+        digest = hashlib.blake2b(digest_size=16)
+        sample = None
+        inputs = []
+        for place in catalog.iter_places():
+            destinations += 1
+            attractions += len(place.get('attractions') or [])
+            digest.update(json.dumps(place, sort_keys=True, default=str).encode("utf-8"))
+            if sample is None and place.get('attractions'):
+                sample = place
+            item = clustering_input(place)
+            if item is not None:
+                inputs.append(item)
+        print(f"Training on {destinations} destinations / {attractions} attractions...")
+
+        chunksize = max(1, len(inputs) // (4 * (workers or os.cpu_count() or 1)))
+        clusterings = dict(pool.map(fit_clustering, inputs, chunksize=chunksize))
+        recommender = recommender_job.result()
+
+    print(f"Recommender trained ({len(recommender.ranges)} destinations), "
+          f"{len(clusterings)} destinations clustered in {time.perf_counter() - started:.1f}s")
+
+    # "More like this" table from the fitted TF-IDF rows
+    started = time.perf_counter()
+    similar = build_similarity_index(recommender, catalog.iter_places(), workers=workers)
+    print(f"Similar attractions: top {similar.neighbors.shape[1]} for {len(similar)} attractions "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    # Sanity check: score one destination with the freshly fitted model
+    if sample:
+        key = normalize_name(sample['place_name'])
+        recs = recommender.recommend("sightseeing", {}, top_n=3, rows=recommender.ranges[key],
+                                     records=sample['attractions'])
+        print(f"Recommendations for '{sample['place_name']}':")
+        for r in recs:
+            print(f"- {r.get('spot_name')}")
+
+    version = save_artifacts(
+        {"recommender": recommender, "clustering": clusterings, "similar": similar},
+        {"catalog_digest": digest.hexdigest(), "destinations": destinations, "attractions": attractions},
+        model_dir,
+    )
+    print(f"Models saved to {os.path.join(model_dir, version)} (now current)")
+    return version
 
 if __name__ == "__main__":
-    train()
+    parser = argparse.ArgumentParser(description="Train and version the recommender / clustering models")
+    parser.add_argument("--db", default=DATA_PATH, help="Catalog to train on")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--rollback", nargs="?", const="", metavar="VERSION",
+                        help="Make VERSION (default: the previous one) current instead of training")
+    args = parser.parse_args()
+    if args.rollback is not None:
+        try:
+            print(f"Now serving models {set_current_version(args.rollback or None, args.model_dir)}")
+        except ValueError as e:
+            parser.error(str(e))
+    else:
+        train(os.path.realpath(args.db), args.workers, args.model_dir)
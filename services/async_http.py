@@ -0,0 +1,41 @@
+"""
+Async HTTP - Shared httpx client for the asyncio serving mode
+One pooled client per event loop, so hundreds of concurrent plans reuse
+a bounded set of keep-alive connections instead of one thread each.
+"""
+import os
+import asyncio
+import weakref
+
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_client():
+    """
+    Get the httpx.AsyncClient bound to the running event loop.
+
+    Returns:
+        httpx.AsyncClient instance
+    """
+    # Imported lazily so the threaded Flask app never pays for httpx
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=float(os.getenv("ASYNC_HTTP_TIMEOUT", "30")),
+            limits=httpx.Limits(
+                max_connections=int(os.getenv("ASYNC_HTTP_MAX_CONNECTIONS", "200")),
+                max_keepalive_connections=int(os.getenv("ASYNC_HTTP_MAX_KEEPALIVE", "50")),
+            ),
+        )
+        _clients[loop] = client
+    return client
+
+
+async def close_async_client():
+    """Close the client bound to the running event loop, if any."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
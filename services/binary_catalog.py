@@ -0,0 +1,331 @@
+"""
+Binary Catalog - Memory-mapped, lazily decoded catalog snapshot
+database.bin holds every destination as its own compact JSON record plus a
+fixed-width offset table and a small key directory. Workers mmap the file
+read-only, so the OS shares its pages between processes, and a record is
+only decoded when a request touches that destination.
+
+Layout (little-endian):
+    header   magic(8) digest(16) count(u32) table_offset(u64) dir_offset(u64) dir_length(u64)
+    records  count x compact JSON destination
+    table    count x (offset u64, length u32)
+    dir      JSON {names, place_ids, aliases, spots, fingerprints, max_place_id, max_spot_id}
+
+Select with CATALOG_BACKEND=mmap. Upserts still go to the JSON change log
+(applied on top of the mapped snapshot); the .bin is rewritten atomically
+whenever the JSON snapshot is (compaction or a full save).
+"""
+import os
+import json
+import mmap
+import struct
+import logging
+from collections.abc import Sequence
+
+from services.catalog import (
+    Catalog, normalize_name, as_int, content_hash, _atomic_write, attractions_fingerprint, is_stale
+)
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"TSCAT\x00\x01\x00"
+HEADER = struct.Struct("<8s16sIQQQ")
+TABLE_ENTRY = struct.Struct("<QI")
+
+
+def write_binary_snapshot(places: list, path: str, digest: str):
+    """
+    Write places as a binary snapshot at path (temp file + rename).
+
+    Args:
+        places: Destination dicts, in catalog order
+        path: Target .bin path
+        digest: content_hash of the JSON snapshot these places came from
+    """
+    records, table = [], []
+    names, place_ids, aliases, spots, fingerprints = [], [], {}, {}, []
+    max_place_id = max_spot_id = 0
+    offset = HEADER.size
+
+    for i, place in enumerate(places):
+        record = json.dumps(place, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        records.append(record)
+        table.append(TABLE_ENTRY.pack(offset, len(record)))
+        offset += len(record)
+
+        names.append(place.get("place_name"))
+        place_ids.append(None if place.get("place_id") is None else str(place["place_id"]))
+        max_place_id = max(max_place_id, as_int(place.get("place_id")))
+        if place.get("aliases"):
+            aliases[str(i)] = list(place["aliases"])
+        # Lets workers tell which destinations a model must re-read without decoding them
+        fingerprints.append(attractions_fingerprint(place["attractions"]) if place.get("attractions") else None)
+        for attraction in place.get("attractions") or []:
+            if attraction.get("spot_id") is not None:
+                spots.setdefault(str(attraction["spot_id"]), i)
+                max_spot_id = max(max_spot_id, as_int(attraction["spot_id"]))
+
+    directory = json.dumps({
+        "names": names,
+        "place_ids": place_ids,
+        "aliases": aliases,
+        "spots": spots,
+        "fingerprints": fingerprints,
+        "max_place_id": max_place_id,
+        "max_spot_id": max_spot_id,
+    }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    table_offset = offset
+    dir_offset = table_offset + TABLE_ENTRY.size * len(table)
+    header = HEADER.pack(MAGIC, bytes.fromhex(digest), len(records), table_offset, dir_offset, len(directory))
+    _atomic_write(path, b"".join([header] + records + table + [directory]))
+
+
+class BinaryView:
+    """One mapping of a .bin file; decoded records are cached per process."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, digest, count, table_offset, dir_offset, dir_length = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+
+        self.digest = digest.hex()
+        self.count = count
+        self._table_offset = table_offset
+        directory = json.loads(self._mm[dir_offset:dir_offset + dir_length])
+        self.names = directory["names"]
+        self.place_ids = directory["place_ids"]
+        self.aliases = {int(i): names for i, names in directory["aliases"].items()}
+        self.spots = directory["spots"]
+        # Absent in snapshots written before fingerprints were recorded
+        self.fingerprints = directory.get("fingerprints")
+        self.max_place_id = directory["max_place_id"]
+        self.max_spot_id = directory["max_spot_id"]
+
+        self.by_name, self.by_place_id = {}, {}
+        for i, (name, place_id) in enumerate(zip(self.names, self.place_ids)):
+            self.by_name.setdefault(normalize_name(name), i)
+            if place_id is not None:
+                self.by_place_id.setdefault(place_id, i)
+        self._decoded = {}
+
+    def decode(self, i: int) -> dict:
+        """Record i, freshly decoded and not cached (for one-pass scans)."""
+        offset, length = TABLE_ENTRY.unpack_from(self._mm, self._table_offset + i * TABLE_ENTRY.size)
+        return json.loads(self._mm[offset:offset + length])
+
+    def record(self, i: int) -> dict:
+        place = self._decoded.get(i)
+        if place is None:
+            place = self._decoded.setdefault(i, self.decode(i))
+        return place
+
+    @property
+    def decoded(self) -> int:
+        return len(self._decoded)
+
+
+class _LazyPlaces(Sequence):
+    """Catalog-ordered destinations, decoded on access."""
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return self._snapshot.view.count + len(self._snapshot.appended)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return self._snapshot.place_at(i)
+
+
+class _LazyIndex:
+    """Mapping-like key -> destination lookup used in place of a dict index."""
+
+    def __init__(self, lookup, keys):
+        self._lookup = lookup
+        self._keys = keys
+
+    def get(self, key, default=None):
+        value = self._lookup(key)
+        return default if value is None else value
+
+    def __contains__(self, key):
+        return self._keys(key)
+
+
+class BinaryCatalogSnapshot:
+    """
+    A mapped snapshot plus change-log overlay, shaped like CatalogSnapshot.
+
+    Overlay records are complete destinations keyed by normalized name;
+    with_upsert copies only the (small) overlay, never the mapped records.
+    """
+
+    def __init__(self, view: BinaryView, overlay: dict = None, appended: list = None):
+        self.view = view
+        self.digest = view.digest
+        # Same contract as CatalogSnapshot: the base is the mapped file, the
+        # overlay is exactly what was upserted on top of it
+        self.base_id = view
+        self.overlay = overlay or {}
+        self.appended = appended or []
+        self.places = _LazyPlaces(self)
+        self.by_name = _LazyIndex(self._get_by_name, lambda key: self._get_by_name(key) is not None)
+        self.by_place_id = _LazyIndex(self._get_by_place_id, self._has_place_id)
+        self.by_spot_id = _LazyIndex(self._get_spot, lambda key: self._get_spot(key) is not None)
+
+        self.max_place_id, self.max_spot_id = view.max_place_id, view.max_spot_id
+        for record in self.overlay.values():
+            self.max_place_id = max(self.max_place_id, as_int(record.get("place_id")))
+            for attraction in record.get("attractions") or []:
+                self.max_spot_id = max(self.max_spot_id, as_int(attraction.get("spot_id")))
+
+    def place_at(self, i: int) -> dict:
+        if i >= self.view.count:
+            return self.overlay[self.appended[i - self.view.count]]
+        return self.overlay.get(normalize_name(self.view.names[i])) or self.view.record(i)
+
+    def _get_by_name(self, key):
+        record = self.overlay.get(key)
+        if record is not None:
+            return record
+        i = self.view.by_name.get(key)
+        return None if i is None else self.view.record(i)
+
+    def _overlay_place_ids(self):
+        return {str(r.get("place_id")): r for r in self.overlay.values() if r.get("place_id") is not None}
+
+    def _get_by_place_id(self, place_id):
+        record = self._overlay_place_ids().get(place_id)
+        if record is not None:
+            return record
+        i = self.view.by_place_id.get(place_id)
+        return None if i is None else self.place_at(i)
+
+    def _has_place_id(self, place_id):
+        return place_id in self.view.by_place_id or place_id in self._overlay_place_ids()
+
+    def _get_spot(self, spot_id):
+        for record in self.overlay.values():
+            for attraction in record.get("attractions") or []:
+                if str(attraction.get("spot_id")) == spot_id:
+                    return attraction
+        i = self.view.spots.get(spot_id)
+        if i is None:
+            return None
+        return next((a for a in self.place_at(i).get("attractions") or [] if str(a.get("spot_id")) == spot_id), None)
+
+    def with_upsert(self, record: dict) -> "BinaryCatalogSnapshot":
+        key = normalize_name(record.get("place_name"))
+        if not key:
+            return self
+        overlay = dict(self.overlay)
+        appended = list(self.appended)
+        if key not in overlay and key not in self.view.by_name:
+            appended.append(key)
+        overlay[key] = record
+        return BinaryCatalogSnapshot(self.view, overlay, appended)
+
+    @property
+    def upserted(self) -> dict:
+        return self.overlay
+
+    def stale(self, fingerprints: dict) -> list:
+        """
+        Destinations whose attractions fingerprints does not match.
+
+        Mapped records are compared by the fingerprints stored in the
+        directory, so only the ones that differ are decoded.
+        """
+        stale = []
+        for key, i in self.view.by_name.items():
+            if key in self.overlay:
+                continue
+            if self.view.fingerprints is None:
+                place = self.view.record(i)
+                if is_stale(place, fingerprints):
+                    stale.append(place)
+            elif self.view.fingerprints[i] is not None and fingerprints.get(key) != self.view.fingerprints[i]:
+                stale.append(self.view.record(i))
+        stale.extend(record for record in self.overlay.values() if is_stale(record, fingerprints))
+        return stale
+
+    def iter_places(self):
+        """Every destination in catalog order; mapped records are decoded but not cached."""
+        for i, name in enumerate(self.view.names):
+            yield self.overlay.get(normalize_name(name)) or self.view.decode(i)
+        for key in self.appended:
+            yield self.overlay[key]
+
+    def name_entries(self):
+        """(place_name, place_id, own aliases) without decoding any record."""
+        for i, (name, place_id) in enumerate(zip(self.view.names, self.view.place_ids)):
+            record = self.overlay.get(normalize_name(name))
+            if record is not None:
+                yield record.get("place_name"), record.get("place_id"), record.get("aliases") or []
+            else:
+                yield name, place_id, self.view.aliases.get(i, [])
+        for key in self.appended:
+            record = self.overlay[key]
+            yield record.get("place_name"), record.get("place_id"), record.get("aliases") or []
+
+
+class MmapCatalog(Catalog):
+    """
+    Catalog backend that reads database.bin through mmap.
+
+    Same files and write path as the JSON backend (snapshot + change log),
+    but the base snapshot is the mapped .bin, so N workers share one copy
+    of the catalog in the page cache and each decodes only what it serves.
+    """
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self.watch_path = self.binary_path
+        self._ensure_binary()
+
+    def _ensure_binary(self):
+        # Build (or rebuild) the .bin from database.json when it is missing,
+        # older, or written before the directory held fingerprints
+        try:
+            json_mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        try:
+            if os.stat(self.binary_path).st_mtime_ns >= json_mtime and BinaryView(self.binary_path).fingerprints is not None:
+                return
+        except (OSError, ValueError):
+            pass
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        data = json.loads(raw)
+        write_binary_snapshot(data if isinstance(data, list) else [], self.binary_path, content_hash(raw))
+        logger.info(f"📦 Binary catalog snapshot written: {self.binary_path}")
+
+    def _probe_snapshot(self):
+        view = BinaryView(self.binary_path)
+        return view.digest, lambda: BinaryCatalogSnapshot(view)
+
+    def _written_snapshot(self, places: list, digest: str):
+        return BinaryCatalogSnapshot(BinaryView(self.binary_path))
+
+    def _name_entries(self):
+        return self.snapshot().name_entries()
+
+    def iter_places(self):
+        return self.snapshot().iter_places()
+
+    def _fuzzy_token(self):
+        return self.snapshot()
+
+    def _find_substring(self, key):
+        for place_name, _, _ in self.snapshot().name_entries():
+            if key in normalize_name(place_name):
+                return self.get_by_name(place_name)
+        return None
@@ -0,0 +1,612 @@
+"""
+Catalog - Process-wide, indexed view of the destination database
+Parsed once and shared by the request path and the recommender. The storage
+backend is pluggable: JSON (data/processed/database.json plus an append-only
+change log, the default) or SQLite (see services/sqlite_catalog.py), chosen
+with CATALOG_BACKEND or by the path handed to get_catalog().
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialised within a process
+    fcntl = None
+from services.fuzzy_match import TrigramIndex, load_aliases, normalize_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "../data/processed/database.json")
+DEFAULT_SQLITE_PATH = os.path.join(os.path.dirname(__file__), "../data/processed/catalog.db")
+
+CATALOG_BACKEND = os.getenv("CATALOG_BACKEND", "json").lower()
+# Overrides the backend's default file (e.g. a scratch copy for load tests)
+CATALOG_PATH = os.getenv("CATALOG_PATH")
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+# Fold the change log into the snapshot after this many upserts
+COMPACT_EVERY = int(os.getenv("CATALOG_COMPACT_EVERY", "50"))
+
+
+def normalize_name(name) -> str:
+    return str(name).strip().lower() if name else ""
+
+
+def content_hash(raw: bytes) -> str:
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def as_int(value) -> int:
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
+
+
+# Attraction fields that models built from the catalog depend on (text
+# features, coordinates, prices); see attractions_fingerprint
+FINGERPRINT_FIELDS = ('spot_name', 'place_name', 'category', 'description', 'lat', 'lon', 'dining', 'accommodation')
+
+
+def attractions_fingerprint(attractions) -> str:
+    """Digest of what models build a destination's rows from; any change means refit."""
+    raw = json.dumps([[a.get(f) for f in FINGERPRINT_FIELDS] for a in attractions or []],
+                     ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return content_hash(raw.encode("utf-8"))
+
+
+# name key -> (destination dict, fingerprint of its attractions)
+_fingerprints = {}
+
+
+def destination_fingerprint(place: dict) -> str:
+    """attractions_fingerprint of place, memoised while the same dict is passed in."""
+    key = normalize_name(place.get("place_name"))
+    cached = _fingerprints.get(key)
+    if cached is None or cached[0] is not place:
+        cached = (place, attractions_fingerprint(place.get("attractions")))
+        _fingerprints[key] = cached
+    return cached[1]
+
+
+def is_stale(place: dict, fingerprints: dict) -> bool:
+    """True if place has attractions that fingerprints (name key -> digest) does not match."""
+    key = normalize_name(place.get("place_name"))
+    return bool(key and place.get("attractions")) and fingerprints.get(key) != destination_fingerprint(place)
+
+
+def upserted_since(snapshot, previous):
+    """
+    Destinations upserted into snapshot after previous.
+
+    Returns:
+        List of destination dicts, or None when the two do not share a base
+        (reload, compaction, full save) and the caller has to compare
+        everything
+    """
+    if previous is None or getattr(previous, "base_id", None) is not snapshot.base_id:
+        return None
+    return [record for key, record in snapshot.upserted.items() if previous.upserted.get(key) is not record]
+
+
+def merge_destination(existing: dict, destination: dict) -> dict:
+    """Overlay destination on existing, keeping attractions unless replaced."""
+    merged = existing.copy()
+    merged.update(destination)
+    if "attractions" not in destination:
+        merged["attractions"] = existing.get("attractions", [])
+    return merged
+
+
+def prepare_new_destination(destination: dict, max_place_id: int, max_spot_id: int, place_id_taken) -> dict:
+    """
+    Fill defaults for a destination about to be inserted.
+
+    IDs from build_destination_from_api are computed before the backend's
+    write lock is taken; if a concurrent insert already used the place_id,
+    the place and its attractions are re-numbered after the current maxima.
+    """
+    if destination.get("place_id") is None:
+        destination["place_id"] = str(max_place_id + 1)
+    elif place_id_taken(str(destination["place_id"])):
+        place_id = str(max_place_id + 1)
+        destination["place_id"] = place_id
+        for offset, attraction in enumerate(destination.get("attractions") or []):
+            attraction["place_id"] = place_id
+            attraction["spot_id"] = str(max_spot_id + 1 + offset)
+
+    destination["state"] = destination.get("state", "Unknown")
+    destination["description"] = destination.get("description", "")
+    destination["attractions"] = destination.get("attractions", [])
+    return destination
+
+
+class CatalogSnapshot:
+    """Immutable set of destinations plus lookup indexes."""
+
+    def __init__(self, places: list, digest: str = ""):
+        self.places = places
+        self.digest = digest
+        self.by_name = {}
+        self.by_place_id = {}
+        self.by_spot_id = {}
+        self.max_place_id = 0
+        self.max_spot_id = 0
+        self._positions = {}
+        # Identity of the file contents this snapshot was loaded from, and
+        # the records upserted on top of them since (see upserted_since)
+        self.base_id = object()
+        self.upserted = {}
+
+        for position, place in enumerate(places):
+            name_key = normalize_name(place.get("place_name"))
+            # First entry wins, matching the old linear scan
+            if name_key and name_key not in self.by_name:
+                self.by_name[name_key] = place
+                self._positions[name_key] = position
+            self._index_ids(place, overwrite=False)
+
+    def _index_ids(self, place, overwrite=True):
+        def put(index, key, value):
+            if overwrite or key not in index:
+                index[key] = value
+
+        if place.get("place_id") is not None:
+            put(self.by_place_id, str(place["place_id"]), place)
+            self.max_place_id = max(self.max_place_id, as_int(place["place_id"]))
+        for attraction in place.get("attractions") or []:
+            if attraction.get("spot_id") is not None:
+                put(self.by_spot_id, str(attraction["spot_id"]), attraction)
+                self.max_spot_id = max(self.max_spot_id, as_int(attraction["spot_id"]))
+
+    def with_upsert(self, record: dict) -> "CatalogSnapshot":
+        """
+        Return a new snapshot with record replacing the destination of the
+        same name (or appended). Only record's own entries are re-indexed.
+        """
+        name_key = normalize_name(record.get("place_name"))
+        if not name_key:
+            return self
+
+        new = CatalogSnapshot.__new__(CatalogSnapshot)
+        new.digest = self.digest
+        new.places = list(self.places)
+        new.by_name = dict(self.by_name)
+        new.by_place_id = dict(self.by_place_id)
+        new.by_spot_id = dict(self.by_spot_id)
+        new.max_place_id = self.max_place_id
+        new.max_spot_id = self.max_spot_id
+        new._positions = dict(self._positions)
+        new.base_id = self.base_id
+        new.upserted = dict(self.upserted)
+        new.upserted[name_key] = record
+
+        old = self.by_name.get(name_key)
+        if old is not None:
+            new.places[self._positions[name_key]] = record
+            if new.by_place_id.get(str(old.get("place_id"))) is old:
+                del new.by_place_id[str(old.get("place_id"))]
+            for attraction in old.get("attractions") or []:
+                spot_key = str(attraction.get("spot_id"))
+                if new.by_spot_id.get(spot_key) is attraction:
+                    del new.by_spot_id[spot_key]
+        else:
+            new._positions[name_key] = len(new.places)
+            new.places.append(record)
+
+        new.by_name[name_key] = record
+        new._index_ids(record)
+        return new
+
+    def stale(self, fingerprints: dict) -> list:
+        """Destinations (first of each name) whose attractions fingerprints does not match."""
+        return [place for place in self.by_name.values() if is_stale(place, fingerprints)]
+
+
+def changelog_path(db_path: str) -> str:
+    """Append-only upsert log that sits next to the snapshot file."""
+    return f"{db_path}.log"
+
+
+def lock_path(db_path: str) -> str:
+    """Sidecar file flock()ed by writers in every worker process."""
+    return f"{db_path}.lock"
+
+
+def binary_snapshot_path(db_path: str) -> str:
+    """Memory-mappable copy of the snapshot (see services/binary_catalog.py)."""
+    return f"{os.path.splitext(db_path)[0]}.bin"
+
+
+def _atomic_write(path, raw):
+    """Write raw to path via a temp file + rename, so readers never see a partial file."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CatalogBase:
+    """Name resolution shared by every backend (needs places, get_by_name, _find_substring)."""
+
+    _fuzzy = (None, None, None)
+
+    def _name_entries(self):
+        """(place_name, place_id, own aliases) for every destination."""
+        return ((p.get("place_name"), p.get("place_id"), p.get("aliases") or []) for p in self.places)
+
+    def _fuzzy_token(self):
+        # Any object that changes identity whenever the set of names may have changed
+        return self.places
+
+    def fuzzy_index(self) -> TrigramIndex:
+        """Trigram index over names + aliases, rebuilt only when either changes."""
+        token = self._fuzzy_token()
+        aliases = load_aliases()
+        cached_token, cached_aliases, index = self._fuzzy
+        if cached_token is not token or cached_aliases is not aliases:
+            index = TrigramIndex.from_entries(self._name_entries(), aliases)
+            self._fuzzy = (token, aliases, index)
+        return index
+
+    def search(self, name, limit=5, threshold=None) -> list:
+        """Ranked fuzzy matches for name: [(destination, similarity)]."""
+        return [(self.get_by_name(key), score) for key, score, _ in self.fuzzy_index().search(name, limit, threshold)]
+
+    def version(self):
+        """Object that changes identity whenever the catalog's contents may have."""
+        return self.places
+
+    def iter_places(self):
+        """Every destination in catalog order (backends that can, decode them one at a time)."""
+        return iter(self.places)
+
+    def changed_destinations(self, since, fingerprints: dict):
+        """
+        Destinations whose attractions differ from what the caller built from.
+
+        Args:
+            since: version() returned by the previous call (None the first time)
+            fingerprints: {name key: attractions_fingerprint} the caller holds
+
+        Returns:
+            (current version, [destination dicts]) - pass the version back as since
+        """
+        places = self.places
+        if places is since:
+            return places, []
+        first = {}
+        for place in places:
+            first.setdefault(normalize_name(place.get("place_name")), place)
+        return places, [place for place in first.values() if is_stale(place, fingerprints)]
+
+    def find(self, name, threshold=None):
+        """Exact name, then exact alias, then substring, then best fuzzy match."""
+        key = normalize_name(name)
+        if not key:
+            return None
+        place = self.get_by_name(key)
+        if place is not None:
+            return place
+        index = self.fuzzy_index()
+        alias_of = index.exact.get(normalize_text(key))
+        if alias_of is not None:
+            return self.get_by_name(alias_of)
+        place = self._find_substring(key)
+        if place is not None:
+            return place
+        best = index.best(key, threshold)
+        return self.get_by_name(best) if best is not None else None
+
+
+class Catalog(CatalogBase):
+    """
+    JSON catalog backend: a snapshot file plus an append-only change log.
+
+    The snapshot holds the full catalog as of the last compaction; the log
+    holds one JSON line per upserted destination since then. Log records
+    are complete destinations keyed by name, so replaying one twice is
+    harmless. Readers always get a complete snapshot; reloads build the new
+    one off to the side and swap it in with a single assignment.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.log_path = changelog_path(path)
+        self.binary_path = binary_snapshot_path(path)
+        # File whose changes trigger a reload of the base snapshot
+        self.watch_path = path
+        self._lock = threading.Lock()
+        # Serialises writers within this process (upserts, compaction, full saves);
+        # _writing() adds a file lock so other worker processes are excluded too
+        self._write_lock = threading.Lock()
+        self.lock_path = lock_path(path)
+        self._snapshot = CatalogSnapshot([])
+        self._signature = None
+        self._log_offset = 0
+        self.pending_changes = 0
+        self.reloads = 0
+
+    @contextmanager
+    def _writing(self):
+        """
+        Exclusive write access across threads and processes.
+
+        Appends and compaction both run under it, so a line another worker
+        appends can never fall between compaction's re-read of the log and
+        its truncation.
+        """
+        with self._write_lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.lock_path, "a") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _stat_signature(self):
+        def stat(path):
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+            return (st.st_mtime_ns, st.st_size)
+
+        return stat(self.watch_path), stat(self.log_path)
+
+    def _read_log(self, snapshot: CatalogSnapshot, offset: int):
+        """Apply complete log lines from offset; returns (snapshot, new offset, lines applied)."""
+        try:
+            with open(self.log_path, "rb") as f:
+                f.seek(offset)
+                tail = f.read()
+        except OSError:
+            return snapshot, offset, 0
+
+        # A writer may be mid-append; stop at the last full line
+        end = tail.rfind(b"\n") + 1
+        applied = 0
+        for line in tail[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                change = json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping unreadable catalog log entry at offset {offset}")
+                continue
+            if change.get("op") == "upsert" and isinstance(change.get("destination"), dict):
+                snapshot = snapshot.with_upsert(change["destination"])
+                applied += 1
+        return snapshot, offset + end, applied
+
+    def _probe_snapshot(self):
+        """Return (content digest, loader) for the base snapshot on disk."""
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        digest = content_hash(raw)
+
+        def load():
+            data = json.loads(raw)
+            return CatalogSnapshot(data if isinstance(data, list) else [], digest)
+        return digest, load
+
+    def _written_snapshot(self, places: list, digest: str):
+        """Snapshot for data this process just wrote, without re-reading it."""
+        return CatalogSnapshot(places, digest)
+
+    def _refresh(self):
+        signature = self._stat_signature()
+        if signature == self._signature:
+            return
+
+        with self._lock:
+            # Another thread may have reloaded while we waited
+            signature = self._stat_signature()
+            if signature == self._signature:
+                return
+
+            snapshot_sig, log_sig = signature
+            if snapshot_sig is None:
+                self._snapshot = CatalogSnapshot([])
+                self._signature = signature
+                self._log_offset = self.pending_changes = 0
+                return
+
+            try:
+                log_size = log_sig[1] if log_sig else 0
+                base = None
+                if snapshot_sig != (self._signature[0] if self._signature else None):
+                    digest, load = self._probe_snapshot()
+                    if digest != self._snapshot.digest:
+                        base = load()
+
+                if base is None and log_size >= self._log_offset:
+                    # Snapshot content unchanged: apply just the new log entries
+                    snapshot, offset, applied = self._read_log(self._snapshot, self._log_offset)
+                    self.pending_changes += applied
+                else:
+                    if base is None:
+                        # Log was rewritten under an unchanged snapshot; start over
+                        base = self._probe_snapshot()[1]()
+                    snapshot, offset, applied = self._read_log(base, 0)
+                    self.pending_changes = applied
+                    self.reloads += 1
+                    logger.info(f"📦 Catalog loaded: {len(snapshot.places)} destinations ({applied} logged changes)")
+
+                self._snapshot = snapshot
+                self._log_offset = offset
+                self._signature = signature
+            except Exception as e:
+                # Keep serving the last good snapshot (e.g. file mid-write)
+                logger.error(f"Failed to load DB: {e}")
+
+    def snapshot(self) -> CatalogSnapshot:
+        self._refresh()
+        return self._snapshot
+
+    @property
+    def places(self) -> list:
+        return self.snapshot().places
+
+    def version(self):
+        return self.snapshot()
+
+    def changed_destinations(self, since, fingerprints: dict):
+        """
+        CatalogBase.changed_destinations driven by the change log: within one
+        base snapshot only the destinations upserted since `since` are
+        compared; everything is compared only after a reload or compaction.
+        """
+        snapshot = self.snapshot()
+        if snapshot is since:
+            return snapshot, []
+        upserted = upserted_since(snapshot, since)
+        if upserted is None:
+            return snapshot, snapshot.stale(fingerprints)
+        return snapshot, [place for place in upserted if is_stale(place, fingerprints)]
+
+    def get_by_name(self, name):
+        return self.snapshot().by_name.get(normalize_name(name))
+
+    def get_by_place_id(self, place_id):
+        return self.snapshot().by_place_id.get(str(place_id))
+
+    def get_spot(self, spot_id):
+        return self.snapshot().by_spot_id.get(str(spot_id))
+
+    def max_ids(self):
+        """(max numeric place_id, max numeric spot_id) currently in the catalog."""
+        snapshot = self.snapshot()
+        return snapshot.max_place_id, snapshot.max_spot_id
+
+    def _find_substring(self, key):
+        for name_key, place in self.snapshot().by_name.items():
+            if key in name_key:
+                return place
+        return None
+
+    def _write_snapshot(self, places):
+        places = list(places)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        raw = json.dumps(places, indent=2, ensure_ascii=False).encode("utf-8")
+        digest = content_hash(raw)
+        _atomic_write(self.path, raw)
+        # Keep the mmap-able copy in step for workers reading it
+        if CATALOG_BACKEND == "mmap" or os.path.exists(self.binary_path):
+            from services.binary_catalog import write_binary_snapshot
+            write_binary_snapshot(places, self.binary_path, digest)
+        # Everything in the log is now part of the snapshot; replaying it would
+        # be harmless, but truncating keeps the next load cheap
+        _atomic_write(self.log_path, b"")
+        with self._lock:
+            self._snapshot = self._written_snapshot(places, digest)
+            self._signature = self._stat_signature()
+            self._log_offset = self.pending_changes = 0
+
+    def replace_all(self, places: list):
+        """Replace the whole catalog with places (atomic snapshot write)."""
+        with self._writing():
+            self._write_snapshot(places)
+
+    def compact(self):
+        """Fold the change log into a fresh snapshot."""
+        with self._writing():
+            snapshot = self.snapshot()
+            if self.pending_changes:
+                self._write_snapshot(snapshot.places)
+                logger.info("🗜️ Catalog change log compacted")
+
+    def upsert(self, destination: dict) -> dict:
+        """
+        Create or update one destination and persist only that change.
+
+        The merged destination is appended to the change log as one JSON
+        line, so the cost tracks the size of the destination rather than
+        the catalog. Every COMPACT_EVERY upserts the log is folded into the
+        snapshot.
+        """
+        with self._writing():
+            snapshot = self.snapshot()
+            existing = snapshot.by_name.get(normalize_name(destination.get("place_name")))
+            if existing is not None:
+                record = merge_destination(existing, destination)
+            else:
+                record = prepare_new_destination(destination, snapshot.max_place_id, snapshot.max_spot_id,
+                                                 snapshot.by_place_id.__contains__)
+
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            line = json.dumps({"op": "upsert", "destination": record}, ensure_ascii=False) + "\n"
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Reads back only the appended line
+            snapshot = self.snapshot()
+            if self.pending_changes >= COMPACT_EVERY:
+                self._write_snapshot(snapshot.places)
+                logger.info("🗜️ Catalog change log compacted")
+
+        return {"destination": record, "created": existing is None, "updated": existing is not None}
+
+
+def default_catalog_path() -> str:
+    """CATALOG_PATH if set, else the default file for CATALOG_BACKEND."""
+    return CATALOG_PATH or (DEFAULT_SQLITE_PATH if CATALOG_BACKEND == "sqlite" else DEFAULT_DB_PATH)
+
+
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(db_path: str = None):
+    """
+    Return the shared catalog backend for db_path (one per file per process).
+
+    Args:
+        db_path: JSON snapshot or SQLite file (.db/.sqlite); defaults to the
+                 database for CATALOG_BACKEND (or CATALOG_PATH)
+
+    Returns:
+        Catalog (JSON), MmapCatalog or SQLiteCatalog; all expose places, find, search,
+        get_by_name, get_by_place_id, get_spot, max_ids, upsert,
+        replace_all and compact
+    """
+    if db_path is None:
+        db_path = default_catalog_path()
+    # Fast path on the path as given: realpath() costs a syscall per component
+    catalog = _catalogs.get(db_path)
+    if catalog is not None:
+        return catalog
+    key = os.path.realpath(db_path)
+    catalog = _catalogs.get(key)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(key)
+            if catalog is None:
+                if key.endswith(SQLITE_SUFFIXES):
+                    from services.sqlite_catalog import SQLiteCatalog
+                    catalog = SQLiteCatalog(key)
+                elif CATALOG_BACKEND == "mmap":
+                    from services.binary_catalog import MmapCatalog
+                    catalog = MmapCatalog(key)
+                else:
+                    catalog = Catalog(key)
+                _catalogs[key] = catalog
+    _catalogs[db_path] = catalog
+    return catalog
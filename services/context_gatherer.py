@@ -0,0 +1,205 @@
+"""
+Context Gatherer - Runs independent plan-trip stages concurrently
+Each stage gets its own deadline and a fallback value, so one slow
+provider cannot hold up the whole request.
+"""
+import os
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from services.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STAGE_TIMEOUT = float(os.getenv("STAGE_TIMEOUT_DEFAULT", "10"))
+
+# Shared pool: a stage that overruns its deadline keeps running in the
+# background (a running future cannot be cancelled), so we must never
+# block on pool shutdown inside a request.
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("CONTEXT_MAX_WORKERS", "32")),
+    thread_name_prefix="context-stage"
+)
+
+# Runs of one stage allowed in flight at once, counting runs that overran
+# their deadline and are still blocked in a provider call. A hung provider
+# can hold at most this many workers; further requests skip the stage.
+STAGE_MAX_IN_FLIGHT = int(os.getenv("STAGE_MAX_IN_FLIGHT", "8"))
+
+_stage_slots = {}
+_stage_slots_lock = threading.Lock()
+
+
+def _slots(name: str) -> threading.BoundedSemaphore:
+    with _stage_slots_lock:
+        slots = _stage_slots.get(name)
+        if slots is None:
+            slots = _stage_slots[name] = threading.BoundedSemaphore(STAGE_MAX_IN_FLIGHT)
+        return slots
+
+
+def get_stage_timeout(name: str, default: float = DEFAULT_STAGE_TIMEOUT) -> float:
+    """
+    Resolve the deadline for a stage from STAGE_TIMEOUT_<NAME>.
+
+    Args:
+        name: Stage name (e.g. "geocode")
+        default: Seconds to use if the variable is unset or invalid
+
+    Returns:
+        Deadline in seconds
+    """
+    raw = os.getenv(f"STAGE_TIMEOUT_{name.upper()}")
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning(f"Invalid STAGE_TIMEOUT_{name.upper()}={raw!r}, using {default}s")
+        return default
+
+
+class Stage:
+    """A named unit of context gathering with a deadline and fallback."""
+
+    def __init__(self, name, func, *args, timeout=None, fallback=None, **kwargs):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        # STAGE_TIMEOUT_<NAME> always wins over the caller's default
+        self.timeout = get_stage_timeout(name, DEFAULT_STAGE_TIMEOUT if timeout is None else timeout)
+        self.fallback = fallback
+
+    def run(self):
+        with stage_timer(self.name):
+            return self.func(*self.args, **self.kwargs)
+
+
+class _Submitted:
+    """A stage handed to the pool; its deadline runs from when a worker picks it up."""
+
+    def __init__(self, stage, slots):
+        self.stage = stage
+        self.started = threading.Event()
+        self.started_at = None
+        context = contextvars.copy_context()
+
+        def run():
+            self.started_at = time.monotonic()
+            self.started.set()
+            try:
+                return context.run(stage.run)
+            finally:
+                slots.release()
+
+        self.future = _executor.submit(run)
+        # A run cancelled while still queued never reaches the finally above
+        self.future.add_done_callback(lambda future: future.cancelled() and slots.release())
+
+
+def _submit(stage):
+    slots = _slots(stage.name)
+    if not slots.acquire(blocking=False):
+        return None
+    return _Submitted(stage, slots)
+
+
+def gather_context(stages: list) -> dict:
+    """
+    Start all stages in parallel and collect their results.
+
+    Each stage's deadline starts when a pool worker begins running it, so
+    time spent queued behind other requests is not charged to it; a stage
+    still queued after its deadline is cancelled. A stage that already has
+    STAGE_MAX_IN_FLIGHT runs going is not started at all.
+
+    Args:
+        stages: List of Stage objects
+
+    Returns:
+        Dict mapping stage name to its result, or its fallback if the
+        stage raised, missed its deadline or was skipped
+    """
+    started = time.monotonic()
+    submitted = [(stage, _submit(stage)) for stage in stages]
+
+    results = {}
+    for stage, run in submitted:
+        if run is None:
+            logger.warning(f"🚦 Stage '{stage.name}' has {STAGE_MAX_IN_FLIGHT} runs in flight, using fallback")
+            results[stage.name] = stage.fallback
+            continue
+        try:
+            if not run.started.wait(max(0.0, started + stage.timeout - time.monotonic())) and run.future.cancel():
+                logger.warning(f"⏱️ Stage '{stage.name}' did not start within {stage.timeout}s, using fallback")
+                results[stage.name] = stage.fallback
+                continue
+            # cancel() fails only once the stage is running
+            run.started.wait()
+            remaining = max(0.0, run.started_at + stage.timeout - time.monotonic())
+            results[stage.name] = run.future.result(timeout=remaining)
+        except FuturesTimeout:
+            # The worker stays busy until the provider call returns; its
+            # HTTP timeout and the in-flight cap bound how long and how many
+            logger.warning(f"⏱️ Stage '{stage.name}' exceeded {stage.timeout}s deadline, using fallback")
+            results[stage.name] = stage.fallback
+        except Exception as e:
+            logger.error(f"❌ Stage '{stage.name}' failed: {e}")
+            results[stage.name] = stage.fallback
+
+    logger.info(f"Context gathered in {time.monotonic() - started:.2f}s")
+    return results
+
+
+async def _run_stage_async(stage):
+    if asyncio.iscoroutinefunction(stage.func):
+        with stage_timer(stage.name):
+            return await stage.func(*stage.args, **stage.kwargs)
+    # Blocking stages (ML, local DB) are pushed onto a worker thread, which
+    # wait_for cannot stop; cap them the same way as in gather_context
+    slots = _slots(stage.name)
+    if not slots.acquire(blocking=False):
+        logger.warning(f"🚦 Stage '{stage.name}' has {STAGE_MAX_IN_FLIGHT} runs in flight, using fallback")
+        return stage.fallback
+
+    def run():
+        try:
+            return stage.run()
+        finally:
+            slots.release()
+    return await asyncio.to_thread(run)
+
+
+async def gather_context_async(stages: list) -> dict:
+    """
+    Run all stages concurrently on the event loop (async version).
+
+    Coroutine stages are cancelled when they miss their deadline instead of
+    being left running in the background.
+
+    Args:
+        stages: List of Stage objects; func may be sync or async
+
+    Returns:
+        Dict mapping stage name to its result or fallback
+    """
+    started = time.monotonic()
+
+    async def run(stage):
+        try:
+            return await asyncio.wait_for(_run_stage_async(stage), timeout=stage.timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Stage '{stage.name}' exceeded {stage.timeout}s deadline, using fallback")
+            return stage.fallback
+        except Exception as e:
+            logger.error(f"❌ Stage '{stage.name}' failed: {e}")
+            return stage.fallback
+
+    values = await asyncio.gather(*(run(stage) for stage in stages))
+
+    logger.info(f"Context gathered in {time.monotonic() - started:.2f}s")
+    return {stage.name: value for stage, value in zip(stages, values)}
@@ -1,11 +1,74 @@
 """
 Dining Service - Fetches restaurants using Overpass API
 """
+import os
 import requests
 import logging
+from services.async_http import get_async_client
+from services.metrics import tracked, tracked_async
 
 logger = logging.getLogger(__name__)
 
+OVERPASS_URL = os.getenv("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+
+
+def _restaurants_query(lat: float, lon: float, radius: int) -> str:
+    query = f"""
+    [out:json][timeout:5];
+    (
+      node["amenity"="restaurant"](around:{radius},{lat},{lon});
+      way["amenity"="restaurant"](around:{radius},{lat},{lon});
+    );
+    out center 15;
+    """
+    return query
+
+
+def _parse_restaurants(data: dict) -> list:
+    restaurants = []
+    elements = data.get("elements", [])
+
+    for element in elements:
+        tags = element.get("tags", {})
+        name = tags.get("name")
+
+        if not name:
+            continue
+
+        cuisine = tags.get("cuisine", "Various")
+        city = tags.get("addr:city", "")
+        
+        # Build address
+        addr_number = tags.get("addr:number", "")
+        addr_street = tags.get("addr:street", "")
+        address = f"{addr_number} {addr_street}".strip() if addr_street else ""
+
+        # Get coordinates (handle both node and way elements)
+        elem_lat = element.get("lat") or (element.get("center", {}).get("lat"))
+        elem_lon = element.get("lon") or (element.get("center", {}).get("lon"))
+
+        restaurants.append({
+            "name": name,
+            "cuisine": cuisine,
+            "city": city,
+            "address": address,
+            "type": "restaurant",
+            "lat": elem_lat,
+            "lon": elem_lon
+        })
+
+    # Return top 10 unique restaurants
+    seen_names = set()
+    unique_restaurants = []
+    for r in restaurants:
+        if r["name"] not in seen_names:
+            seen_names.add(r["name"])
+            unique_restaurants.append(r)
+            if len(unique_restaurants) >= 10:
+                break
+
+    return unique_restaurants
+
 
 def get_restaurants(lat: float, lon: float, radius: int = 1000) -> list:
     """
@@ -19,71 +82,52 @@ def get_restaurants(lat: float, lon: float, radius: int = 1000) -> list:
     Returns:
         List of restaurant dicts with name, cuisine, address, lat, lon
     """
-    overpass_url = "https://overpass-api.de/api/interpreter"
-    query = f"""
-    [out:json][timeout:5];
-    (
-      node["amenity"="restaurant"](around:{radius},{lat},{lon});
-      way["amenity"="restaurant"](around:{radius},{lat},{lon});
-    );
-    out center 15;
-    """
+    query = _restaurants_query(lat, lon, radius)
 
     try:
         logger.info("Fetching dining data...")
-        response = requests.post(
-            overpass_url,
+        response = tracked(
+            "overpass", requests.post,
+            OVERPASS_URL,
             data={"data": query},
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             timeout=8
         )
         response.raise_for_status()
         data = response.json()
-
-        restaurants = []
-        elements = data.get("elements", [])
-
-        for element in elements:
-            tags = element.get("tags", {})
-            name = tags.get("name")
-
-            if not name:
-                continue
-
-            cuisine = tags.get("cuisine", "Various")
-            city = tags.get("addr:city", "")
-            
-            # Build address
-            addr_number = tags.get("addr:number", "")
-            addr_street = tags.get("addr:street", "")
-            address = f"{addr_number} {addr_street}".strip() if addr_street else ""
-
-            # Get coordinates (handle both node and way elements)
-            elem_lat = element.get("lat") or (element.get("center", {}).get("lat"))
-            elem_lon = element.get("lon") or (element.get("center", {}).get("lon"))
-
-            restaurants.append({
-                "name": name,
-                "cuisine": cuisine,
-                "city": city,
-                "address": address,
-                "type": "restaurant",
-                "lat": elem_lat,
-                "lon": elem_lon
-            })
-
-        # Return top 10 unique restaurants
-        seen_names = set()
-        unique_restaurants = []
-        for r in restaurants:
-            if r["name"] not in seen_names:
-                seen_names.add(r["name"])
-                unique_restaurants.append(r)
-                if len(unique_restaurants) >= 10:
-                    break
-
-        return unique_restaurants
+        return _parse_restaurants(data)
 
     except requests.RequestException as e:
         logger.error(f"Error fetching restaurants: {e}")
         return []
+
+
+async def get_restaurants_async(lat: float, lon: float, radius: int = 1000) -> list:
+    """
+    Fetch restaurants near coordinates using Overpass API (async version).
+    
+    Args:
+        lat: Latitude
+        lon: Longitude
+        radius: Search radius in meters (default 1000)
+    
+    Returns:
+        List of restaurant dicts with name, cuisine, address, lat, lon
+    """
+    query = _restaurants_query(lat, lon, radius)
+
+    try:
+        logger.info("Fetching dining data...")
+        response = await tracked_async(
+            "overpass", get_async_client().post,
+            OVERPASS_URL,
+            data={"data": query},
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=8
+        )
+        response.raise_for_status()
+        return _parse_restaurants(response.json())
+
+    except Exception as e:
+        logger.error(f"Error fetching restaurants: {e}")
+        return []
@@ -0,0 +1,160 @@
+"""
+Fuzzy Match - Trigram index for resolving misspelled destination names
+Place names and their known aliases (data/raw/place_aliases.txt, or an
+`aliases` list on a destination) are split into character trigrams once;
+a lookup only touches the posting lists of the query's own trigrams, so
+"Mahabaleswar" resolves to Mahabaleshwar in well under a millisecond.
+"""
+import os
+import re
+import csv
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Minimum trigram similarity (0-1) for a fuzzy match to count
+FUZZY_MATCH_THRESHOLD = float(os.getenv("FUZZY_MATCH_THRESHOLD", "0.45"))
+ALIASES_PATH = os.getenv("PLACE_ALIASES_PATH", os.path.join(os.path.dirname(__file__), "../data/raw/place_aliases.txt"))
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_text(text) -> str:
+    return _NON_ALNUM.sub(" ", str(text).lower()).strip() if text else ""
+
+
+def trigrams(text: str) -> set:
+    """Character trigrams of normalized text, padded so word edges count."""
+    padded = f"  {normalize_text(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    Inverted trigram index from names/aliases to arbitrary payloads.
+
+    Similarity is |shared| / |union| of the two trigram sets (as in
+    PostgreSQL's pg_trgm), so it is 1.0 for an exact match and falls off
+    with each inserted, dropped or swapped character.
+    """
+
+    def __init__(self):
+        self._entries = []  # (text, payload, trigram count)
+        self._postings = {}
+        self.exact = {}
+
+    def add(self, text, payload):
+        key = normalize_text(text)
+        if not key:
+            return
+        # First name registered for a spelling wins, like the catalog's name index
+        self.exact.setdefault(key, payload)
+        grams = trigrams(key)
+        entry_id = len(self._entries)
+        self._entries.append((text, payload, len(grams)))
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(entry_id)
+
+    @classmethod
+    def from_entries(cls, entries, aliases: dict = None) -> "TrigramIndex":
+        """
+        Index destinations by name plus aliases; payloads are normalized names.
+
+        Args:
+            entries: Iterable of (place_name, place_id, own aliases)
+            aliases: Optional {place_id: [alias, ...]} (see load_aliases)
+        """
+        index = cls()
+        aliases = aliases or {}
+        deferred = []
+        for name, place_id, own_aliases in entries:
+            key = str(name).strip().lower() if name else ""
+            if not key:
+                continue
+            index.add(name, key)
+            deferred.append((key, list(own_aliases or []) + aliases.get(str(place_id), [])))
+        # Aliases after every real name, so a name always beats an alias
+        for key, names in deferred:
+            for alias in names:
+                index.add(alias, key)
+        return index
+
+    @classmethod
+    def from_places(cls, places: list, aliases: dict = None) -> "TrigramIndex":
+        """Index destination dicts directly; payloads are the dicts themselves."""
+        index = cls()
+        aliases = aliases or {}
+        for place in places:
+            index.add(place.get("place_name"), place)
+        for place in places:
+            for alias in (place.get("aliases") or []) + aliases.get(str(place.get("place_id")), []):
+                index.add(alias, place)
+        return index
+
+    def search(self, query, limit=5, threshold=None) -> list:
+        """
+        Rank indexed entries by trigram similarity to query.
+
+        Args:
+            query: Free-text name
+            limit: Maximum results
+            threshold: Minimum similarity (defaults to FUZZY_MATCH_THRESHOLD)
+
+        Returns:
+            [(payload, score, matched_text)], best first, one row per payload
+        """
+        threshold = FUZZY_MATCH_THRESHOLD if threshold is None else threshold
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        shared = {}
+        for gram in grams:
+            for entry_id in self._postings.get(gram, ()):
+                shared[entry_id] = shared.get(entry_id, 0) + 1
+
+        best = {}
+        for entry_id, count in shared.items():
+            text, payload, size = self._entries[entry_id]
+            score = count / (len(grams) + size - count)
+            if score < threshold:
+                continue
+            # Payloads are dicts or name keys; dedupe by identity for both
+            slot = payload if isinstance(payload, str) else id(payload)
+            current = best.get(slot)
+            if current is None or score > current[1]:
+                best[slot] = (payload, score, text)
+
+        return sorted(best.values(), key=lambda match: -match[1])[:limit]
+
+    def best(self, query, threshold=None):
+        matches = self.search(query, limit=1, threshold=threshold)
+        return matches[0][0] if matches else None
+
+
+_aliases_lock = threading.Lock()
+_aliases_cache = (None, {})
+
+
+def load_aliases(path: str = ALIASES_PATH) -> dict:
+    """Read alias_id,place_id,alias rows into {place_id: [alias, ...]} (cached by mtime)."""
+    global _aliases_cache
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    if _aliases_cache[0] == (path, mtime):
+        return _aliases_cache[1]
+
+    with _aliases_lock:
+        aliases = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    if row.get("place_id") and row.get("alias"):
+                        aliases.setdefault(str(row["place_id"]), []).append(row["alias"])
+        except Exception as e:
+            logger.error(f"Failed to load place aliases: {e}")
+        _aliases_cache = ((path, mtime), aliases)
+    return aliases
@@ -1,11 +1,75 @@
 """
 Hotel Service - Fetches hotels/hostels using Overpass API
 """
+import os
 import requests
 import logging
+from services.async_http import get_async_client
+from services.metrics import tracked, tracked_async
 
 logger = logging.getLogger(__name__)
 
+OVERPASS_URL = os.getenv("OVERPASS_URL", "https://overpass-api.de/api/interpreter")
+
+
+def _hotels_query(lat: float, lon: float, radius: int) -> str:
+    query = f"""
+    [out:json][timeout:15];
+    (
+      node["tourism"~"hotel|hostel|guest_house|motel|apartment|resort"](around:{radius},{lat},{lon});
+      way["tourism"~"hotel|hostel|guest_house|motel|apartment|resort"](around:{radius},{lat},{lon});
+    );
+    out center tags;
+    """
+    return query
+
+
+def _parse_hotels(data: dict) -> list:
+    hotels = []
+    elements = data.get("elements", [])
+
+    for element in elements:
+        tags = element.get("tags", {})
+        name = tags.get("name")
+
+        if not name:
+            continue
+
+        hotel_type = tags.get("tourism", "hotel")
+        city = tags.get("addr:city", "")
+        state = tags.get("addr:state", "")
+        pincode = tags.get("addr:postcode", "")
+        phone = tags.get("contact:phone") or tags.get("phone", "")
+        website = tags.get("contact:website") or tags.get("website", "")
+
+        # Get coordinates (handle both node and way elements)
+        elem_lat = element.get("lat") or (element.get("center", {}).get("lat"))
+        elem_lon = element.get("lon") or (element.get("center", {}).get("lon"))
+
+        hotels.append({
+            "name": name,
+            "type": hotel_type,
+            "city": city,
+            "state": state,
+            "pincode": pincode,
+            "phone": phone,
+            "website": website,
+            "lat": elem_lat,
+            "lon": elem_lon
+        })
+
+    # Return top 10 unique hotels
+    seen_names = set()
+    unique_hotels = []
+    for h in hotels:
+        if h["name"] not in seen_names:
+            seen_names.add(h["name"])
+            unique_hotels.append(h)
+            if len(unique_hotels) >= 10:
+                break
+
+    return unique_hotels
+
 
 def get_hotels(lat: float, lon: float, radius: int = 2000) -> list:
     """
@@ -19,72 +83,52 @@ def get_hotels(lat: float, lon: float, radius: int = 2000) -> list:
     Returns:
         List of hotel dicts with name, type, contact info, lat, lon
     """
-    overpass_url = "https://overpass-api.de/api/interpreter"
-    query = f"""
-    [out:json][timeout:15];
-    (
-      node["tourism"~"hotel|hostel|guest_house|motel|apartment|resort"](around:{radius},{lat},{lon});
-      way["tourism"~"hotel|hostel|guest_house|motel|apartment|resort"](around:{radius},{lat},{lon});
-    );
-    out center tags;
-    """
+    query = _hotels_query(lat, lon, radius)
 
     try:
         logger.info("Fetching hotel data...")
-        response = requests.post(
-            overpass_url,
+        response = tracked(
+            "overpass", requests.post,
+            OVERPASS_URL,
             data={"data": query},
             headers={"Content-Type": "application/x-www-form-urlencoded"},
             timeout=15
         )
         response.raise_for_status()
         data = response.json()
-
-        hotels = []
-        elements = data.get("elements", [])
-
-        for element in elements:
-            tags = element.get("tags", {})
-            name = tags.get("name")
-
-            if not name:
-                continue
-
-            hotel_type = tags.get("tourism", "hotel")
-            city = tags.get("addr:city", "")
-            state = tags.get("addr:state", "")
-            pincode = tags.get("addr:postcode", "")
-            phone = tags.get("contact:phone") or tags.get("phone", "")
-            website = tags.get("contact:website") or tags.get("website", "")
-
-            # Get coordinates (handle both node and way elements)
-            elem_lat = element.get("lat") or (element.get("center", {}).get("lat"))
-            elem_lon = element.get("lon") or (element.get("center", {}).get("lon"))
-
-            hotels.append({
-                "name": name,
-                "type": hotel_type,
-                "city": city,
-                "state": state,
-                "pincode": pincode,
-                "phone": phone,
-                "website": website,
-                "lat": elem_lat,
-                "lon": elem_lon
-            })
-
-        # Return top 10 unique hotels
-        seen_names = set()
-        unique_hotels = []
-        for h in hotels:
-            if h["name"] not in seen_names:
-                seen_names.add(h["name"])
-                unique_hotels.append(h)
-                if len(unique_hotels) >= 10:
-                    break
-
-        return unique_hotels
+        return _parse_hotels(data)
 
     except requests.RequestException as e:
         logger.error(f"Error fetching hotels: {e}")
         return []
+
+
+async def get_hotels_async(lat: float, lon: float, radius: int = 2000) -> list:
+    """
+    Fetch hotels/hostels near coordinates using Overpass API (async version).
+    
+    Args:
+        lat: Latitude
+        lon: Longitude
+        radius: Search radius in meters (default 2000)
+    
+    Returns:
+        List of hotel dicts with name, type, contact info, lat, lon
+    """
+    query = _hotels_query(lat, lon, radius)
+
+    try:
+        logger.info("Fetching hotel data...")
+        response = await tracked_async(
+            "overpass", get_async_client().post,
+            OVERPASS_URL,
+            data={"data": query},
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+            timeout=15
+        )
+        response.raise_for_status()
+        return _parse_hotels(response.json())
+
+    except Exception as e:
+        logger.error(f"Error fetching hotels: {e}")
+        return []
@@ -2,15 +2,44 @@
 Image Service - Fetches place photos using Google Places API
 """
 import os
+import asyncio
+import contextvars
 import requests
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from services.async_http import get_async_client
+from services.metrics import tracked, tracked_async
 
 logger = logging.getLogger(__name__)
 
 # Simple in-memory cache to reduce API calls
 _image_cache = {}
 
+GOOGLE_MAPS_BASE_URL = os.getenv("GOOGLE_MAPS_BASE_URL", "https://maps.googleapis.com")
+TEXT_SEARCH_URL = f"{GOOGLE_MAPS_BASE_URL}/maps/api/place/textsearch/json"
+
+
+def _photo_url_from_search(search_data: dict, place_name: str, google_api_key: str) -> str | None:
+    """Pick the first photo of the top Text Search result."""
+    if search_data.get("status") != "OK" or not search_data.get("results"):
+        logger.debug(f"No Google Places results for: {place_name}")
+        return None
+
+    place = search_data["results"][0]
+
+    # Check if the place has photos
+    photos = place.get("photos", [])
+    if not photos:
+        logger.debug(f"No photos available for: {place_name}")
+        return None
+
+    # Get the photo URL using the photo_reference
+    photo_reference = photos[0]["photo_reference"]
+    return (
+        f"{GOOGLE_MAPS_BASE_URL}/maps/api/place/photo"
+        f"?maxwidth=800&photo_reference={photo_reference}&key={google_api_key}"
+    )
+
 
 def get_place_image_from_google(place_name: str, destination: str) -> str | None:
     """
@@ -36,41 +65,70 @@ def get_place_image_from_google(place_name: str, destination: str) -> str | None
     try:
         # Search for the place using Text Search
         search_query = f"{place_name} {destination} India tourist"
-        search_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
         
-        search_response = requests.get(
-            search_url,
+        search_response = tracked(
+            "google_places", requests.get,
+            TEXT_SEARCH_URL,
             params={"query": search_query, "key": google_api_key},
             timeout=10
         )
         search_response.raise_for_status()
-        search_data = search_response.json()
 
-        if search_data.get("status") != "OK" or not search_data.get("results"):
-            logger.debug(f"No Google Places results for: {place_name}")
+        photo_url = _photo_url_from_search(search_response.json(), place_name, google_api_key)
+        if not photo_url:
             return None
 
-        place = search_data["results"][0]
+        # Cache and return the photo URL
+        _image_cache[cache_key] = photo_url
+        logger.info(f"✓ Found Google image for: {place_name}")
+        return photo_url
 
-        # Check if the place has photos
-        photos = place.get("photos", [])
-        if not photos:
-            logger.debug(f"No photos available for: {place_name}")
-            return None
+    except requests.RequestException as e:
+        logger.error(f"Error fetching Google Places image: {e}")
+        return None
+
+
+async def get_place_image_from_google_async(place_name: str, destination: str) -> str | None:
+    """
+    Fetch image for a place using Google Places API (async version).
+    
+    Args:
+        place_name: Name of the place
+        destination: Destination city for context
+    
+    Returns:
+        Image URL or None
+    """
+    google_api_key = os.getenv("GOOGLE_API_KEY")
+    
+    if not google_api_key:
+        logger.debug("Google API key not configured")
+        return None
+
+    cache_key = f"google:{place_name}:{destination}"
+    if cache_key in _image_cache:
+        return _image_cache[cache_key]
 
-        # Get the photo URL using the photo_reference
-        photo_reference = photos[0]["photo_reference"]
-        photo_url = (
-            f"https://maps.googleapis.com/maps/api/place/photo"
-            f"?maxwidth=800&photo_reference={photo_reference}&key={google_api_key}"
+    try:
+        search_query = f"{place_name} {destination} India tourist"
+
+        search_response = await tracked_async(
+            "google_places", get_async_client().get,
+            TEXT_SEARCH_URL,
+            params={"query": search_query, "key": google_api_key},
+            timeout=10
         )
+        search_response.raise_for_status()
+
+        photo_url = _photo_url_from_search(search_response.json(), place_name, google_api_key)
+        if not photo_url:
+            return None
 
-        # Cache and return the photo URL
         _image_cache[cache_key] = photo_url
         logger.info(f"✓ Found Google image for: {place_name}")
         return photo_url
 
-    except requests.RequestException as e:
+    except Exception as e:
         logger.error(f"Error fetching Google Places image: {e}")
         return None
 
@@ -95,7 +153,9 @@ def get_place_images(places: list, destination: str) -> dict:
 
     # Use thread pool for parallel fetching
     with ThreadPoolExecutor(max_workers=5) as executor:
-        futures = [executor.submit(fetch_image, place) for place in places]
+        # Run each fetch in a copy of this context so provider timings reach
+        # the caller's Server-Timing header
+        futures = [executor.submit(contextvars.copy_context().run, fetch_image, place) for place in places]
         
         for future in as_completed(futures):
             try:
@@ -105,3 +165,29 @@ def get_place_images(places: list, destination: str) -> dict:
                 logger.error(f"Error in parallel image fetch: {e}")
 
     return image_map
+
+
+async def get_place_images_async(places: list, destination: str) -> dict:
+    """
+    Fetch images for multiple places concurrently on the event loop.
+    
+    Args:
+        places: List of place objects with 'name' key
+        destination: Destination city
+    
+    Returns:
+        Dict mapping place names to image URLs
+    """
+    names = [place.get("name", "") for place in places]
+    results = await asyncio.gather(
+        *(get_place_image_from_google_async(name, destination) for name in names),
+        return_exceptions=True
+    )
+
+    image_map = {}
+    for name, result in zip(names, results):
+        if isinstance(result, Exception):
+            logger.error(f"Error in parallel image fetch: {result}")
+            continue
+        image_map[name] = result
+    return image_map
@@ -0,0 +1,212 @@
+"""
+Ingest - Build the destination catalog from the raw CSV exports
+Streams data/raw/places.txt, spots.txt, food_options.txt, stay_options.txt
+and travel_options.txt once each, joining rows to their destination by
+place_id / spot_id as they are read. Every destination gets a hash of its
+own source rows; only destinations whose hash changed since the last run
+are rebuilt, and the catalog is written (atomically, via the configured
+backend) only when something actually changed.
+
+Run with:
+    python -m services.ingest [--raw-dir data/raw] [--db data/processed/database.json]
+"""
+import os
+import csv
+import json
+import hashlib
+import logging
+import argparse
+
+from services.catalog import get_catalog, normalize_name, _atomic_write, default_catalog_path
+
+logger = logging.getLogger(__name__)
+
+RAW_DIR = os.getenv("RAW_DATA_DIR", os.path.join(os.path.dirname(__file__), "../data/raw"))
+
+# Source files in join order: parents before the rows that reference them
+RAW_FILES = ("places.txt", "spots.txt", "food_options.txt", "stay_options.txt", "travel_options.txt")
+
+
+def manifest_path(db_path: str) -> str:
+    """Per-destination source hashes from the last ingest, next to the catalog."""
+    return f"{os.path.splitext(db_path)[0]}.ingest.json"
+
+
+def _read_rows(path):
+    """Yield (canonical line, row dict) for each data row of a CSV export."""
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+        for values in reader:
+            if not values:
+                continue
+            # Short rows get None for the missing columns, as csv.DictReader does
+            row = dict(zip(header, values + [None] * (len(header) - len(values))))
+            yield ",".join(values), row
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class _Source:
+    """Source rows of one destination, hashed as they stream in."""
+
+    __slots__ = ("place", "spots", "travel", "hasher")
+
+    def __init__(self, place):
+        self.place = place
+        self.spots = {}  # spot_id -> (spot row, dining, accommodation)
+        self.travel = []
+        self.hasher = hashlib.blake2b(digest_size=16)
+
+    def feed(self, tag: str, line: str):
+        self.hasher.update(f"{tag}\x1f{line}\n".encode("utf-8"))
+
+    def build(self) -> dict:
+        place = dict(self.place)
+        place["attractions"] = [
+            dict(spot, dining=dining, accommodation=accommodation)
+            for spot, dining, accommodation in self.spots.values()
+        ]
+        place["travel_options"] = self.travel
+        return place
+
+
+def stream_sources(raw_dir: str = RAW_DIR) -> dict:
+    """
+    Join the raw files into per-destination sources in one pass over each file.
+
+    Args:
+        raw_dir: Directory holding the RAW_FILES exports
+
+    Returns:
+        {place_id: _Source} in places.txt order
+    """
+    sources = {}
+    spot_owner = {}  # spot_id -> _Source
+
+    for line, row in _read_rows(os.path.join(raw_dir, "places.txt")):
+        source = _Source(row)
+        source.feed("place", line)
+        sources[row["place_id"]] = source
+
+    for line, row in _read_rows(os.path.join(raw_dir, "spots.txt")):
+        source = sources.get(row["place_id"])
+        if source is None:
+            continue
+        source.feed("spot", line)
+        source.spots[row["spot_id"]] = (row, [], [])
+        spot_owner[row["spot_id"]] = source
+
+    for name, tag, slot in (("food_options.txt", "food", 1), ("stay_options.txt", "stay", 2)):
+        for line, row in _read_rows(os.path.join(raw_dir, name)):
+            spot_id = row.pop("spot_id", None)
+            source = spot_owner.get(spot_id)
+            if source is None:
+                continue
+            source.feed(tag, f"{spot_id},{line}")
+            source.spots[spot_id][slot].append(row)
+
+    for line, row in _read_rows(os.path.join(raw_dir, "travel_options.txt")):
+        source = sources.get(row.pop("place_id", None))
+        if source is None:
+            continue
+        source.feed("travel", line)
+        source.travel.append(row)
+
+    return sources
+
+
+def ingest(raw_dir: str = RAW_DIR, db_path: str = None, force: bool = False) -> dict:
+    """
+    Bring the catalog up to date with the raw CSV exports.
+
+    Destinations that are not in places.txt (e.g. auto-added from live
+    APIs) are kept as they are.
+
+    Args:
+        raw_dir: Directory holding the raw exports
+        db_path: Catalog to write; defaults to the configured backend
+        force: Rebuild every destination even if its hash is unchanged
+
+    Returns:
+        {"added", "updated", "removed", "unchanged", "written"} counts / flag
+    """
+    if db_path is None:
+        db_path = default_catalog_path()
+    catalog = get_catalog(db_path)
+    manifest_file = manifest_path(db_path)
+
+    try:
+        with open(manifest_file, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    previous = manifest.get("destinations", {})
+    files = {name: _file_signature(os.path.join(raw_dir, name)) for name in RAW_FILES}
+
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0, "written": False}
+    # Quick check first: untouched files cannot have changed rows
+    if not force and previous and files == manifest.get("files") and catalog.places:
+        stats["unchanged"] = len(previous)
+        logger.info("📦 Raw data unchanged since last ingest")
+        return stats
+
+    sources = stream_sources(raw_dir)
+    current = catalog.places
+    hashes, places = {}, []
+    for place_id, source in sources.items():
+        digest = source.hasher.hexdigest()
+        hashes[place_id] = digest
+        existing = catalog.get_by_place_id(place_id)
+        if not force and existing is not None and previous.get(place_id) == digest:
+            places.append(existing)
+            stats["unchanged"] += 1
+            continue
+        places.append(source.build())
+        stats["updated" if place_id in previous else "added"] += 1
+
+    # Removed from the raw data since last time vs. never from it (live additions)
+    stats["removed"] = sum(1 for place_id in previous if place_id not in sources)
+    raw_names = {normalize_name(p.get("place_name")) for p in places}
+    for place in current:
+        place_id = str(place.get("place_id"))
+        if place_id in sources or place_id in previous:
+            continue
+        if normalize_name(place.get("place_name")) in raw_names:
+            continue
+        places.append(place)
+
+    if stats["added"] or stats["updated"] or stats["removed"] or len(places) != len(current):
+        catalog.replace_all(places)
+        stats["written"] = True
+        logger.info(f"📦 Ingested raw data: {stats['added']} added, {stats['updated']} updated, "
+                    f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+
+    manifest = {"files": files, "destinations": hashes}
+    _atomic_write(manifest_file, json.dumps(manifest, indent=2).encode("utf-8"))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the destination catalog from data/raw")
+    parser.add_argument("--raw-dir", default=RAW_DIR)
+    parser.add_argument("--db", dest="db_path", default=None,
+                        help="Catalog file (.json, or .db for SQLite); defaults to CATALOG_BACKEND")
+    parser.add_argument("--force", action="store_true", help="Rebuild every destination")
+    args = parser.parse_args()
+
+    stats = ingest(args.raw_dir, args.db_path and os.path.realpath(args.db_path), args.force)
+    print(f"{stats['added']} added, {stats['updated']} updated, {stats['removed']} removed, "
+          f"{stats['unchanged']} unchanged" + ("" if stats["written"] else " (catalog not rewritten)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Itinerary Cache - Caches generated itineraries by normalized trip request
+Sits in front of build_prompt + call_llm so popular trips skip the LLM.
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+BUDGET_BUCKET_SIZE = float(os.getenv("ITINERARY_CACHE_BUDGET_BUCKET", "5000"))
+
+
+def _norm(value) -> str:
+    return str(value).strip().lower() if value is not None else ""
+
+
+def _to_int(value, default=0) -> int:
+    try:
+        return int(float(value))
+    except (ValueError, TypeError):
+        return default
+
+
+def budget_bucket(budget) -> int:
+    """Map a total budget onto a coarse bucket index."""
+    try:
+        return int(float(budget) // BUDGET_BUCKET_SIZE)
+    except (ValueError, TypeError, ZeroDivisionError):
+        return -1
+
+
+def normalize_trip(trip: dict, resolved_destination: dict = None) -> dict:
+    """
+    Reduce a plan-trip request to the fields that shape the itinerary.
+
+    Args:
+        trip: Raw request body (destination, source, budget, ...)
+        resolved_destination: Catalog entry from find_destination, if any
+
+    Returns:
+        Dict of normalized, JSON-serializable trip parameters
+    """
+    if resolved_destination:
+        destination = f"id:{resolved_destination.get('place_id') or _norm(resolved_destination.get('place_name'))}"
+    else:
+        destination = f"name:{_norm(trip.get('destination'))}"
+
+    preferences = trip.get("preferences") or []
+    if isinstance(preferences, str):
+        preferences = preferences.split(",")
+
+    return {
+        "destination": destination,
+        # The source city is rendered into the prompt and the logistics
+        # section, so it has to be part of the key as well
+        "source": _norm(trip.get("source")),
+        "days": _to_int(trip.get("days")),
+        "budget": budget_bucket(trip.get("budget")),
+        "people": _to_int(trip.get("people")),
+        "transport": _norm(trip.get("transport")),
+        "preferences": sorted({_norm(p) for p in preferences if _norm(p)}),
+    }
+
+
+def make_trip_key(trip: dict, resolved_destination: dict = None) -> str:
+    """Stable hash of the normalized trip parameters."""
+    normalized = normalize_trip(trip, resolved_destination)
+    raw = json.dumps(normalized, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def extract_itinerary_json(text: str):
+    """
+    Parse LLM output the same way the frontend does.
+
+    Returns:
+        Parsed dict, or None if the text holds no valid JSON object
+    """
+    if not text:
+        return None
+    clean = text.strip().replace("```json", "").replace("```", "")
+    start, end = clean.find("{"), clean.rfind("}")
+    if start == -1 or end == -1:
+        return None
+    try:
+        data = json.loads(clean[start:end + 1])
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+class ItineraryCache:
+    """Thread-safe TTL + LRU cache with an optional on-disk tier."""
+
+    DISK_PRUNE_INTERVAL = 64
+
+    def __init__(self, max_size=256, ttl=6 * 60 * 60, disk_dir=None, max_disk_entries=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries or max_size * 10
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def get(self, key: str):
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created, value = entry
+                if now - created < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._store(key, entry)
+            return entry[1]
+
+    def set(self, key: str, value: str):
+        if not self.enabled:
+            return
+        entry = (time.time(), value)
+        with self._lock:
+            self._store(key, entry)
+        self._write_disk(key, entry)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key, entry):
+        # Caller holds the lock
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key, now):
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {e}")
+            self._remove_file(path)
+            return None
+
+        if now - data.get("created", 0) >= self.ttl:
+            self._remove_file(path)
+            return None
+        return data["created"], data["value"]
+
+    def _write_disk(self, key, entry):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"created": entry[0], "value": entry[1]}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Failed to write itinerary cache entry: {e}")
+            self._remove_file(tmp_path)
+            return
+
+        with self._lock:
+            self._writes += 1
+            should_prune = self._writes % self.DISK_PRUNE_INTERVAL == 0
+        if should_prune:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Drop expired files, then the oldest ones beyond max_disk_entries."""
+        now = time.time()
+        try:
+            files = [e for e in os.scandir(self.disk_dir) if e.name.endswith(".json")]
+        except OSError:
+            return
+        live = []
+        for entry in files:
+            try:
+                mtime = entry.stat().st_mtime
+            except OSError:
+                continue
+            if now - mtime >= self.ttl:
+                self._remove_file(entry.path)
+            else:
+                live.append((mtime, entry.path))
+        live.sort()
+        for _, path in live[:max(0, len(live) - self.max_disk_entries)]:
+            self._remove_file(path)
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_itinerary_cache() -> ItineraryCache:
+    """
+    Get the process-wide itinerary cache, configured from the environment.
+
+    Returns:
+        ItineraryCache instance
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ItineraryCache(
+                    max_size=int(os.getenv("ITINERARY_CACHE_SIZE", "256")),
+                    ttl=float(os.getenv("ITINERARY_CACHE_TTL", str(6 * 60 * 60))),
+                    disk_dir=os.getenv("ITINERARY_CACHE_DIR") or None,
+                )
+    return _cache
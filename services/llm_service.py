@@ -1,11 +1,24 @@
 import os
 import json
-from groq import Groq
+import asyncio
+import weakref
 import logging
+from services.metrics import tracked, tracked_async
 
 logger = logging.getLogger(__name__)
 
-def call_llm(prompt):
+LLM_MODEL = "llama-3.3-70b-versatile"
+
+def call_llm(prompt, stream=False):
+    """
+    Generate an itinerary for the prompt.
+
+    With stream=True a generator is returned that yields text chunks as
+    the provider produces them instead of one complete string.
+    """
+    if stream:
+        return stream_llm(prompt)
+
     try:
         GROQ_API_KEY = os.getenv("GROQ_API_KEY")
         
@@ -13,16 +26,97 @@ def call_llm(prompt):
             logger.error("❌ GROQ_API_KEY not configured in .env")
             return generate_fallback_itinerary(prompt)
 
+        from groq import Groq  # deferred: the SDK is slow to import (preloaded by warmup)
+        client = Groq(api_key=GROQ_API_KEY)
+
+        response = tracked(
+            "groq", client.chat.completions.create,
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt,
+                }
+            ],
+            model=LLM_MODEL,
+            temperature=0.7,
+            max_tokens=6000,
+        )
+
+        return response.choices[0].message.content
+
+    except Exception as e:
+        logger.error(f"❌ LLM Request Error: {str(e)}")
+        return generate_fallback_itinerary(prompt)
+
+def stream_llm(prompt):
+    sent_any = False
+    try:
+        GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+        if not GROQ_API_KEY:
+            logger.error("❌ GROQ_API_KEY not configured in .env")
+            yield generate_fallback_itinerary(prompt)
+            return
+
+        from groq import Groq
         client = Groq(api_key=GROQ_API_KEY)
 
-        response = client.chat.completions.create(
+        response = tracked(
+            "groq", client.chat.completions.create,
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt,
+                }
+            ],
+            model=LLM_MODEL,
+            temperature=0.7,
+            max_tokens=6000,
+            stream=True,
+        )
+
+        for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                sent_any = True
+                yield delta
+
+    except Exception as e:
+        logger.error(f"❌ LLM Stream Error: {str(e)}")
+        # Once partial output has reached the client we cannot swap in
+        # the fallback without producing invalid JSON
+        if not sent_any:
+            yield generate_fallback_itinerary(prompt)
+
+async def call_llm_async(prompt, stream=False):
+    """
+    Async counterpart of call_llm for the asyncio serving mode.
+
+    With stream=True an async generator of text chunks is returned.
+    """
+    if stream:
+        return stream_llm_async(prompt)
+
+    try:
+        GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+        if not GROQ_API_KEY:
+            logger.error("❌ GROQ_API_KEY not configured in .env")
+            return generate_fallback_itinerary(prompt)
+
+        client = _get_async_client(GROQ_API_KEY)
+
+        response = await tracked_async(
+            "groq", client.chat.completions.create,
             messages=[
                 {
                     "role": "user",
                     "content": prompt,
                 }
             ],
-            model="llama-3.3-70b-versatile",
+            model=LLM_MODEL,
             temperature=0.7,
             max_tokens=6000,
         )
@@ -33,6 +127,56 @@ def call_llm(prompt):
         logger.error(f"❌ LLM Request Error: {str(e)}")
         return generate_fallback_itinerary(prompt)
 
+async def stream_llm_async(prompt):
+    sent_any = False
+    try:
+        GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+
+        if not GROQ_API_KEY:
+            logger.error("❌ GROQ_API_KEY not configured in .env")
+            yield generate_fallback_itinerary(prompt)
+            return
+
+        client = _get_async_client(GROQ_API_KEY)
+
+        response = await tracked_async(
+            "groq", client.chat.completions.create,
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt,
+                }
+            ],
+            model=LLM_MODEL,
+            temperature=0.7,
+            max_tokens=6000,
+            stream=True,
+        )
+
+        async for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                sent_any = True
+                yield delta
+
+    except Exception as e:
+        logger.error(f"❌ LLM Stream Error: {str(e)}")
+        if not sent_any:
+            yield generate_fallback_itinerary(prompt)
+
+# One pooled AsyncGroq client per event loop; creating a client per call
+# would open a fresh connection pool for every plan
+_async_clients = weakref.WeakKeyDictionary()
+
+def _get_async_client(api_key):
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    if api_key not in clients:
+        from groq import AsyncGroq
+        clients[api_key] = AsyncGroq(api_key=api_key)
+    return clients[api_key]
+
 def generate_fallback_itinerary(prompt):
     # Basic fallback extraction logic matching the JS version
     import re
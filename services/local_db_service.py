@@ -1,29 +1,48 @@
-import os
-import json
 import logging
+import operator
+from services.catalog import get_catalog, merge_destination
+from services.fuzzy_match import TrigramIndex, load_aliases, normalize_text
 
 logger = logging.getLogger(__name__)
 
-DEFAULT_DB_PATH = os.path.join(os.path.dirname(__file__), "../data/processed/database.json")
+# db_path=None means the configured backend (CATALOG_BACKEND); a path ending
+# in .db/.sqlite selects SQLite, anything else the JSON snapshot + change log
 
-def load_local_db(db_path=DEFAULT_DB_PATH):
-    if not os.path.exists(db_path):
-        return []
+def load_local_db(db_path=None):
+    # Shallow copy: callers may append/replace entries (upsert_destination)
+    # without touching the shared catalog until they save
+    return list(get_catalog(db_path).places)
+
+def save_local_db(db, db_path=None):
+    """Replace the whole catalog with db (atomic on every backend)."""
+    try:
+        get_catalog(db_path).replace_all(db)
+    except Exception as e:
+        logger.error(f"Failed to save DB: {e}")
+
+def compact_local_db(db_path=None):
+    """Fold the JSON change log into a fresh snapshot (VACUUM on SQLite)."""
     try:
-        with open(db_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
+        get_catalog(db_path).compact()
     except Exception as e:
-        logger.error(f"Failed to load DB: {e}")
-        return []
+        logger.error(f"Failed to compact DB: {e}")
+
+def persist_upsert(destination, db_path=None):
+    """
+    Create or update one destination and persist only that change.
 
-def save_local_db(db, db_path=DEFAULT_DB_PATH):
+    Args:
+        destination: Destination dict (e.g. from build_destination_from_api)
+        db_path: Catalog file; defaults to the configured backend
+
+    Returns:
+        {destination, created, updated} like upsert_destination
+    """
     try:
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        with open(db_path, 'w', encoding='utf-8') as f:
-            json.dump(db, f, indent=2, ensure_ascii=False)
+        return get_catalog(db_path).upsert(destination)
     except Exception as e:
         logger.error(f"Failed to save DB: {e}")
+        return {"destination": destination, "created": False, "updated": False}
 
 def safe_lower(s):
     return str(s).strip().lower() if s else ""
@@ -32,17 +51,37 @@ def find_destination(db, destination_name):
     d = safe_lower(destination_name)
     if not d: return None
     
-    # Exact match
+    # Exact match wins; otherwise the first substring match (one pass)
+    partial = None
     for p in db:
-        if safe_lower(p.get("place_name")) == d:
+        name = safe_lower(p.get("place_name"))
+        if name == d:
             return p
+        if partial is None and d in name:
+            partial = p
             
-    # Substring match
-    for p in db:
-        if d in safe_lower(p.get("place_name")):
-            return p
-            
-    return None
+    if partial is not None:
+        return partial
+    
+    # Aliases, then misspellings, matched against db itself
+    index = _fuzzy_index(db)
+    return index.exact.get(normalize_text(d)) or index.best(d)
+
+# (entries of the db it was built from, aliases, TrigramIndex over them)
+_fuzzy_cache = (None, None, None)
+
+def _fuzzy_index(db):
+    """Trigram index over db's names + aliases, reused while db holds the same entries."""
+    global _fuzzy_cache
+    entries, cached_aliases, index = _fuzzy_cache
+    aliases = load_aliases()
+    # upsert_destination replaces or appends entries rather than editing
+    # them, so an identity check per entry is enough to spot a change
+    if (cached_aliases is not aliases or entries is None or len(entries) != len(db)
+            or not all(map(operator.is_, entries, db))):
+        index = TrigramIndex.from_places(db, aliases)
+        _fuzzy_cache = (tuple(db), aliases, index)
+    return index
 
 def get_max_numeric_id(items, key):
     max_val = 0
@@ -63,25 +102,22 @@ def upsert_destination(db, destination):
     if not name_key:
         return {"db": db, "destination": None, "created": False, "updated": False}
 
+    # One pass: find the match and the max place_id together
     idx = -1
+    max_place_id = 0
     for i, p in enumerate(db):
         if safe_lower(p.get("place_name")) == name_key:
             idx = i
             break
+        max_place_id = max(max_place_id, get_max_numeric_id([p], "place_id"))
             
     if idx >= 0:
-        existing = db[idx]
-        merged = existing.copy()
-        merged.update(destination)
         # Preserve existing attractions if not overwritten
-        if "attractions" not in destination:
-             merged["attractions"] = existing.get("attractions", [])
-             
+        merged = merge_destination(db[idx], destination)
         db[idx] = merged
         return {"db": db, "destination": merged, "created": False, "updated": True}
 
     # Insert new
-    max_place_id = get_max_numeric_id(db, "place_id")
     destination["place_id"] = destination.get("place_id", str(max_place_id + 1))
     destination["state"] = destination.get("state", "Unknown")
     destination["description"] = destination.get("description", "")
@@ -90,19 +126,23 @@ def upsert_destination(db, destination):
     db.append(destination)
     return {"db": db, "destination": destination, "created": True, "updated": False}
 
-def build_destination_from_api(data, existing_db):
+def build_destination_from_api(data, existing_db=None):
     destination_name = data.get("destinationName")
     coords = data.get("coords")
     places = data.get("places", [])
     
-    max_place_id = get_max_numeric_id(existing_db, "place_id")
-    
-    # Calculate max spot id
-    max_spot_id = 0
-    for dest in existing_db:
-        for attr in dest.get("attractions", []):
-            sid = get_max_numeric_id([attr], "spot_id")
-            if sid > max_spot_id: max_spot_id = sid
+    if existing_db is None:
+        # Indexed maxima from the shared catalog instead of walking every attraction
+        max_place_id, max_spot_id = get_catalog().max_ids()
+    else:
+        max_place_id = get_max_numeric_id(existing_db, "place_id")
+        
+        # Calculate max spot id
+        max_spot_id = 0
+        for dest in existing_db:
+            for attr in dest.get("attractions", []):
+                sid = get_max_numeric_id([attr], "spot_id")
+                if sid > max_spot_id: max_spot_id = sid
 
     place_id = str(max_place_id + 1)
     
@@ -1,7 +1,10 @@
 import os
 import time
+import asyncio
 import requests
 import logging
+from services.async_http import get_async_client
+from services.metrics import tracked, tracked_async
 
 logger = logging.getLogger(__name__)
 
@@ -9,81 +12,129 @@ logger = logging.getLogger(__name__)
 _cached_token = None
 _token_expiry = 0
 
-def get_access_token():
+# Base URLs are overridable so load tests can target local stand-ins
+MAPPLS_OUTPOST_URL = os.getenv("MAPPLS_OUTPOST_URL", "https://outpost.mappls.com")
+MAPPLS_API_URL = os.getenv("MAPPLS_API_URL", "https://apis.mappls.com")
+GEOAPIFY_BASE_URL = os.getenv("GEOAPIFY_BASE_URL", "https://api.geoapify.com")
+NOMINATIM_BASE_URL = os.getenv("NOMINATIM_BASE_URL", "https://nominatim.openstreetmap.org")
+
+TOKEN_URL = f"{MAPPLS_OUTPOST_URL}/api/security/oauth/token"
+GEOAPIFY_GEOCODE_URL = f"{GEOAPIFY_BASE_URL}/v1/geocode/search"
+GEOAPIFY_PLACES_URL = f"{GEOAPIFY_BASE_URL}/v2/places"
+NOMINATIM_URL = f"{NOMINATIM_BASE_URL}/search"
+NOMINATIM_HEADERS = {"User-Agent": "TripPlannerApp/1.0"}
+# Per-request HTTP timeout (connect + read); a hung provider must not pin a
+# context-gathering worker past its stage deadline indefinitely
+PROVIDER_HTTP_TIMEOUT = float(os.getenv("PROVIDER_HTTP_TIMEOUT", "8"))
+ROUTE_PARAMS = {
+    "geometries": "polyline",
+    "overview": "full",
+    "steps": "true"
+}
+
+def _token_request():
+    data = {
+        "grant_type": "client_credentials",
+        "client_id": os.getenv("MAPPLS_CLIENT_ID"),
+        "client_secret": os.getenv("MAPPLS_CLIENT_SECRET")
+    }
+    headers = {"Content-Type": "application/x-www-form-urlencoded"}
+    return data, headers
+
+def _token_is_fresh():
+    return _cached_token and _token_expiry and time.time() < _token_expiry
+
+def _store_token(token_data):
     global _cached_token, _token_expiry
-    
-    if _cached_token and _token_expiry and time.time() < _token_expiry:
+    _cached_token = token_data.get("access_token")
+    # Cache for 23 hours
+    _token_expiry = time.time() + (23 * 60 * 60)
+    logger.info("Mappls token generated successfully")
+    return _cached_token
+
+def get_access_token():
+    if _token_is_fresh():
         return _cached_token
 
     try:
-        url = "https://outpost.mappls.com/api/security/oauth/token"
-        data = {
-            "grant_type": "client_credentials",
-            "client_id": os.getenv("MAPPLS_CLIENT_ID"),
-            "client_secret": os.getenv("MAPPLS_CLIENT_SECRET")
-        }
-        headers = {"Content-Type": "application/x-www-form-urlencoded"}
-        
-        response = requests.post(url, data=data, headers=headers)
+        data, headers = _token_request()
+        response = tracked("mappls", requests.post, TOKEN_URL, data=data, headers=headers, timeout=PROVIDER_HTTP_TIMEOUT)
         response.raise_for_status()
-        
-        token_data = response.json()
-        _cached_token = token_data.get("access_token")
-        # Cache for 23 hours
-        _token_expiry = time.time() + (23 * 60 * 60)
-        
-        logger.info("Mappls token generated successfully")
+
+        return _store_token(response.json())
+
+    except Exception as e:
+        logger.error(f"Error getting Mappls access token: {e}")
+        return None
+
+async def get_access_token_async():
+    if _token_is_fresh():
         return _cached_token
-        
+
+    try:
+        data, headers = _token_request()
+        response = await tracked_async("mappls", get_async_client().post, TOKEN_URL, data=data, headers=headers, timeout=PROVIDER_HTTP_TIMEOUT)
+        response.raise_for_status()
+
+        return _store_token(response.json())
+
     except Exception as e:
         logger.error(f"Error getting Mappls access token: {e}")
         return None
 
+def _geoapify_key():
+    return os.getenv("GEOAPIFY_API_KEY") or os.getenv("PLACES_API_KEY")
+
+def _parse_geoapify_geocode(data, location):
+    if data.get("features"):
+        feat = data["features"][0]
+        return {
+            "lat": feat["properties"]["lat"],
+            "lng": feat["properties"]["lon"],
+            "name": feat["properties"]["formatted"] or location
+        }
+    return None
+
+def _parse_nominatim(data, location):
+    if data:
+        feat = data[0]
+        return {
+            "lat": float(feat["lat"]),
+            "lng": float(feat["lon"]),
+            "name": feat.get("display_name") or location
+        }
+    return None
+
 def geocode(location):
     try:
-        geoapify_key = os.getenv("GEOAPIFY_API_KEY") or os.getenv("PLACES_API_KEY")
-        
+        geoapify_key = _geoapify_key()
+
         if not geoapify_key:
             logger.error("❌ GEOAPIFY_API_KEY not configured")
             return None
 
         # Try Geoapify
-        url = "https://api.geoapify.com/v1/geocode/search"
         params = {"text": location, "apiKey": geoapify_key, "limit": 1}
-        
-        response = requests.get(url, params=params)
-        
+
+        response = tracked("geoapify", requests.get, GEOAPIFY_GEOCODE_URL, params=params, timeout=PROVIDER_HTTP_TIMEOUT)
+
         if response.status_code == 200:
-            data = response.json()
-            if data.get("features"):
-                feat = data["features"][0]
-                return {
-                    "lat": feat["properties"]["lat"],
-                    "lng": feat["properties"]["lon"],
-                    "name": feat["properties"]["formatted"] or location
-                }
+            result = _parse_geoapify_geocode(response.json(), location)
+            if result:
+                return result
 
         logger.warning(f"Geoapify failed for {location}, trying Nominatim...")
-        
+
         # Fallback Nominatim
-        nom_url = "https://nominatim.openstreetmap.org/search"
         nom_params = {
-            "q": location, 
-            "format": "json", 
+            "q": location,
+            "format": "json",
             "limit": 1
         }
-        nom_headers = {"User-Agent": "TripPlannerApp/1.0"}
-        
-        nom_res = requests.get(nom_url, params=nom_params, headers=nom_headers)
+
+        nom_res = tracked("nominatim", requests.get, NOMINATIM_URL, params=nom_params, headers=NOMINATIM_HEADERS, timeout=PROVIDER_HTTP_TIMEOUT)
         if nom_res.status_code == 200:
-            data = nom_res.json()
-            if data:
-                feat = data[0]
-                return {
-                    "lat": float(feat["lat"]),
-                    "lng": float(feat["lon"]),
-                    "name": feat.get("display_name") or location
-                }
+            return _parse_nominatim(nom_res.json(), location)
 
         return None
 
@@ -91,35 +142,101 @@ def geocode(location):
         logger.error(f"Geocoding failed for {location}: {e}")
         return None
 
+async def geocode_async(location):
+    try:
+        geoapify_key = _geoapify_key()
+
+        if not geoapify_key:
+            logger.error("❌ GEOAPIFY_API_KEY not configured")
+            return None
+
+        client = get_async_client()
+        params = {"text": location, "apiKey": geoapify_key, "limit": 1}
+
+        response = await tracked_async("geoapify", client.get, GEOAPIFY_GEOCODE_URL, params=params, timeout=PROVIDER_HTTP_TIMEOUT)
+
+        if response.status_code == 200:
+            result = _parse_geoapify_geocode(response.json(), location)
+            if result:
+                return result
+
+        logger.warning(f"Geoapify failed for {location}, trying Nominatim...")
+
+        nom_params = {"q": location, "format": "json", "limit": 1}
+        nom_res = await tracked_async("nominatim", client.get, NOMINATIM_URL, params=nom_params, headers=NOMINATIM_HEADERS, timeout=PROVIDER_HTTP_TIMEOUT)
+        if nom_res.status_code == 200:
+            return _parse_nominatim(nom_res.json(), location)
+
+        return None
+
+    except Exception as e:
+        logger.error(f"Geocoding failed for {location}: {e}")
+        return None
+
+def _route_url(token, source_coords, dest_coords):
+    return f"{MAPPLS_API_URL}/advancedmaps/v1/{token}/route_adv/driving/{source_coords['lng']},{source_coords['lat']};{dest_coords['lng']},{dest_coords['lat']}"
+
+def _parse_route(data):
+    if data.get("routes"):
+        route = data["routes"][0]
+        return {
+            "distance": route.get("distance"),
+            "duration": route.get("duration"),
+            "geometry": route.get("geometry"),
+            "steps": route.get("legs", [{}])[0].get("steps", [])
+        }
+    return None
+
 def get_route(source_coords, dest_coords):
     try:
         token = get_access_token()
-        if not token: 
+        if not token:
             return None
 
-        url = f"https://apis.mappls.com/advancedmaps/v1/{token}/route_adv/driving/{source_coords['lng']},{source_coords['lat']};{dest_coords['lng']},{dest_coords['lat']}"
-        params = {
-            "geometries": "polyline",
-            "overview": "full",
-            "steps": "true"
-        }
-        
-        response = requests.get(url, params=params)
+        url = _route_url(token, source_coords, dest_coords)
+
+        response = tracked("mappls", requests.get, url, params=ROUTE_PARAMS, timeout=PROVIDER_HTTP_TIMEOUT)
+        if response.status_code == 200:
+            return _parse_route(response.json())
+        return None
+    except Exception as e:
+        logger.error(f"Error getting route: {e}")
+        return None
+
+async def get_route_async(source_coords, dest_coords):
+    try:
+        token = await get_access_token_async()
+        if not token:
+            return None
+
+        url = _route_url(token, source_coords, dest_coords)
+
+        response = await tracked_async("mappls", get_async_client().get, url, params=ROUTE_PARAMS, timeout=PROVIDER_HTTP_TIMEOUT)
         if response.status_code == 200:
-            data = response.json()
-            if data.get("routes"):
-                route = data["routes"][0]
-                return {
-                    "distance": route.get("distance"),
-                    "duration": route.get("duration"),
-                    "geometry": route.get("geometry"),
-                    "steps": route.get("legs", [{}])[0].get("steps", [])
-                }
+            return _parse_route(response.json())
         return None
     except Exception as e:
         logger.error(f"Error getting route: {e}")
         return None
 
+def _build_distance_info(source_coords, dest_coords, route):
+    distance_km = round(route["distance"] / 1000, 1)
+
+    total_seconds = route["duration"]
+    hours = int(total_seconds // 3600)
+    minutes = int((total_seconds % 3600) // 60)
+
+    duration_text = f"{hours} hour{'s' if hours != 1 else ''} {minutes} min" if hours > 0 else f"{minutes} minutes"
+
+    return {
+        "distanceKm": distance_km,
+        "distanceText": f"{distance_km} km",
+        "durationSeconds": route["duration"],
+        "durationText": duration_text,
+        "source": source_coords,
+        "destination": dest_coords
+    }
+
 def get_distance_info(source, destination):
     try:
         # Resolve coordinates
@@ -133,56 +250,72 @@ def get_distance_info(source, destination):
         if not route:
             return None
 
-        distance_km = round(route["distance"] / 1000, 1)
-        
-        total_seconds = route["duration"]
-        hours = int(total_seconds // 3600)
-        minutes = int((total_seconds % 3600) // 60)
-        
-        duration_text = f"{hours} hour{'s' if hours != 1 else ''} {minutes} min" if hours > 0 else f"{minutes} minutes"
+        return _build_distance_info(source_coords, dest_coords, route)
+    except Exception as e:
+        logger.error(f"Error getting distance info: {e}")
+        return None
+
+async def get_distance_info_async(source, destination):
+    try:
+        # Both geocodes go out together on the event loop
+        source_coords, dest_coords = await asyncio.gather(geocode_async(source), geocode_async(destination))
+
+        if not source_coords or not dest_coords:
+            return None
+
+        route = await get_route_async(source_coords, dest_coords)
+        if not route:
+            return None
 
-        return {
-            "distanceKm": distance_km,
-            "distanceText": f"{distance_km} km",
-            "durationSeconds": route["duration"],
-            "durationText": duration_text,
-            "source": source_coords,
-            "destination": dest_coords
-        }
+        return _build_distance_info(source_coords, dest_coords, route)
     except Exception as e:
         logger.error(f"Error getting distance info: {e}")
         return None
 
+def _search_places_params(lat, lng, radius):
+    return {
+        "categories": "tourism.sights,tourism.attraction,entertainment.museum,religion,natural",
+        "filter": f"circle:{lng},{lat},{radius}",
+        "bias": f"proximity:{lng},{lat}",
+        "limit": 15,
+        "apiKey": os.getenv("PLACES_API_KEY") or os.getenv("GEOAPIFY_API_KEY")
+    }
+
+def _parse_search_places(data):
+    results = []
+    for feat in data.get("features", []):
+        props = feat["properties"]
+        name = props.get("name") or props.get("formatted")
+        if name:
+            results.append({
+                "name": name,
+                "address": props.get("address_line2") or props.get("formatted"),
+                "lat": props.get("lat"),
+                "lng": props.get("lon"),
+                "type": props.get("categories", ["point_of_interest"])[0],
+                "eLoc": None
+            })
+    return results
+
 def search_places(lat, lng, query="tourist attraction", radius=5000):
     try:
-        geoapify_key = os.getenv("PLACES_API_KEY") or os.getenv("GEOAPIFY_API_KEY")
-        
-        url = "https://api.geoapify.com/v2/places"
-        params = {
-            "categories": "tourism.sights,tourism.attraction,entertainment.museum,religion,natural",
-            "filter": f"circle:{lng},{lat},{radius}",
-            "bias": f"proximity:{lng},{lat}",
-            "limit": 15,
-            "apiKey": geoapify_key
-        }
-        
-        response = requests.get(url, params=params)
+        params = _search_places_params(lat, lng, radius)
+
+        response = tracked("geoapify", requests.get, GEOAPIFY_PLACES_URL, params=params, timeout=PROVIDER_HTTP_TIMEOUT)
         if response.status_code == 200:
-            data = response.json()
-            results = []
-            for feat in data.get("features", []):
-                props = feat["properties"]
-                name = props.get("name") or props.get("formatted")
-                if name:
-                    results.append({
-                        "name": name,
-                        "address": props.get("address_line2") or props.get("formatted"),
-                        "lat": props.get("lat"),
-                        "lng": props.get("lon"),
-                        "type": props.get("categories", ["point_of_interest"])[0],
-                        "eLoc": None
-                    })
-            return results
+            return _parse_search_places(response.json())
+        return []
+    except Exception as e:
+        logger.error(f"Error searching places (Geoapify): {e}")
+        return []
+
+async def search_places_async(lat, lng, query="tourist attraction", radius=5000):
+    try:
+        params = _search_places_params(lat, lng, radius)
+
+        response = await tracked_async("geoapify", get_async_client().get, GEOAPIFY_PLACES_URL, params=params, timeout=PROVIDER_HTTP_TIMEOUT)
+        if response.status_code == 200:
+            return _parse_search_places(response.json())
         return []
     except Exception as e:
         logger.error(f"Error searching places (Geoapify): {e}")
@@ -213,6 +346,32 @@ def get_map_data(source, destination):
         logger.error(f"Error getting map data: {e}")
         return {"error": str(e)}
 
+async def get_map_data_async(source, destination):
+    try:
+        source_coords, dest_coords = await asyncio.gather(geocode_async(source), geocode_async(destination))
+
+        if not source_coords or not dest_coords:
+            return {
+                "error": "Could not geocode source or destination",
+                "source": source_coords,
+                "destination": dest_coords
+            }
+
+        route, places = await asyncio.gather(
+            get_route_async(source_coords, dest_coords),
+            search_places_async(dest_coords['lat'], dest_coords['lng'])
+        )
+
+        return {
+            "source": source_coords,
+            "destination": dest_coords,
+            "route": route,
+            "places": places[:10]
+        }
+    except Exception as e:
+        logger.error(f"Error getting map data: {e}")
+        return {"error": str(e)}
+
 # Aliases for compatibility
 get_coordinates = geocode
 
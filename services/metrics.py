@@ -0,0 +1,222 @@
+"""
+Metrics - Stage latency histograms and per-provider call counters
+Rendered in Prometheus text format at /metrics. Timings recorded while a
+request timing scope is active also feed that request's Server-Timing header.
+"""
+import time
+import bisect
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Seconds; spans fast local lookups up to full LLM generations
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_lock = threading.Lock()
+_stage_histograms = {}
+_provider_histograms = {}
+_provider_calls = {}
+_provider_errors = {}
+
+# Entries for the Server-Timing header of the current request, if any
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (caller holds the module lock)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _observe(histograms, label, seconds):
+    with _lock:
+        histogram = histograms.get(label)
+        if histogram is None:
+            histogram = histograms[label] = Histogram()
+        histogram.observe(seconds)
+
+
+def _add_request_timing(name, seconds):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record one execution of a pipeline stage."""
+    _observe(_stage_histograms, stage, seconds)
+    _add_request_timing(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Time the enclosed block as a pipeline stage."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def record_provider_call(provider: str, seconds: float, failed: bool):
+    """Record one outbound call to an external provider."""
+    _observe(_provider_histograms, provider, seconds)
+    with _lock:
+        _provider_calls[provider] = _provider_calls.get(provider, 0) + 1
+        if failed:
+            _provider_errors[provider] = _provider_errors.get(provider, 0) + 1
+    _add_request_timing(provider, seconds)
+
+
+def _is_failure(response) -> bool:
+    status = getattr(response, "status_code", None)
+    return status is not None and status >= 400
+
+
+def tracked(provider: str, func, *args, **kwargs):
+    """
+    Call func (e.g. requests.get) and record it against provider.
+
+    Exceptions and HTTP status codes >= 400 count as errors.
+    """
+    started = time.perf_counter()
+    failed = True
+    try:
+        response = func(*args, **kwargs)
+        failed = _is_failure(response)
+        return response
+    finally:
+        record_provider_call(provider, time.perf_counter() - started, failed)
+
+
+async def tracked_async(provider: str, func, *args, **kwargs):
+    """Async version of tracked for awaitable calls (httpx, AsyncGroq)."""
+    started = time.perf_counter()
+    failed = True
+    try:
+        response = await func(*args, **kwargs)
+        failed = _is_failure(response)
+        return response
+    finally:
+        record_provider_call(provider, time.perf_counter() - started, failed)
+
+
+class RequestTimings:
+    """Per-request timing entries aggregated by name for Server-Timing."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            total, calls = self._entries.get(name, (0.0, 0))
+            self._entries[name] = (total + seconds, calls + 1)
+
+    def header(self) -> str:
+        parts = []
+        with self._lock:
+            for name, (total, calls) in self._entries.items():
+                desc = f';desc="{calls} calls"' if calls > 1 else ""
+                parts.append(f"{name}{desc};dur={total * 1000:.1f}")
+        parts.append(f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+def begin_request_timing() -> RequestTimings:
+    """
+    Start collecting Server-Timing entries for the current request.
+
+    Worker threads only see these entries when run inside a copy of the
+    caller's context (contextvars.copy_context().run).
+
+    Returns:
+        RequestTimings for the active context
+    """
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+
+def _format_labels(**labels) -> str:
+    inner = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    return "{" + inner + "}"
+
+
+def _render_histogram(lines, name, help_text, label_name, histograms):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for label, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            labels = _format_labels(**{label_name: label, "le": bound})
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _format_labels(**{label_name: label, "le": "+Inf"})
+        lines.append(f"{name}_bucket{labels} {histogram.count}")
+        labels = _format_labels(**{label_name: label})
+        lines.append(f"{name}_sum{labels} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{labels} {histogram.count}")
+
+
+def render_prometheus(extra: dict = None) -> str:
+    """
+    Render all metrics in the Prometheus text exposition format.
+
+    Args:
+        extra: Optional extra series {name: (type, help, value)} such as cache stats
+
+    Returns:
+        Metrics text
+    """
+    lines = []
+    with _lock:
+        _render_histogram(lines, "tripsync_stage_duration_seconds",
+                          "Latency of request pipeline stages", "stage", _stage_histograms)
+        _render_histogram(lines, "tripsync_provider_request_duration_seconds",
+                          "Latency of external provider calls", "provider", _provider_histograms)
+
+        lines.append("# HELP tripsync_provider_requests_total Calls made to each external provider")
+        lines.append("# TYPE tripsync_provider_requests_total counter")
+        for provider, count in sorted(_provider_calls.items()):
+            lines.append(f"tripsync_provider_requests_total{_format_labels(provider=provider)} {count}")
+
+        lines.append("# HELP tripsync_provider_errors_total Failed calls (exception or HTTP >= 400) per provider")
+        lines.append("# TYPE tripsync_provider_errors_total counter")
+        for provider in sorted(_provider_calls):
+            errors = _provider_errors.get(provider, 0)
+            lines.append(f"tripsync_provider_errors_total{_format_labels(provider=provider)} {errors}")
+
+    for name, (metric_type, help_text, value) in sorted((extra or {}).items()):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.append(f"{name} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+def plan_trip_series(cache_stats: dict, flight_stats: dict) -> dict:
+    """Extra series for render_prometheus from cache and coalescing stats."""
+    return {
+        "tripsync_itinerary_cache_hits_total": ("counter", "Itinerary cache hits (memory + disk)", cache_stats["hits"]),
+        "tripsync_itinerary_cache_misses_total": ("counter", "Itinerary cache misses", cache_stats["misses"]),
+        "tripsync_itinerary_cache_evictions_total": ("counter", "Itinerary cache LRU evictions", cache_stats["evictions"]),
+        "tripsync_itinerary_cache_entries": ("gauge", "Itineraries held in memory", cache_stats["size"]),
+        "tripsync_plan_trip_collapsed_total": ("counter", "Plan-trip requests served by another in-flight request", flight_stats["collapsed"]),
+        "tripsync_plan_trip_in_flight": ("gauge", "Distinct plan-trip pipelines currently running", flight_stats["in_flight"]),
+    }
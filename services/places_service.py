@@ -2,54 +2,76 @@ import os
 import requests
 import math
 import logging
-from services.mappls_service import geocode, search_places
+from services.async_http import get_async_client
+from services.metrics import tracked, tracked_async
+from services.mappls_service import geocode, search_places, geocode_async, search_places_async, GEOAPIFY_PLACES_URL, PROVIDER_HTTP_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
+def _places_by_location_params(lat, lon, radius, category, api_key):
+    # Bounding box calculation
+    lat_offset = radius / 111000.0
+    lon_offset = (radius / 111000.0) / math.cos(lat * math.pi / 180.0)
+
+    min_lat = lat - lat_offset
+    max_lat = lat + lat_offset
+    min_lon = lon - lon_offset
+    max_lon = lon + lon_offset
+
+    return {
+        "categories": category,
+        "filter": f"rect:{min_lon},{min_lat},{max_lon},{max_lat}",
+        "limit": 20,
+        "apiKey": api_key
+    }
+
+def _parse_places(data):
+    # Filter out places without names
+    results = []
+    for p in data.get("features", []):
+        name = p["properties"].get("name")
+        # Skip if no name or name is empty
+        if not name or not name.strip():
+            continue
+        results.append({
+            "name": name,
+            "address": p["properties"].get("address_line2"),
+            "category": p["properties"].get("category"),
+            "type": p["properties"].get("place_type"),
+            "lat": p["properties"].get("lat"),
+            "lon": p["properties"].get("lon"),
+            "website": p["properties"].get("website"),
+            "phone": p["properties"].get("phone")
+        })
+    return results
+
 def get_places_by_location(lat, lon, radius=5000, category="tourism"):
     try:
         api_key = os.getenv("GEOAPIFY_API_KEY") or os.getenv("PLACES_API_KEY")
         if not api_key:
             return []
 
-        # Bounding box calculation
-        lat_offset = radius / 111000.0
-        lon_offset = (radius / 111000.0) / math.cos(lat * math.pi / 180.0)
-
-        min_lat = lat - lat_offset
-        max_lat = lat + lat_offset
-        min_lon = lon - lon_offset
-        max_lon = lon + lon_offset
-
-        url = "https://api.geoapify.com/v2/places"
-        params = {
-            "categories": category,
-            "filter": f"rect:{min_lon},{min_lat},{max_lon},{max_lat}",
-            "limit": 20,
-            "apiKey": api_key
-        }
+        params = _places_by_location_params(lat, lon, radius, category, api_key)
 
-        response = requests.get(url, params=params)
+        response = tracked("geoapify", requests.get, GEOAPIFY_PLACES_URL, params=params, timeout=PROVIDER_HTTP_TIMEOUT)
         if response.status_code == 200:
-            data = response.json()
-            # Filter out places without names
-            results = []
-            for p in data.get("features", []):
-                name = p["properties"].get("name")
-                # Skip if no name or name is empty
-                if not name or not name.strip():
-                    continue
-                results.append({
-                    "name": name,
-                    "address": p["properties"].get("address_line2"),
-                    "category": p["properties"].get("category"),
-                    "type": p["properties"].get("place_type"),
-                    "lat": p["properties"].get("lat"),
-                    "lon": p["properties"].get("lon"),
-                    "website": p["properties"].get("website"),
-                    "phone": p["properties"].get("phone")
-                })
-            return results
+            return _parse_places(response.json())
+        return []
+    except Exception as e:
+        logger.error(f"Error fetching places: {e}")
+        return []
+
+async def get_places_by_location_async(lat, lon, radius=5000, category="tourism"):
+    try:
+        api_key = os.getenv("GEOAPIFY_API_KEY") or os.getenv("PLACES_API_KEY")
+        if not api_key:
+            return []
+
+        params = _places_by_location_params(lat, lon, radius, category, api_key)
+
+        response = await tracked_async("geoapify", get_async_client().get, GEOAPIFY_PLACES_URL, params=params)
+        if response.status_code == 200:
+            return _parse_places(response.json())
         return []
     except Exception as e:
         logger.error(f"Error fetching places: {e}")
@@ -61,9 +83,28 @@ def get_coordinates(destination):
         return {"lat": res["lat"], "lon": res["lng"]}
     return None
 
-def get_places_by_name(destination):
+async def get_coordinates_async(destination):
+    res = await geocode_async(destination)
+    if res:
+        return {"lat": res["lat"], "lon": res["lng"]}
+    return None
+
+def _from_mappls_places(mappls_places):
+    return [
+        {
+            "name": p["name"],
+            "address": p["address"],
+            "category": p.get("type", "tourist_attraction"),
+            "lat": p["lat"],
+            "lon": p["lng"],
+            "type": "tourism"
+        }
+        for p in mappls_places
+    ]
+
+def get_places_by_name(destination, coords=None):
     try:
-        coords = get_coordinates(destination)
+        coords = coords or get_coordinates(destination)
         if not coords:
             return []
 
@@ -79,17 +120,7 @@ def get_places_by_name(destination):
         mappls_places = search_places(lat, lon) # already implemented in mappls_service
         
         if mappls_places:
-             return [
-                {
-                    "name": p["name"],
-                    "address": p["address"],
-                    "category": p.get("type", "tourist_attraction"),
-                    "lat": p["lat"],
-                    "lon": p["lng"],
-                    "type": "tourism"
-                }
-                for p in mappls_places
-            ]
+             return _from_mappls_places(mappls_places)
             
         return []
 
@@ -97,5 +128,29 @@ def get_places_by_name(destination):
         logger.error(f"Error fetching places by name: {e}")
         return []
 
+async def get_places_by_name_async(destination, coords=None):
+    try:
+        coords = coords or await get_coordinates_async(destination)
+        if not coords:
+            return []
+
+        lat, lon = coords["lat"], coords["lon"]
+
+        places = await get_places_by_location_async(lat, lon)
+        if places:
+            return places
+
+        logger.info(f"Places: Geoapify returned 0 results for {destination}. Trying fallback...")
+        mappls_places = await search_places_async(lat, lon)
+
+        if mappls_places:
+            return _from_mappls_places(mappls_places)
+
+        return []
+
+    except Exception as e:
+        logger.error(f"Error fetching places by name: {e}")
+        return []
+
 # Alias for compatibility
 get_places_for_destination = get_places_by_name
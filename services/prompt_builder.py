@@ -1,3 +1,12 @@
+# Share of the trip budget per category (also used by the recommender's budget score)
+BUDGET_SPLIT = {
+    "accommodation": 0.40,
+    "food": 0.25,
+    "transportation": 0.20,
+    "activities": 0.10,
+    "miscellaneous": 0.05
+}
+
 def calculate_budget_distribution(total_budget, days, people):
     try:
         budget = float(total_budget)
@@ -9,13 +18,7 @@ def calculate_budget_distribution(total_budget, days, people):
 
     daily_per_person = budget / num_days / num_people
     
-    dist = {
-        "accommodation": 0.40,
-        "food": 0.25,
-        "transportation": 0.20,
-        "activities": 0.10,
-        "miscellaneous": 0.05
-    }
+    dist = BUDGET_SPLIT
 
     def fmt(val):
         return f"₹{round(val):,}"
@@ -66,6 +69,15 @@ def build_prompt(user, context=None):
         di = context["distanceInfo"]
         distance_info = f"\nLOGISTICS:\n- Route: {source} -> {destination}\n- Distance: {di.get('distanceText')}\n- Drive Time: {di.get('durationText')}\n"
 
+    transport_info = ""
+    if context.get("travelOptions"):
+        # Known cost/duration per mode from the catalog (approx. per person)
+        to = context["travelOptions"]
+        fmt_option = lambda o: f"{o['mode']}: ₹{round(o['cost']):,}, ~{o['duration_hours']:.1f}h"
+        modes = "\n".join(f"- {fmt_option(o)}" for o in to.get("options", []))
+        best = ", ".join(o["mode"] for o in to.get("pareto", []))
+        transport_info = f"\nTRANSPORT OPTIONS ({source} -> {destination}, per person):\n{modes}\n- Best cost/time trade-offs: {best}\n"
+
     # Strict JSON Schema Prompt
     return f"""
 SYSTEM INSTRUCTIONS:
@@ -94,6 +106,7 @@ IMPORTANT: Only return valid JSON. No explanations, markdown, or extra text.
 
 CONTEXT:
 {distance_info}
+{transport_info}
 {rag_info}
 
 AVAILABLE PLACES:
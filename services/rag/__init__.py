@@ -3,6 +3,6 @@ RAG Package - Retrieval-Augmented Generation for trip planning
 """
 from .loader import load_documents
 from .vector_store import get_vector_store
-from .query_rag import query_rag
+from .query_rag import query_rag, query_rag_async
 
-__all__ = ["load_documents", "get_vector_store", "query_rag"]
+__all__ = ["load_documents", "get_vector_store", "query_rag", "query_rag_async"]
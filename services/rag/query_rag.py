@@ -4,11 +4,22 @@ Rationale: Reduces Hallucination by grounding LLM (See /docs/rag_pipeline.md)
 """
 import asyncio
 import logging
-from .vector_store import get_vector_store
+from .vector_store import get_vector_store, is_vector_store_ready
 
 logger = logging.getLogger(__name__)
 
 
+def _format_results(results: list) -> str:
+    if not results:
+        return "No relevant information found in knowledge base."
+
+    # Format as plain text snippets
+    return "\n".join(
+        f"[{r['metadata']['source']}] {r['text']}" 
+        for r in results
+    )
+
+
 async def query_rag_async(query: str) -> str:
     """
     Queries the RAG system for relevant context (async version).
@@ -21,19 +32,14 @@ async def query_rag_async(query: str) -> str:
     """
     try:
         logger.info(f'RAG Query: "{query}"')
-        store = get_vector_store()
+        if is_vector_store_ready():
+            store = get_vector_store()
+        else:
+            # Building the index takes a thread lock and blocking embedding
+            # calls (warmup off, failed or still running): keep it off the loop
+            store = await asyncio.to_thread(get_vector_store)
         results = await store.similarity_search(query, k=3)
-
-        if not results:
-            return "No relevant information found in knowledge base."
-
-        # Format as plain text snippets
-        top_snippets = "\n".join(
-            f"[{r['metadata']['source']}] {r['text']}" 
-            for r in results
-        )
-
-        return top_snippets
+        return _format_results(results)
 
     except Exception as e:
         logger.error(f"RAG Query Error: {e}")
@@ -42,7 +48,7 @@ async def query_rag_async(query: str) -> str:
 
 def query_rag(query: str) -> str:
     """
-    Queries the RAG system for relevant context (sync wrapper).
+    Queries the RAG system for relevant context (sync version).
     
     Args:
         query: Search query
@@ -51,16 +57,11 @@ def query_rag(query: str) -> str:
         Formatted relevant snippets or error message
     """
     try:
-        # Try to get the running event loop
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # Create a new loop in a thread if needed
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as pool:
-                future = pool.submit(asyncio.run, query_rag_async(query))
-                return future.result()
-        else:
-            return loop.run_until_complete(query_rag_async(query))
-    except RuntimeError:
-        # No event loop, create one
-        return asyncio.run(query_rag_async(query))
+        logger.info(f'RAG Query: "{query}"')
+        store = get_vector_store()
+        results = store.similarity_search_sync(query, k=3)
+        return _format_results(results)
+
+    except Exception as e:
+        logger.error(f"RAG Query Error: {e}")
+        return "Error fetching RAG context."
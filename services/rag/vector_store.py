@@ -3,10 +3,15 @@ Vector Store - Embeddings and similarity search for RAG
 See: /docs/rag_pipeline.md - Section 4 (Retrieval Flow)
 """
 import os
+import json
 import math
 import random
+import hashlib
 import requests
 import logging
+import threading
+from services.async_http import get_async_client
+from services.metrics import tracked, tracked_async
 from .loader import load_documents
 
 logger = logging.getLogger(__name__)
@@ -14,6 +19,13 @@ logger = logging.getLogger(__name__)
 # Module-level state
 _vector_index = []
 _is_initialized = False
+_init_lock = threading.Lock()
+
+# Embeddings persisted across restarts, keyed by model + chunk text
+INDEX_CACHE_PATH = os.getenv(
+    "RAG_INDEX_PATH",
+    os.path.join(os.path.dirname(__file__), "../../.cache/rag_index.json")
+)
 
 
 def cosine_similarity(vec_a: list, vec_b: list) -> float:
@@ -31,72 +43,151 @@ def cosine_similarity(vec_a: list, vec_b: list) -> float:
     return dot_product / (mag_a * mag_b)
 
 
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+EMBEDDINGS_URL = f"{OPENROUTER_BASE_URL}/embeddings"
+EMBEDDING_MODEL = "openai/text-embedding-3-small"
+
+
+def _embedding_request(text: str) -> tuple:
+    """Build the JSON body and headers for an embeddings call."""
+    api_key = os.getenv("OPENAI_API_KEY")
+    body = {
+        "model": EMBEDDING_MODEL,
+        "input": text
+    }
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json"
+    }
+    return body, headers
+
+
+def _fetch_embedding(text: str) -> list:
+    """Call the embeddings API; raises on any failure."""
+    body, headers = _embedding_request(text)
+    response = tracked("openrouter", requests.post, EMBEDDINGS_URL, json=body, headers=headers, timeout=30)
+    response.raise_for_status()
+    data = response.json()
+    return data["data"][0]["embedding"]
+
+
 def get_embedding(text: str) -> list:
     """
     Generate embedding using OpenRouter API.
     Falls back to random vectors if API fails (for demo purposes).
     """
-    api_key = os.getenv("OPENAI_API_KEY")
+    try:
+        return _fetch_embedding(text)
     
+    except Exception as e:
+        logger.error(f"Embedding Error (using random fallback): {e}")
+        # Fallback for demo so app doesn't crash if API fails
+        return [random.random() for _ in range(1536)]
+
+
+async def get_embedding_async(text: str) -> list:
+    """
+    Generate embedding using OpenRouter API (async version).
+    Falls back to random vectors if API fails (for demo purposes).
+    """
     try:
-        response = requests.post(
-            "https://openrouter.ai/api/v1/embeddings",
-            json={
-                "model": "openai/text-embedding-3-small",
-                "input": text
-            },
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            timeout=30
-        )
+        body, headers = _embedding_request(text)
+        response = await tracked_async("openrouter", get_async_client().post, EMBEDDINGS_URL, json=body, headers=headers, timeout=30)
         response.raise_for_status()
         data = response.json()
         return data["data"][0]["embedding"]
-    
+
     except Exception as e:
         logger.error(f"Embedding Error (using random fallback): {e}")
-        # Fallback for demo so app doesn't crash if API fails
         return [random.random() for _ in range(1536)]
 
 
+def _chunk_key(text: str) -> str:
+    return hashlib.sha256(f"{EMBEDDING_MODEL}\n{text}".encode("utf-8")).hexdigest()
+
+
+def _load_index_cache() -> dict:
+    try:
+        with open(INDEX_CACHE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+            return data if isinstance(data, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable RAG index cache: {e}")
+        return {}
+
+
+def _save_index_cache(cache: dict):
+    tmp_path = f"{INDEX_CACHE_PATH}.tmp"
+    try:
+        os.makedirs(os.path.dirname(INDEX_CACHE_PATH), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, INDEX_CACHE_PATH)
+    except Exception as e:
+        logger.error(f"Failed to save RAG index cache: {e}")
+
+
 def initialize_vector_store():
-    """Initialize the vector store with document embeddings."""
+    """
+    Initialize the vector store with document embeddings.
+
+    Embeddings for unchanged chunks are loaded from the on-disk index cache;
+    only new or edited chunks are sent to the embeddings API.
+    """
     global _vector_index
     
     docs = load_documents()
-    _vector_index = []
+    index = []
+    cache = _load_index_cache()
+    live_cache = {}
+    fetched = 0
 
     logger.info("Vectorizing knowledge base...")
 
     # Process sequentially to avoid rate limits
     for doc in docs:
-        embedding = get_embedding(doc["text"])
-        _vector_index.append({
+        key = _chunk_key(doc["text"])
+        embedding = cache.get(key)
+        if embedding is None:
+            try:
+                embedding = _fetch_embedding(doc["text"])
+                fetched += 1
+            except Exception as e:
+                logger.error(f"Embedding Error (using random fallback): {e}")
+                # Random fallbacks are never persisted
+                embedding = [random.random() for _ in range(1536)]
+                key = None
+        if key:
+            live_cache[key] = embedding
+        index.append({
             **doc,
             "embedding": embedding
         })
 
-    logger.info(f"Vector Store Ready with {len(_vector_index)} vectors.")
+    # Rewrite when chunks were embedded or removed since the last run
+    if fetched or set(live_cache) != set(cache):
+        _save_index_cache(live_cache)
+
+    _vector_index = index
+    logger.info(f"Vector Store Ready with {len(_vector_index)} vectors ({fetched} newly embedded).")
 
 
 class VectorStore:
     """Vector store with similarity search capability."""
-    
-    async def similarity_search(self, query: str, k: int = 3) -> list:
+
+    def search_by_vector(self, query_embedding: list, k: int = 3) -> list:
         """
-        Search for similar documents.
+        Rank indexed documents against an already computed embedding.
         
         Args:
-            query: Search query text
+            query_embedding: Embedding of the search query
             k: Number of results to return
         
         Returns:
             List of top-k most similar documents
         """
-        query_embedding = get_embedding(query)
-
         # Calculate scores
         results = []
         for doc in _vector_index:
@@ -109,6 +200,29 @@ class VectorStore:
         # Return top k
         return results[:k]
 
+    def similarity_search_sync(self, query: str, k: int = 3) -> list:
+        """Search for similar documents using the blocking embeddings client."""
+        return self.search_by_vector(get_embedding(query), k)
+
+    async def similarity_search(self, query: str, k: int = 3) -> list:
+        """
+        Search for similar documents.
+        
+        Args:
+            query: Search query text
+            k: Number of results to return
+        
+        Returns:
+            List of top-k most similar documents
+        """
+        query_embedding = await get_embedding_async(query)
+        return self.search_by_vector(query_embedding, k)
+
+
+def is_vector_store_ready() -> bool:
+    """True once the index is built (get_vector_store() will not block)."""
+    return _is_initialized
+
 
 def get_vector_store() -> VectorStore:
     """
@@ -120,7 +234,10 @@ def get_vector_store() -> VectorStore:
     global _is_initialized
     
     if not _is_initialized:
-        initialize_vector_store()
-        _is_initialized = True
+        # Warmup and the first request may race to build the index
+        with _init_lock:
+            if not _is_initialized:
+                initialize_vector_store()
+                _is_initialized = True
     
     return VectorStore()
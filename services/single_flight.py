@@ -0,0 +1,197 @@
+"""
+Single Flight - Coalesces identical in-flight requests
+The first caller for a key starts the work; concurrent duplicates
+subscribe to the same output stream instead of starting their own.
+"""
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class Flight:
+    """Chunks produced for one key, replayable by any number of subscribers."""
+
+    def __init__(self):
+        self._chunks = []
+        self._done = False
+        self._cond = threading.Condition()
+
+    def publish(self, chunk):
+        with self._cond:
+            self._chunks.append(chunk)
+            self._cond.notify_all()
+
+    def finish(self):
+        with self._cond:
+            self._done = True
+            self._cond.notify_all()
+
+    def subscribe(self):
+        """Yield every chunk from the start, then new ones as they arrive."""
+        position = 0
+        while True:
+            with self._cond:
+                while position >= len(self._chunks) and not self._done:
+                    self._cond.wait()
+                pending = self._chunks[position:]
+                done = self._done
+            for chunk in pending:
+                yield chunk
+            position += len(pending)
+            if done and not pending:
+                return
+
+
+class SingleFlight:
+    """Runs at most one producer per key at a time."""
+
+    def __init__(self, name="single-flight"):
+        self.name = name
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.started = 0
+        self.collapsed = 0
+
+    def stream(self, key, producer):
+        """
+        Stream the output of producer() for key, sharing it with duplicates.
+
+        The producer runs on its own thread, so a leader whose client
+        disconnects does not cut the stream short for its followers.
+
+        Args:
+            key: Coalescing key
+            producer: Zero-argument callable returning an iterable of chunks
+
+        Returns:
+            Iterator over the produced chunks
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.collapsed += 1
+                logger.info(f"🔗 {self.name}: joined in-flight request ({self.collapsed} collapsed so far)")
+                return flight.subscribe()
+
+            flight = Flight()
+            self._flights[key] = flight
+            self.started += 1
+
+        threading.Thread(
+            target=self._run, args=(key, flight, producer),
+            name=f"{self.name}-producer", daemon=True
+        ).start()
+        return flight.subscribe()
+
+    def _run(self, key, flight, producer):
+        try:
+            for chunk in producer():
+                flight.publish(chunk)
+        except Exception as e:
+            logger.error(f"{self.name}: producer failed: {e}")
+        finally:
+            # Unregister before finishing so late arrivals start fresh
+            # (and usually hit the result cache) rather than replaying
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.finish()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "started": self.started,
+                "collapsed": self.collapsed,
+            }
+
+
+class AsyncFlight:
+    """Event-loop counterpart of Flight for the asyncio serving mode."""
+
+    def __init__(self):
+        self._chunks = []
+        self._done = False
+        self._cond = asyncio.Condition()
+
+    async def publish(self, chunk):
+        async with self._cond:
+            self._chunks.append(chunk)
+            self._cond.notify_all()
+
+    async def finish(self):
+        async with self._cond:
+            self._done = True
+            self._cond.notify_all()
+
+    async def subscribe(self):
+        position = 0
+        while True:
+            async with self._cond:
+                await self._cond.wait_for(lambda: position < len(self._chunks) or self._done)
+                pending = self._chunks[position:]
+                done = self._done
+            for chunk in pending:
+                yield chunk
+            position += len(pending)
+            if done and not pending:
+                return
+
+
+class AsyncSingleFlight:
+    """Runs at most one async producer per key at a time."""
+
+    def __init__(self, name="single-flight"):
+        self.name = name
+        self._flights = {}
+        # Strong references so running producer tasks are not collected
+        self._tasks = set()
+        self.started = 0
+        self.collapsed = 0
+
+    def stream(self, key, producer):
+        """
+        Stream the output of producer() for key, sharing it with duplicates.
+
+        Args:
+            key: Coalescing key
+            producer: Zero-argument callable returning an async iterable
+
+        Returns:
+            Async iterator over the produced chunks
+        """
+        # No lock needed: this runs on the event loop without awaiting
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.collapsed += 1
+            logger.info(f"🔗 {self.name}: joined in-flight request ({self.collapsed} collapsed so far)")
+            return flight.subscribe()
+
+        flight = AsyncFlight()
+        self._flights[key] = flight
+        self.started += 1
+
+        task = asyncio.create_task(self._run(key, flight, producer))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return flight.subscribe()
+
+    async def _run(self, key, flight, producer):
+        try:
+            async for chunk in producer():
+                await flight.publish(chunk)
+        except Exception as e:
+            logger.error(f"{self.name}: producer failed: {e}")
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            await flight.finish()
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "collapsed": self.collapsed,
+        }
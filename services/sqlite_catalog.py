@@ -0,0 +1,328 @@
+"""
+SQLite Catalog - Indexed SQLite storage backend for the destination catalog
+Places, attractions, dining, accommodation and travel options live in their
+own tables with indexes on the lookup keys, so finding a destination, a spot
+or the next free ID is an index probe instead of a walk over the catalog.
+
+Migrate an existing database.json with:
+    python -m services.sqlite_catalog data/processed/database.json data/processed/catalog.db
+and select it with CATALOG_BACKEND=sqlite.
+"""
+import os
+import json
+import sqlite3
+import logging
+import argparse
+import threading
+
+from services.catalog import CatalogBase, normalize_name, merge_destination, prepare_new_destination
+
+logger = logging.getLogger(__name__)
+
+# Columns per table; any other keys round-trip through the JSON `extra` column.
+# Value columns are declared without a type so SQLite stores them exactly as
+# given ("150" stays a string, 1.5 stays a float).
+PLACE_FIELDS = ("place_id", "place_name", "state", "description", "lat", "lon")
+ATTRACTION_FIELDS = ("spot_id", "place_id", "spot_name", "description", "lat", "lon")
+DINING_FIELDS = ("food_id", "food_place_name", "price_per_person", "budget_range")
+STAY_FIELDS = ("stay_id", "stay_name", "price_per_night", "budget_range")
+TRAVEL_FIELDS = ("travel_id", "source_city", "travel_mode", "approx_cost", "approx_duration_hours")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+
+CREATE TABLE IF NOT EXISTS places (
+    id INTEGER PRIMARY KEY,
+    name_key TEXT NOT NULL,
+    place_id, place_name, state, description, lat, lon,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_places_name_key ON places (name_key);
+CREATE INDEX IF NOT EXISTS idx_places_place_id ON places (place_id);
+CREATE INDEX IF NOT EXISTS idx_places_place_id_num ON places (CAST(place_id AS INTEGER));
+
+CREATE TABLE IF NOT EXISTS attractions (
+    id INTEGER PRIMARY KEY,
+    place_row INTEGER NOT NULL REFERENCES places (id) ON DELETE CASCADE,
+    spot_id, place_id, spot_name, description, lat, lon,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_attractions_place_row ON attractions (place_row);
+CREATE INDEX IF NOT EXISTS idx_attractions_spot_id ON attractions (spot_id);
+CREATE INDEX IF NOT EXISTS idx_attractions_spot_id_num ON attractions (CAST(spot_id AS INTEGER));
+
+CREATE TABLE IF NOT EXISTS dining (
+    id INTEGER PRIMARY KEY,
+    attraction_row INTEGER NOT NULL REFERENCES attractions (id) ON DELETE CASCADE,
+    food_id, food_place_name, price_per_person, budget_range,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_dining_attraction_row ON dining (attraction_row);
+
+CREATE TABLE IF NOT EXISTS accommodation (
+    id INTEGER PRIMARY KEY,
+    attraction_row INTEGER NOT NULL REFERENCES attractions (id) ON DELETE CASCADE,
+    stay_id, stay_name, price_per_night, budget_range,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_accommodation_attraction_row ON accommodation (attraction_row);
+
+CREATE TABLE IF NOT EXISTS travel_options (
+    id INTEGER PRIMARY KEY,
+    place_row INTEGER NOT NULL REFERENCES places (id) ON DELETE CASCADE,
+    travel_id, source_city, travel_mode, approx_cost, approx_duration_hours,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_travel_options_place_row ON travel_options (place_row);
+CREATE INDEX IF NOT EXISTS idx_travel_options_source ON travel_options (place_row, source_city);
+"""
+
+# Nested lists that are rebuilt from child tables rather than stored in `extra`
+PLACE_CHILDREN = ("attractions", "travel_options")
+ATTRACTION_CHILDREN = ("dining", "accommodation")
+_ABSENT = "__absent__"
+
+
+def _split(item: dict, fields: tuple, children: tuple = ()):
+    values = [item.get(field) for field in fields]
+    extra = {k: v for k, v in item.items() if k not in fields and k not in children}
+    # NULL alone can't tell "key missing" from "key: None"; likewise an
+    # empty child table can't tell "no list" from "empty list"
+    absent = [field for field in fields + children if field not in item]
+    if absent:
+        extra[_ABSENT] = absent
+    return values, json.dumps(extra, ensure_ascii=False) if extra else None
+
+
+def _join(row, fields: tuple, children: dict = None) -> dict:
+    item = {field: row[field] for field in fields}
+    item.update(children or {})
+    if row["extra"]:
+        extra = json.loads(row["extra"])
+        for field in extra.pop(_ABSENT, ()):
+            item.pop(field, None)
+        item.update(extra)
+    return item
+
+
+class SQLiteCatalog(CatalogBase):
+    """
+    SQLite catalog backend with the same interface as catalog.Catalog.
+
+    Each thread gets its own connection (WAL mode, so readers never block
+    on a writer). The assembled `places` list is cached and rebuilt only
+    when meta.version moves, which every write transaction bumps.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._places_cache = (None, [])
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _version(self, conn) -> int:
+        return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    # --- Reads ---
+
+    def _load_places(self, conn, place_rows, everything=False) -> list:
+        """Assemble nested destination dicts for the given places rows."""
+        if not place_rows:
+            return []
+
+        def children_of(table, parent_column, parent_ids):
+            # Whole-table scans when loading everything; otherwise batched
+            # IN lists that stay under SQLite's bound-parameter limit
+            if everything:
+                yield from conn.execute(f"SELECT * FROM {table} ORDER BY id")
+                return
+            for start in range(0, len(parent_ids), 900):
+                chunk = parent_ids[start:start + 900]
+                marks = ",".join("?" * len(chunk))
+                yield from conn.execute(f"SELECT * FROM {table} WHERE {parent_column} IN ({marks}) ORDER BY id", chunk)
+
+        place_ids = [row["id"] for row in place_rows]
+        attraction_rows = list(children_of("attractions", "place_row", place_ids))
+        attraction_ids = [row["id"] for row in attraction_rows]
+
+        grouped = {}
+        for table, fields in (("dining", DINING_FIELDS), ("accommodation", STAY_FIELDS)):
+            for row in children_of(table, "attraction_row", attraction_ids):
+                grouped.setdefault((table, row["attraction_row"]), []).append(_join(row, fields))
+
+        attractions_by_place = {}
+        for row in attraction_rows:
+            attraction = _join(row, ATTRACTION_FIELDS, {
+                "dining": grouped.get(("dining", row["id"]), []),
+                "accommodation": grouped.get(("accommodation", row["id"]), []),
+            })
+            attractions_by_place.setdefault(row["place_row"], []).append(attraction)
+
+        for row in children_of("travel_options", "place_row", place_ids):
+            grouped.setdefault(("travel_options", row["place_row"]), []).append(_join(row, TRAVEL_FIELDS))
+
+        return [_join(row, PLACE_FIELDS, {
+            "attractions": attractions_by_place.get(row["id"], []),
+            "travel_options": grouped.get(("travel_options", row["id"]), []),
+        }) for row in place_rows]
+
+    def _load_one(self, query: str, params: tuple):
+        conn = self._connect()
+        row = conn.execute(query, params).fetchone()
+        places = self._load_places(conn, [row] if row else [])
+        return places[0] if places else None
+
+    @property
+    def places(self) -> list:
+        conn = self._connect()
+        version = self._version(conn)
+        cached_version, cached = self._places_cache
+        if cached_version != version:
+            cached = self._load_places(conn, conn.execute("SELECT * FROM places ORDER BY id").fetchall(), everything=True)
+            self._places_cache = (version, cached)
+        return cached
+
+    def get_by_name(self, name):
+        key = normalize_name(name)
+        if not key:
+            return None
+        return self._load_one("SELECT * FROM places WHERE name_key = ? ORDER BY id LIMIT 1", (key,))
+
+    def get_by_place_id(self, place_id):
+        return self._load_one("SELECT * FROM places WHERE place_id = ? ORDER BY id LIMIT 1", (str(place_id),))
+
+    def get_spot(self, spot_id):
+        conn = self._connect()
+        row = conn.execute("SELECT place_row FROM attractions WHERE spot_id = ? ORDER BY id LIMIT 1",
+                           (str(spot_id),)).fetchone()
+        if not row:
+            return None
+        place = self._load_one("SELECT * FROM places WHERE id = ?", (row["place_row"],))
+        return next((a for a in place["attractions"] if str(a.get("spot_id")) == str(spot_id)), None)
+
+    def _find_substring(self, key):
+        return self._load_one("SELECT * FROM places WHERE instr(name_key, ?) > 0 ORDER BY id LIMIT 1", (key,))
+
+    def max_ids(self):
+        """(max numeric place_id, max numeric spot_id), answered from expression indexes."""
+        conn = self._connect()
+        max_place = conn.execute("SELECT MAX(CAST(place_id AS INTEGER)) FROM places").fetchone()[0]
+        max_spot = conn.execute("SELECT MAX(CAST(spot_id AS INTEGER)) FROM attractions").fetchone()[0]
+        return max_place or 0, max_spot or 0
+
+    # --- Writes ---
+
+    def _insert_place(self, conn, place: dict, row_id=None):
+        values, extra = _split(place, PLACE_FIELDS, PLACE_CHILDREN)
+        cursor = conn.execute(
+            f"INSERT INTO places (id, name_key, {', '.join(PLACE_FIELDS)}, extra) "
+            f"VALUES (?, ?, {', '.join('?' * len(PLACE_FIELDS))}, ?)",
+            [row_id, normalize_name(place.get("place_name"))] + values + [extra])
+        place_row = cursor.lastrowid
+
+        for attraction in place.get("attractions") or []:
+            values, extra = _split(attraction, ATTRACTION_FIELDS, ATTRACTION_CHILDREN)
+            cursor = conn.execute(
+                f"INSERT INTO attractions (place_row, {', '.join(ATTRACTION_FIELDS)}, extra) "
+                f"VALUES (?, {', '.join('?' * len(ATTRACTION_FIELDS))}, ?)",
+                [place_row] + values + [extra])
+            attraction_row = cursor.lastrowid
+            for table, fields, key in (("dining", DINING_FIELDS, "dining"),
+                                       ("accommodation", STAY_FIELDS, "accommodation")):
+                rows = [[attraction_row] + v + [e] for v, e in (_split(item, fields) for item in attraction.get(key) or [])]
+                if rows:
+                    conn.executemany(
+                        f"INSERT INTO {table} (attraction_row, {', '.join(fields)}, extra) "
+                        f"VALUES (?, {', '.join('?' * len(fields))}, ?)", rows)
+
+        rows = [[place_row] + v + [e] for v, e in (_split(item, TRAVEL_FIELDS) for item in place.get("travel_options") or [])]
+        if rows:
+            conn.executemany(
+                f"INSERT INTO travel_options (place_row, {', '.join(TRAVEL_FIELDS)}, extra) "
+                f"VALUES (?, {', '.join('?' * len(TRAVEL_FIELDS))}, ?)", rows)
+
+    def _bump_version(self, conn):
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def upsert(self, destination: dict) -> dict:
+        """Create or update one destination in a single transaction."""
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                row = conn.execute("SELECT id FROM places WHERE name_key = ? ORDER BY id LIMIT 1",
+                                   (normalize_name(destination.get("place_name")),)).fetchone()
+                if row:
+                    existing = self._load_one("SELECT * FROM places WHERE id = ?", (row["id"],))
+                    record = merge_destination(existing, destination)
+                    # Children cascade; re-inserting under the same row id keeps catalog order
+                    conn.execute("DELETE FROM places WHERE id = ?", (row["id"],))
+                    self._insert_place(conn, record, row_id=row["id"])
+                else:
+                    max_place_id, max_spot_id = self.max_ids()
+                    taken = lambda pid: conn.execute("SELECT 1 FROM places WHERE place_id = ?", (pid,)).fetchone() is not None
+                    record = prepare_new_destination(destination, max_place_id, max_spot_id, taken)
+                    self._insert_place(conn, record)
+                self._bump_version(conn)
+
+        return {"destination": record, "created": row is None, "updated": row is not None}
+
+    def replace_all(self, places: list):
+        """Replace the whole catalog with places in one transaction."""
+        with self._write_lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("DELETE FROM places")
+                for place in places:
+                    self._insert_place(conn, place)
+                self._bump_version(conn)
+
+    def compact(self):
+        """Nothing to fold in; reclaim space left by deleted rows."""
+        with self._write_lock:
+            self._connect().execute("VACUUM")
+
+
+def migrate_json_to_sqlite(json_path: str, sqlite_path: str) -> int:
+    """
+    Load a database.json (plus any pending change log) into a SQLite catalog.
+
+    Args:
+        json_path: Source JSON snapshot
+        sqlite_path: Target SQLite file (created if missing, replaced if present)
+
+    Returns:
+        Number of destinations written
+    """
+    from services.catalog import Catalog
+
+    places = Catalog(os.path.realpath(json_path)).places
+    SQLiteCatalog(os.path.realpath(sqlite_path)).replace_all(places)
+    return len(places)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert database.json into a SQLite catalog")
+    parser.add_argument("json_path", nargs="?", default=os.path.join(os.path.dirname(__file__), "../data/processed/database.json"))
+    parser.add_argument("sqlite_path", nargs="?", default=os.path.join(os.path.dirname(__file__), "../data/processed/catalog.db"))
+    args = parser.parse_args()
+
+    count = migrate_json_to_sqlite(args.json_path, args.sqlite_path)
+    print(f"Migrated {count} destinations into {args.sqlite_path}")
+
+
+if __name__ == "__main__":
+    main()
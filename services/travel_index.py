@@ -0,0 +1,137 @@
+"""
+Travel Index - Transport options per (source city, destination)
+A destination's travel_options are indexed by source city (sorted, with
+their cost/duration Pareto front) the first time it is looked up, and kept
+until its catalog record changes. plan-trip quotes each mode's cost and
+duration from memory instead of geocoding both ends and routing, and only
+the destinations actually planned are ever decoded (see binary_catalog.py).
+"""
+import logging
+import threading
+
+from services.catalog import get_catalog, normalize_name
+
+logger = logging.getLogger(__name__)
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def pareto_front(options: list) -> list:
+    """
+    Options not beaten on both cost and duration by another option.
+
+    Args:
+        options: Dicts with numeric "cost" and "duration_hours"
+
+    Returns:
+        The non-dominated options, cheapest (and so slowest) first
+    """
+    front = []
+    best_duration = float("inf")
+    for option in sorted(options, key=lambda o: (o["cost"], o["duration_hours"])):
+        if option["duration_hours"] < best_duration:
+            front.append(option)
+            best_duration = option["duration_hours"]
+    return front
+
+
+def destination_routes(place: dict) -> dict:
+    """
+    Index one destination's travel_options.
+
+    Returns:
+        {source city key: {"options": [...], "pareto": [...]}}, options
+        sorted by cost
+    """
+    routes = {}
+    for travel in place.get("travel_options") or []:
+        cost = _as_float(travel.get("approx_cost"))
+        duration = _as_float(travel.get("approx_duration_hours"))
+        source_key = normalize_name(travel.get("source_city"))
+        if cost is None or duration is None or not source_key:
+            continue
+        routes.setdefault(source_key, []).append({
+            "mode": str(travel.get("travel_mode", "")).replace("_", " "),
+            "cost": cost,
+            "duration_hours": duration,
+        })
+
+    for source_key, options in routes.items():
+        options.sort(key=lambda o: (o["cost"], o["duration_hours"]))
+        routes[source_key] = {"options": options, "pareto": pareto_front(options)}
+    return routes
+
+
+class TravelOptionsIndex:
+    """(source city, destination) -> {"options", "pareto"}, indexed per destination on first lookup."""
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        # destination key -> (catalog record it was built from, routes)
+        self._routes = {}
+
+    def __len__(self):
+        """Destinations indexed so far."""
+        return len(self._routes)
+
+    def routes(self, place: dict) -> dict:
+        """Routes into place, rebuilt only if its catalog record was replaced."""
+        key = normalize_name(place.get("place_name"))
+        cached = self._routes.get(key)
+        if cached is None or cached[0] is not place:
+            # Racing threads build the same small table; last one wins
+            cached = (place, destination_routes(place))
+            self._routes[key] = cached
+        return cached[1]
+
+    def get(self, source, destination):
+        """{"options": [...], "pareto": [...]} for the pair, or None if unknown."""
+        place = self.catalog.get_by_name(destination)
+        if place is None:
+            return None
+        return self.routes(place).get(normalize_name(source))
+
+
+_index_lock = threading.Lock()
+_index = None
+
+
+def get_travel_index() -> TravelOptionsIndex:
+    """Shared index over the current catalog."""
+    global _index
+    catalog = get_catalog()
+    if _index is None or _index.catalog is not catalog:
+        with _index_lock:
+            if _index is None or _index.catalog is not catalog:
+                _index = TravelOptionsIndex(catalog)
+    return _index
+
+
+def find_travel_options(source, destination):
+    """
+    Known transport options from source to destination.
+
+    Args:
+        source: Source city as typed by the user
+        destination: Destination name (misspellings/aliases resolved via the catalog)
+
+    Returns:
+        {"options": [...], "pareto": [...]} sorted by cost, or None when the
+        pair is not in the catalog
+    """
+    try:
+        index = get_travel_index()
+        route = index.get(source, destination)
+        if route is None:
+            place = index.catalog.find(destination)
+            if place is not None:
+                route = index.routes(place).get(normalize_name(source))
+        return route
+    except Exception as e:
+        logger.error(f"❌ Travel options lookup failed: {e}")
+        return None
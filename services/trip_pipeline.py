@@ -0,0 +1,144 @@
+"""
+Trip Pipeline - Shared steps of the plan-trip request
+app.py (threads) and async_app.py (one event loop) run the same pipeline;
+this module holds everything that does not depend on how I/O is awaited:
+which context stages to run, how places are ranked, the prompt, and
+whether an itinerary may be cached. Each app keeps only its sync/async glue.
+"""
+import logging
+
+from services.context_gatherer import Stage
+from services.travel_index import find_travel_options
+from services.local_db_service import build_destination_from_api
+from services.prompt_builder import build_prompt
+from services.llm_service import generate_fallback_itinerary
+from services.itinerary_cache import get_itinerary_cache, extract_itinerary_json
+from services.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+NO_RAG_RESULTS = "No relevant information found in knowledge base."
+
+
+def trip_params(data: dict) -> dict:
+    """The plan-trip request fields the pipeline uses."""
+    return {
+        "destination": data.get('destination'),
+        "budget": data.get('budget'),
+        "people": data.get('people'),
+        "days": data.get('days'),
+        "source": data.get('source'),
+        "transport": data.get('transport'),
+        "preferences": data.get('preferences', []),
+    }
+
+
+def run_recommender(destination, preferences, days, budget, people=1):
+    logger.info("🧠 Running ML Recommender...")
+    try:
+        # Imported on first use: pulls in pandas / scikit-learn (preloaded by warmup)
+        from ml_engine.recommender import get_recommendations
+        ml_recs = get_recommendations(destination, preferences, days, budget, people)
+        if ml_recs:
+            logger.info(f"✅ ML Recommender returned {len(ml_recs)} places")
+            return ml_recs
+        logger.info("⚠️ ML Recommender returned no results, using default ranking")
+    except Exception as ml_err:
+        logger.error(f"❌ ML Recommender Error: {ml_err}")
+        # Fallback to default ranking if ML fails
+    return []
+
+
+def rag_query(destination) -> str:
+    logger.info("📚 Querying RAG for travel context...")
+    return f"{destination} travel tips safety best time to visit"
+
+
+def rag_context_or_none(rag_context):
+    """The RAG result if it holds anything useful, else None."""
+    if rag_context and rag_context != NO_RAG_RESULTS:
+        logger.info("✅ RAG context retrieved successfully")
+        return rag_context
+    logger.info("ℹ️ No relevant RAG context found")
+    return None
+
+
+def context_stages(trip: dict, local_dest, fetch_rag, get_distance, get_coordinates):
+    """
+    Context-gathering stages for one trip.
+
+    Args:
+        trip: trip_params() of the request
+        local_dest: Catalog entry for the destination, or None
+        fetch_rag, get_distance, get_coordinates: The app's (sync or async)
+            RAG, routing and geocoding callables
+
+    Returns:
+        (stages, travel_options) - known city pairs are quoted from the
+        travel index, so routing only runs for the rest
+    """
+    destination, source = trip["destination"], trip["source"]
+    travel_options = find_travel_options(source, local_dest["place_name"]) if local_dest else None
+    stages = [
+        Stage("recommend", run_recommender, destination, trip["preferences"], trip["days"], trip["budget"],
+              trip["people"], timeout=5, fallback=[]),
+        Stage("rag", fetch_rag, destination, timeout=5),
+    ]
+    if not travel_options:
+        stages.append(Stage("distance", get_distance, source, destination, timeout=8))
+    if not local_dest:
+        # Coordinates are only needed to auto-add an unknown destination
+        stages.append(Stage("geocode", get_coordinates, destination, timeout=5))
+    return stages, travel_options
+
+
+def new_destination(destination, coords, api_places) -> dict:
+    """Catalog entry for a destination fetched from the live APIs."""
+    logger.info(f"🆕 {destination} not in DB. Fetching from API...")
+    return build_destination_from_api({
+        "destinationName": destination,
+        "coords": coords,
+        "places": api_places
+    })
+
+
+def rank_places(local_dest, new_dest, ml_recs) -> list:
+    """Recommender output when there is any, else the destination's attractions."""
+    if ml_recs:
+        return ml_recs
+    if local_dest:
+        return local_dest.get("attractions") or []
+    if new_dest:
+        return new_dest.get("attractions", [])
+    return []
+
+
+def build_trip_prompt(trip: dict, ranked_places, distance_info, travel_options, rag_context) -> str:
+    with stage_timer("prompt_build"):
+        preferences = trip["preferences"]
+        user_prefs_str = ", ".join(preferences) if preferences else "General sightseeing"
+
+        prompt_context = {
+            "places": ranked_places,
+            "distanceInfo": distance_info,
+            "travelOptions": travel_options,
+            "ragContext": rag_context
+        }
+
+        return build_prompt({
+            "destination": trip["destination"],
+            "source": trip["source"],
+            "budget": trip["budget"],
+            "people": trip["people"],
+            "days": trip["days"],
+            "transportMode": trip["transport"],
+            "preferences": user_prefs_str
+        }, prompt_context)
+
+
+def cache_itinerary(cache_key, itinerary, prompt) -> bool:
+    """Cache complete, real LLM output - never the canned fallback."""
+    if extract_itinerary_json(itinerary) and itinerary != generate_fallback_itinerary(prompt):
+        get_itinerary_cache().set(cache_key, itinerary)
+        return True
+    return False
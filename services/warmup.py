@@ -0,0 +1,113 @@
+"""
+Warmup - Preloads the catalog, RAG index, LLM client and ML models at boot
+/ready only reports 200 once every step has run, so a load balancer never
+routes real users to a cold worker.
+"""
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_started = False
+_ready = threading.Event()
+_steps = {}
+
+
+def _run_step(name, func):
+    started = time.perf_counter()
+    try:
+        detail = func()
+        _steps[name] = {"ok": True, "seconds": round(time.perf_counter() - started, 3), "detail": detail}
+        logger.info(f"🔥 Warmup '{name}' done in {_steps[name]['seconds']}s")
+    except Exception as e:
+        # A failed step is reported but does not keep the worker out of
+        # rotation: every request path already degrades gracefully
+        _steps[name] = {"ok": False, "seconds": round(time.perf_counter() - started, 3), "error": str(e)}
+        logger.error(f"❌ Warmup '{name}' failed: {e}")
+
+
+def _warm_catalog():
+    from services.catalog import get_catalog
+    return f"{len(get_catalog().places)} destinations"
+
+
+def _warm_rag():
+    from services.rag import get_vector_store
+    get_vector_store()
+    return "index ready"
+
+
+def _warm_models():
+    # Importing the recommender pulls in scikit-learn; one real
+    # recommendation also exercises the TF-IDF and scoring code paths
+    from services.catalog import get_catalog
+    from ml_engine.recommender import get_recommendations
+    from ml_engine.clustering import get_destination_clustering
+    from ml_engine.similar import get_similarity_index
+
+    # Stops at the first destination with attractions. On the mmap backend
+    # that is the only record decoded here: the recommender syncs against
+    # the fingerprints stored in the .bin directory, travel options are
+    # indexed per destination on lookup, and a fresh fit streams the
+    # catalog without keeping the decoded records
+    sample = next((p for p in get_catalog().places if p.get("attractions")), None)
+    if not sample:
+        return "no catalog data to warm with"
+    # Maps the trained artifacts (if any) instead of fitting in this process
+    recs = get_recommendations(sample["place_name"], ["sightseeing"], 2, 10000)
+    get_destination_clustering(sample["place_name"])
+    get_similarity_index()
+    return f"{len(recs)} recommendations for {sample['place_name']}"
+
+
+def _warm_llm():
+    # The Groq SDK (pydantic models for every API type) is imported on first
+    # use by llm_service; load it here rather than on the first plan-trip
+    import groq
+    return f"groq {groq.__version__}"
+
+
+def run_warmup():
+    """Run every warmup step, then mark the process ready."""
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="warmup") as pool:
+        # Catalog and models share the parsed DB; the RAG index is network bound
+        pool.submit(lambda: (_run_step("catalog", _warm_catalog), _run_step("models", _warm_models)))
+        pool.submit(lambda: (_run_step("llm", _warm_llm), _run_step("rag", _warm_rag)))
+
+    _ready.set()
+    logger.info(f"✅ Warmup complete in {time.perf_counter() - started:.2f}s")
+
+
+def start_warmup():
+    """
+    Start warmup on a background thread (once per process).
+
+    Set WARMUP_ENABLED=false to skip it and report ready immediately.
+    """
+    global _started
+    with _lock:
+        if _started:
+            return
+        _started = True
+
+    if os.getenv("WARMUP_ENABLED", "true").lower() == "false":
+        _ready.set()
+        return
+
+    threading.Thread(target=run_warmup, name="warmup", daemon=True).start()
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def warmup_status() -> dict:
+    return {
+        "status": "ready" if is_ready() else "warming",
+        "steps": dict(_steps),
+    }
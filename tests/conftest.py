@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Tests import the app's packages from the repo root and must never load the
+# trained artifacts, touch data/processed or reach a real provider; set
+# before anything is imported
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("WARMUP_ENABLED", "false")
+os.environ.setdefault("MODEL_DIR", tempfile.mkdtemp(prefix="tripsync-models-"))
+os.environ.setdefault("CATALOG_PATH", os.path.join(tempfile.mkdtemp(prefix="tripsync-catalog-"), "database.json"))
+os.environ.setdefault("ITINERARY_CACHE_DIR", "")
+for key in ("GROQ_API_KEY", "GEOAPIFY_API_KEY", "PLACES_API_KEY", "OPENAI_API_KEY", "GOOGLE_API_KEY",
+            "MAPPLS_CLIENT_ID", "MAPPLS_CLIENT_SECRET"):
+    os.environ.pop(key, None)
+# Nothing listens on the discard port: provider calls fail fast
+for key in ("MAPPLS_OUTPOST_URL", "MAPPLS_API_URL", "GEOAPIFY_BASE_URL", "NOMINATIM_BASE_URL",
+            "GOOGLE_MAPS_BASE_URL", "OVERPASS_URL"):
+    os.environ.setdefault(key, "http://127.0.0.1:9")
+
+
+def make_place(i, spots=3, sources=("Pune",)):
+    """A catalog destination in the database.json schema (numbers as strings)."""
+    name = f"Town {i}"
+    return {
+        "place_id": str(i + 1),
+        "place_name": name,
+        "state": "Maharashtra",
+        "description": f"{name} hill station with lakes and forts",
+        "attractions": [{
+            "spot_id": str(100 * (i + 1) + j),
+            "place_id": str(i + 1),
+            "spot_name": f"{name} {kind}",
+            "description": f"{kind} with views of the valley",
+            "dining": [{"food_id": str(j), "food_place_name": f"{kind} Cafe",
+                        "price_per_person": str(200 + 100 * j), "budget_range": "low"}],
+            "accommodation": [{"stay_id": str(j), "stay_name": f"{kind} Lodge",
+                               "price_per_night": str(1500 + 1000 * j), "budget_range": "Mid"}],
+        } for j, kind in enumerate(["Lake", "Fort", "Temple", "Waterfall", "Market"][:spots])],
+        "travel_options": [
+            {"travel_id": str(k), "source_city": source, "travel_mode": mode,
+             "approx_cost": cost, "approx_duration_hours": hours}
+            for k, (source, (mode, cost, hours)) in enumerate(
+                (source, option) for source in sources
+                for option in (("Bus", "400", "5"), ("Train", "300", "6"), ("Private Car", "3000", "3")))
+        ],
+    }
+
+
+@pytest.fixture
+def scratch_catalog(tmp_path, monkeypatch):
+    """
+    Point get_catalog() at a fresh catalog of the given places.
+
+    Usage: catalog = scratch_catalog(places, backend="json" | "mmap" | "sqlite")
+    """
+    import services.catalog as catalog_module
+    import services.travel_index as travel_index
+
+    def make(places, backend="json"):
+        path = tmp_path / "database.json"
+        path.write_text(json.dumps(places))
+        if backend == "sqlite":
+            from services.sqlite_catalog import migrate_json_to_sqlite
+            db_path = str(tmp_path / "catalog.db")
+            migrate_json_to_sqlite(str(path), db_path)
+            path = db_path
+        monkeypatch.setattr(catalog_module, "CATALOG_BACKEND", backend)
+        monkeypatch.setattr(catalog_module, "CATALOG_PATH", str(path))
+        monkeypatch.setattr(catalog_module, "_catalogs", {})
+        monkeypatch.setattr(travel_index, "_index", None)
+        if "ml_engine.recommender" in sys.modules:
+            monkeypatch.setattr(sys.modules["ml_engine.recommender"], "_model", (None, None))
+        return catalog_module.get_catalog()
+
+    return make
+
+
+@pytest.fixture(autouse=True)
+def empty_itinerary_cache():
+    from services.itinerary_cache import get_itinerary_cache
+    get_itinerary_cache().clear()
+    yield
+    get_itinerary_cache().clear()
@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+import pytest
+from conftest import make_place
+
+import ml_engine.artifacts as artifacts
+from ml_engine.artifacts import load_artifact, read_manifest, save_artifacts, set_current_version
+from ml_engine.train_models import train
+
+
+def save(model_dir, value):
+    return save_artifacts({"table": {"value": value, "array": np.arange(4) * value}}, {"note": value},
+                          str(model_dir))
+
+
+def test_newest_version_is_current_and_older_ones_still_load(tmp_path):
+    first, second = save(tmp_path, 1), save(tmp_path, 2)
+
+    model, entry = load_artifact("table", model_dir=str(tmp_path))
+    assert model["value"] == 2 and entry["version"] == second and entry["note"] == 2
+    # Arrays come back memory-mapped, not copied into the process
+    assert isinstance(model["array"], np.memmap)
+    assert load_artifact("table", first, str(tmp_path))[0]["value"] == 1
+    assert load_artifact("missing", model_dir=str(tmp_path)) == (None, None)
+
+
+def test_artifacts_from_another_sklearn_are_ignored(tmp_path):
+    version = save(tmp_path, 1)
+    manifest = read_manifest(str(tmp_path))
+    manifest["versions"][version]["sklearn"] = "0.0"
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest))
+
+    assert load_artifact("table", model_dir=str(tmp_path)) == (None, None)
+
+
+def test_old_versions_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "MODEL_KEEP_VERSIONS", 1)
+    versions = [save(tmp_path, value) for value in range(4)]
+
+    assert list(read_manifest(str(tmp_path))["versions"]) == versions[-2:]
+    assert not any((tmp_path / version).exists() for version in set(versions[:2]) - set(versions[-2:]))
+
+
+def test_rollback_to_previous_or_named_version(tmp_path):
+    first, second, third = save(tmp_path, 1), save(tmp_path, 2), save(tmp_path, 3)
+
+    assert set_current_version(model_dir=str(tmp_path)) == second
+    assert load_artifact("table", model_dir=str(tmp_path))[0]["value"] == 2
+    assert set_current_version(model_dir=str(tmp_path)) == first
+    with pytest.raises(ValueError):
+        set_current_version(model_dir=str(tmp_path))
+    assert set_current_version(third, str(tmp_path)) == third
+    with pytest.raises(ValueError):
+        set_current_version("19990101-000000", str(tmp_path))
+    assert read_manifest(str(tmp_path))["current"] == third
+
+
+def test_training_writes_loadable_artifacts(tmp_path):
+    db_path = tmp_path / "database.json"
+    db_path.write_text(json.dumps([make_place(i) for i in range(4)]))
+    model_dir = tmp_path / "models"
+
+    version = train(str(db_path), workers=1, model_dir=str(model_dir))
+
+    entry = read_manifest(str(model_dir))["versions"][version]
+    assert (entry["destinations"], entry["attractions"]) == (4, 12)
+    assert set(entry["files"]) == {"recommender", "clustering", "similar"}
+    recommender, _ = load_artifact("recommender", model_dir=str(model_dir))
+    assert recommender.ranges["town 2"] == (6, 9)
+    similar, _ = load_artifact("similar", model_dir=str(model_dir))
+    assert len(similar) == 12
@@ -0,0 +1,83 @@
+import asyncio
+import json
+
+import pytest
+from conftest import make_place
+
+pytest.importorskip("quart")
+
+import app as flask_app
+import async_app
+
+TRIP = {"destination": "Town 1", "source": "Pune", "budget": 15000, "people": 2, "days": 2,
+        "transport": "bus", "preferences": ["nature"]}
+ITINERARY = ['{"itinerary": ', '[{"day": 1}', "]}"]
+
+
+@pytest.fixture
+def both_apps(scratch_catalog, monkeypatch):
+    scratch_catalog([make_place(i) for i in range(3)])
+    prompts = {"sync": [], "async": []}
+
+    def llm(prompt, stream=False):
+        prompts["sync"].append(prompt)
+        return iter(ITINERARY)
+
+    async def llm_async(prompt, stream=False):
+        prompts["async"].append(prompt)
+
+        async def chunks():
+            for chunk in ITINERARY:
+                yield chunk
+        return chunks()
+
+    async def no_rag(query):
+        return ""
+
+    monkeypatch.setattr(flask_app, "call_llm", llm)
+    monkeypatch.setattr(flask_app, "query_rag", lambda query: "")
+    monkeypatch.setattr(async_app, "call_llm_async", llm_async)
+    monkeypatch.setattr(async_app, "query_rag_async", no_rag)
+    return prompts
+
+
+def sync_call(method, path, body=None):
+    response = flask_app.app.test_client().open(path, method=method, json=body)
+    return response.status_code, response.get_data(as_text=True)
+
+
+def async_call(method, path, body=None):
+    async def run():
+        response = await async_app.app.test_client().open(path, method=method, json=body)
+        return response.status_code, await response.get_data(as_text=True)
+    return asyncio.run(run())
+
+
+def test_plan_trip_builds_the_same_prompt_and_body(both_apps):
+    assert sync_call("POST", "/api/plan-trip", TRIP) == (200, "".join(ITINERARY))
+    # The sync run cached the itinerary; start the async app cold as well
+    from services.itinerary_cache import get_itinerary_cache
+    get_itinerary_cache().clear()
+    assert async_call("POST", "/api/plan-trip", TRIP) == (200, "".join(ITINERARY))
+
+    assert len(both_apps["sync"]) == len(both_apps["async"]) == 1
+    assert both_apps["sync"] == both_apps["async"]
+
+
+@pytest.mark.parametrize("method, path, body", [
+    ("POST", "/api/plan-trip", {"destination": "Town 1"}),
+    ("POST", "/api/recommend/batch", {"requests": [{"destination": "Town 1", "budget": 20000},
+                                                   {"destination": "Town 2"},
+                                                   {"destination": "Nowhere"}], "top_n": 2}),
+    ("POST", "/api/recommend/batch", {"requests": "Town 1"}),
+    ("POST", "/api/recommend/batch", {"requests": [], "top_n": "many"}),
+    ("GET", "/api/similar/101?k=x", None),
+    ("GET", "/api/similar/101", None),
+])
+def test_routes_answer_identically(both_apps, method, path, body):
+    status, text = sync_call(method, path, body)
+
+    assert async_call(method, path, body) == (status, text)
+    if path == "/api/recommend/batch" and status == 200:
+        lines = [json.loads(line) for line in text.splitlines()]
+        assert sorted(line["index"] for line in lines) == [0, 1, 2]
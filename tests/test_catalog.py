@@ -0,0 +1,170 @@
+import os
+import json
+import multiprocessing
+
+import pytest
+
+import services.catalog as catalog_module
+from services.catalog import Catalog, changelog_path
+
+
+def destination(name, place_id=None, spots=1):
+    place = {"place_name": name, "state": "Maharashtra",
+             "attractions": [{"spot_id": f"{name}-{i}", "spot_name": f"{name} spot {i}"} for i in range(spots)]}
+    if place_id is not None:
+        place["place_id"] = place_id
+    return place
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "database.json"
+    path.write_text(json.dumps([destination("Lonavala", "1"), destination("Matheran", "2")]))
+    return str(path)
+
+
+def log_lines(db_path):
+    with open(changelog_path(db_path)) as f:
+        return f.read().splitlines()
+
+
+def test_upsert_appends_to_the_log_only(db_path):
+    with open(db_path) as f:
+        before = f.read()
+    result = Catalog(db_path).upsert(destination("Alibaug"))
+
+    assert result["created"]
+    assert result["destination"]["place_id"] == "3"
+    with open(db_path) as f:
+        assert f.read() == before
+    assert len(log_lines(db_path)) == 1
+
+
+def test_fresh_catalog_replays_the_log(db_path):
+    writer = Catalog(db_path)
+    writer.upsert(destination("Alibaug"))
+    writer.upsert({"place_name": "Lonavala", "description": "Hill station"})
+
+    reader = Catalog(db_path)
+    assert [p["place_name"] for p in reader.places] == ["Lonavala", "Matheran", "Alibaug"]
+    lonavala = reader.get_by_name("Lonavala")
+    assert lonavala["description"] == "Hill station"
+    # Partial updates keep the attractions already stored
+    assert len(lonavala["attractions"]) == 1
+    assert reader.pending_changes == 2
+
+
+def test_reader_picks_up_other_writers_incrementally(db_path):
+    reader = Catalog(db_path)
+    assert len(reader.places) == 2
+    Catalog(db_path).upsert(destination("Alibaug"))
+    assert reader.get_by_name("alibaug") is not None
+    assert reader.reloads == 1
+
+
+def test_torn_last_line_is_not_applied(db_path):
+    Catalog(db_path).upsert(destination("Alibaug"))
+    with open(changelog_path(db_path), "a") as f:
+        f.write('{"op": "upsert", "destination": {"place_na')
+    catalog = Catalog(db_path)
+    assert [p["place_name"] for p in catalog.places] == ["Lonavala", "Matheran", "Alibaug"]
+
+
+def test_compaction_folds_the_log_into_the_snapshot(db_path, monkeypatch):
+    monkeypatch.setattr(catalog_module, "COMPACT_EVERY", 3)
+    catalog = Catalog(db_path)
+    for name in ("Alibaug", "Nashik"):
+        catalog.upsert(destination(name))
+    assert len(log_lines(db_path)) == 2
+
+    catalog.upsert(destination("Shirdi"))
+    assert log_lines(db_path) == []
+    with open(db_path) as f:
+        assert [p["place_name"] for p in json.load(f)][-3:] == ["Alibaug", "Nashik", "Shirdi"]
+    assert catalog.pending_changes == 0
+    assert len(Catalog(db_path).places) == 5
+
+
+def test_explicit_compact(db_path):
+    catalog = Catalog(db_path)
+    catalog.upsert(destination("Alibaug"))
+    catalog.compact()
+    assert log_lines(db_path) == []
+    assert Catalog(db_path).get_by_name("Alibaug") is not None
+
+
+def rewrite(db_path, places, bump_ns=1_000_000):
+    """Replace the snapshot file as another process would, with a newer mtime."""
+    before = os.stat(db_path).st_mtime_ns
+    with open(db_path, "w") as f:
+        f.write(places if isinstance(places, str) else json.dumps(places))
+    os.utime(db_path, ns=(before + bump_ns, before + bump_ns))
+
+
+def test_indexes_answer_lookups(db_path):
+    catalog = Catalog(db_path)
+
+    assert catalog.get_by_name("  MATHERAN ")["place_id"] == "2"
+    assert catalog.get_by_place_id(1)["place_name"] == "Lonavala"
+    assert catalog.get_spot("Matheran-0")["spot_name"] == "Matheran spot 0"
+    assert catalog.find("mathe")["place_name"] == "Matheran"
+    assert catalog.max_ids() == (2, 0)
+
+
+def test_snapshot_rewritten_by_another_process_is_reloaded(db_path):
+    catalog = Catalog(db_path)
+    first = catalog.snapshot()
+
+    # A newer mtime with identical content keeps the parsed snapshot
+    rewrite(db_path, [destination("Lonavala", "1"), destination("Matheran", "2")])
+    assert catalog.snapshot() is first
+
+    rewrite(db_path, [destination("Lonavala", "1"), destination("Nashik", "7")], bump_ns=2_000_000)
+    assert catalog.get_by_name("Matheran") is None
+    assert catalog.get_by_place_id("7")["place_name"] == "Nashik"
+    assert catalog.reloads == 2
+
+
+def test_unreadable_rewrite_keeps_the_last_good_snapshot(db_path):
+    catalog = Catalog(db_path)
+    assert len(catalog.places) == 2
+
+    rewrite(db_path, '[{"place_name": "Half wri')
+    assert [p["place_name"] for p in catalog.places] == ["Lonavala", "Matheran"]
+
+    rewrite(db_path, [destination("Nashik", "7")], bump_ns=2_000_000)
+    assert [p["place_name"] for p in catalog.places] == ["Nashik"]
+
+
+def test_get_catalog_shares_one_instance_per_file(db_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog_module, "CATALOG_BACKEND", "json")
+    monkeypatch.setattr(catalog_module, "_catalogs", {})
+    link = tmp_path / "link.json"
+    link.symlink_to(db_path)
+
+    catalog = catalog_module.get_catalog(db_path)
+    assert catalog_module.get_catalog(str(link)) is catalog
+    assert catalog_module.get_catalog(db_path) is catalog
+
+
+def _upsert_many(db_path, worker, count):
+    catalog = Catalog(db_path)
+    for i in range(count):
+        catalog.upsert(destination(f"Worker {worker} place {i}"))
+
+
+@pytest.mark.skipif(catalog_module.fcntl is None, reason="cross-process lock needs fcntl")
+def test_concurrent_processes_lose_no_upserts(db_path, monkeypatch):
+    # Compact often so appends race with log truncation
+    monkeypatch.setattr(catalog_module, "COMPACT_EVERY", 5)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_upsert_many, args=(db_path, w, 20)) for w in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(60)
+        assert worker.exitcode == 0
+
+    places = Catalog(db_path).places
+    assert len(places) == 2 + 4 * 20
+    assert len({p["place_id"] for p in places}) == len(places)
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+from conftest import make_place
+
+from services.binary_catalog import MmapCatalog
+from services.catalog import Catalog
+from services.sqlite_catalog import migrate_json_to_sqlite, SQLiteCatalog
+
+QUERIES = ["Town 3", "  town 3 ", "TOWN 11", "own 1", "Town 77", "Tovn 12", "Twon 7", "Lonavala", ""]
+
+
+def open_backend(backend, json_path, tmp_path):
+    if backend == "sqlite":
+        db_path = str(tmp_path / "catalog.db")
+        migrate_json_to_sqlite(json_path, db_path)
+        return SQLiteCatalog(db_path)
+    # Its own copy: the JSON and mmap backends share the file format and log
+    copy = tmp_path / "mmap" / "database.json"
+    copy.parent.mkdir()
+    copy.write_bytes(open(json_path, "rb").read())
+    return MmapCatalog(str(copy))
+
+
+@pytest.fixture(params=["sqlite", "mmap"])
+def backends(request, tmp_path):
+    """(JSON catalog, other backend) over the same destinations."""
+    places = [make_place(i) for i in range(15)]
+    places.append(dict(make_place(15), place_id="A-16"))
+    json_path = tmp_path / "database.json"
+    json_path.write_text(json.dumps(places))
+    return Catalog(str(json_path)), open_backend(request.param, str(json_path), tmp_path)
+
+
+def names(places):
+    return [p["place_name"] if p else None for p in places]
+
+
+def test_lookups_match_the_json_backend(backends):
+    reference, other = backends
+
+    assert names(map(other.find, QUERIES)) == names(map(reference.find, QUERIES))
+    assert other.max_ids() == reference.max_ids() == (15, 1602)
+    assert other.get_by_name("town 4") == reference.get_by_name("town 4")
+    assert other.get_by_place_id("A-16") == reference.get_by_place_id("A-16")
+    assert other.get_spot("1302") == reference.get_spot("1302")
+    assert names(other.places) == names(reference.places)
+
+
+def test_upserts_match_the_json_backend(backends):
+    reference, other = backends
+    # Numbered before the write lock, against a place_id another worker took
+    new = {"place_id": "3", "place_name": "Bhandardara", "state": "Maharashtra",
+           "attractions": [{"spot_id": "9", "place_id": "3", "spot_name": "Arthur Lake"},
+                           {"spot_id": "10", "place_id": "3", "spot_name": "Randha Falls"}]}
+    update = {"place_name": "town 2", "description": "Updated"}
+
+    for catalog in backends:
+        created = catalog.upsert(json.loads(json.dumps(new)))
+        assert created["created"] and created["destination"]["place_id"] == "16"
+        assert [s["spot_id"] for s in created["destination"]["attractions"]] == ["1603", "1604"]
+        assert catalog.upsert(dict(update))["updated"]
+
+    assert other.max_ids() == reference.max_ids() == (16, 1604)
+    assert other.get_by_name("Town 2") == reference.get_by_name("Town 2")
+    assert other.get_by_name("Town 2")["description"] == "Updated"
+    assert names(map(other.find, QUERIES + ["Bhandardra"])) == names(map(reference.find, QUERIES + ["Bhandardra"]))
+
+
+def test_mmap_lookups_decode_only_what_they_return(tmp_path):
+    json_path = tmp_path / "database.json"
+    json_path.write_text(json.dumps([make_place(i) for i in range(15)]))
+    catalog = MmapCatalog(str(json_path))
+    view = catalog.snapshot().view
+
+    assert catalog.max_ids() == (15, 1502)
+    found = {p["place_name"] for p in map(catalog.find, QUERIES) if p}
+    assert found == {"Town 3", "Town 11", "Town 7", "Town 12", "Town 1"}
+    assert view.decoded == len(found)
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from sklearn.cluster import KMeans, MiniBatchKMeans
+
+import ml_engine.clustering as clustering_module
+from ml_engine.clustering import PlaceClustering
+
+CENTRES = [(18.5, 73.8), (19.1, 72.9), (20.0, 73.8)]
+
+
+def blobs(per_blob=40, seed=0):
+    rng = np.random.default_rng(seed)
+    return [{"place_id": f"{b}-{i}", "lat": lat + rng.normal(0, 0.02), "lon": lon + rng.normal(0, 0.02)}
+            for b, (lat, lon) in enumerate(CENTRES) for i in range(per_blob)]
+
+
+def same_partition(a, b):
+    """Equal up to renaming the clusters."""
+    pairs = set(zip(a, b))
+    return len(pairs) == len(set(a)) == len(set(b))
+
+
+@pytest.mark.parametrize("mode, expected", [("full", KMeans), ("minibatch", MiniBatchKMeans)])
+def test_modes_find_the_same_groups(mode, expected):
+    places = blobs()
+
+    clustering = PlaceClustering(n_clusters=3, mode=mode, batch_size=32)
+    labels = clustering.train(places)
+
+    assert isinstance(clustering.kmeans, expected)
+    assert same_partition([labels[p["place_id"]] for p in places], [p["place_id"][0] for p in places])
+
+
+def test_auto_switches_to_minibatch_above_the_threshold(monkeypatch):
+    monkeypatch.setattr(clustering_module, "MINIBATCH_THRESHOLD", 100)
+
+    small = PlaceClustering(n_clusters=3)
+    small.train(blobs(per_blob=30))
+    large = PlaceClustering(n_clusters=3)
+    large.train(blobs(per_blob=40))
+
+    assert type(small.kmeans) is KMeans
+    assert isinstance(large.kmeans, MiniBatchKMeans)
+
+
+def test_rows_without_coordinates_or_id_are_skipped():
+    places = blobs(per_blob=3) + [{"place_id": "x", "lat": None, "lon": 73.1},
+                                  {"place_id": "y", "lat": "n/a", "lon": "73.1"},
+                                  {"place_id": None, "lat": 18.5, "lon": 73.8}]
+
+    labels = PlaceClustering(n_clusters=5).train(places)
+
+    assert set(labels) == {p["place_id"] for p in places[:9]}
+    assert PlaceClustering().train([{"place_id": "x"}]) == {}
+
+
+def test_fewer_points_than_clusters_shrinks_k():
+    clustering = PlaceClustering(n_clusters=5)
+    clustering.train(blobs(per_blob=1))
+    assert clustering.n_clusters == 3
+
+
+def test_batch_predict_matches_single_predictions():
+    clustering = PlaceClustering(n_clusters=3, mode="full")
+    clustering.train(blobs())
+    points = [(18.51, 73.79), (19.12, 72.91), (np.nan, 73.0), (20.01, 73.81)]
+
+    labels = clustering.predict_many(points)
+
+    assert labels[2] == -1
+    assert [int(labels[i]) for i in (0, 1, 3)] == [clustering.predict(*points[i]) for i in (0, 1, 3)]
+    assert len(set(labels[[0, 1, 3]].tolist())) == 3
+    as_dicts = [{"lat": lat, "lon": lon} for lat, lon in points]
+    assert clustering.predict_many(as_dicts).tolist() == labels.tolist()
+    assert PlaceClustering().predict_many(points).tolist() == [0, 0, 0, 0]
@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import services.context_gatherer as gatherer
+from services.context_gatherer import Stage, gather_context, gather_context_async
+
+
+@pytest.fixture(autouse=True)
+def fresh_slots(monkeypatch):
+    monkeypatch.setattr(gatherer, "_stage_slots", {})
+
+
+def sleeper(seconds, value):
+    time.sleep(seconds)
+    return value
+
+
+def failing():
+    raise RuntimeError("provider down")
+
+
+def test_stages_run_concurrently_with_fallbacks():
+    started = time.monotonic()
+    results = gather_context([
+        Stage("a", sleeper, 0.2, "A", timeout=2),
+        Stage("b", sleeper, 0.2, "B", timeout=2),
+        Stage("slow", sleeper, 1, "late", timeout=0.1, fallback="fallback"),
+        Stage("broken", failing, fallback=[]),
+    ])
+    assert results == {"a": "A", "b": "B", "slow": "fallback", "broken": []}
+    assert time.monotonic() - started < 0.8
+
+
+def test_deadline_starts_when_the_stage_runs(monkeypatch):
+    monkeypatch.setattr(gatherer, "_executor", ThreadPoolExecutor(max_workers=1))
+    results = gather_context([
+        Stage("first", sleeper, 0.3, "first", timeout=2),
+        # Queued for 0.3s, then runs for 0.3s: over 0.5s from submit, but
+        # well inside its deadline once it starts
+        Stage("second", sleeper, 0.3, "second", timeout=0.5, fallback="fallback"),
+    ])
+    assert results == {"first": "first", "second": "second"}
+
+
+def test_stage_still_queued_at_its_deadline_is_cancelled(monkeypatch):
+    monkeypatch.setattr(gatherer, "_executor", ThreadPoolExecutor(max_workers=1))
+    ran = []
+    results = gather_context([
+        Stage("blocker", sleeper, 0.4, "done", timeout=0.05, fallback="fallback"),
+        Stage("queued", ran.append, "ran", timeout=0.1, fallback="fallback"),
+    ])
+    assert results == {"blocker": "fallback", "queued": "fallback"}
+    time.sleep(0.5)
+    assert ran == []
+
+
+def test_hung_stage_holds_at_most_its_in_flight_cap(monkeypatch):
+    monkeypatch.setattr(gatherer, "STAGE_MAX_IN_FLIGHT", 2)
+    release = threading.Event()
+    calls = []
+
+    def hang():
+        calls.append(1)
+        release.wait(5)
+        return "late"
+
+    for _ in range(4):
+        assert gather_context([Stage("hung", hang, timeout=0.05, fallback=None)]) == {"hung": None}
+    assert len(calls) == 2  # the third and fourth requests skipped the stage
+
+    release.set()
+    time.sleep(0.1)
+    assert gather_context([Stage("hung", lambda: "ok", timeout=1)]) == {"hung": "ok"}
+
+
+def test_async_cancels_coroutines_and_runs_blocking_stages():
+    cancelled = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def quick(value):
+        return value
+
+    results = asyncio.run(gather_context_async([
+        Stage("slow", slow, timeout=0.05, fallback="fallback"),
+        Stage("quick", quick, "Q"),
+        Stage("blocking", sleeper, 0.05, "B"),
+    ]))
+    assert results == {"slow": "fallback", "quick": "Q", "blocking": "B"}
+    assert cancelled == [True]
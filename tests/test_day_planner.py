@@ -0,0 +1,90 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from ml_engine.day_planner import _plan, allocate_days, order_route
+
+
+def spots(coords):
+    return [{"spot_id": str(i), "lat": lat, "lon": lon} for i, (lat, lon) in enumerate(coords)]
+
+
+def random_spots(n, seed):
+    rng = np.random.default_rng(seed)
+    return spots(zip(18.5 + rng.random(n) * 0.4, 73.7 + rng.random(n) * 0.4))
+
+
+def path_length(xy, order):
+    return sum(np.linalg.norm(xy[a] - xy[b]) for a, b in zip(order, order[1:]))
+
+
+def nearest_neighbour(xy):
+    """The route order_route starts from, before 2-opt."""
+    order = [int(np.argmax(((xy - xy.mean(axis=0)) ** 2).sum(axis=1)))]
+    left = set(range(len(xy))) - set(order)
+    while left:
+        here = order[-1]
+        order.append(min(left, key=lambda j: (np.linalg.norm(xy[here] - xy[j]), j)))
+        left.remove(order[-1])
+    return order
+
+
+@pytest.mark.parametrize("n, days", [(7, 3), (12, 4), (20, 3), (5, 5), (3, 6)])
+def test_days_are_balanced_and_cover_every_place(n, days):
+    places = random_spots(n, seed=n * days)
+
+    plan = allocate_days(places, days)
+
+    sizes = [len(day) for day in plan.values()]
+    assert max(sizes) - min(sizes) <= 1
+    assert sorted(p["spot_id"] for day in plan.values() for p in day) == sorted(p["spot_id"] for p in places)
+    assert list(plan) == list(range(1, min(n, days) + 1))
+
+
+def test_days_keep_nearby_places_together():
+    west = [(18.52, 73.70 + 0.005 * i) for i in range(4)]
+    east = [(18.52, 74.40 + 0.005 * i) for i in range(4)]
+    places = spots(west + east)
+
+    plan = allocate_days(places, 2)
+
+    assert sorted(sorted(p["spot_id"] for p in day) for day in plan.values()) == [
+        ["0", "1", "2", "3"], ["4", "5", "6", "7"]]
+    # Along a line the route visits the places in order
+    assert [p["spot_id"] for p in plan[1]] in (["0", "1", "2", "3"], ["3", "2", "1", "0"],
+                                               ["4", "5", "6", "7"], ["7", "6", "5", "4"])
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_two_opt_never_lengthens_the_route_and_leaves_no_improving_swap(seed):
+    xy = np.random.default_rng(seed).random((9, 2)) * 10
+
+    order = order_route(xy)
+
+    assert sorted(order) == list(range(9))
+    assert path_length(xy, order) <= path_length(xy, nearest_neighbour(xy)) + 1e-9
+    for i, j in itertools.combinations(range(1, 9), 2):
+        reversed_segment = order[:i] + order[i:j + 1][::-1] + order[j + 1:]
+        assert path_length(xy, reversed_segment) >= path_length(xy, order) - 1e-6
+
+
+def test_unlocated_places_top_up_the_lightest_days():
+    places = random_spots(5, seed=1) + [{"spot_id": "x"}, {"spot_id": "y", "lat": "0", "lon": "0"}]
+
+    plan = allocate_days(places, 3)
+
+    assert [len(day) for day in plan.values()] == [3, 2, 2]
+    assert {p["spot_id"] for day in plan.values() for p in day} >= {"x", "y"}
+    assert allocate_days(places[:2] + [{"spot_id": "a"}, {"spot_id": "b"}], 2) is None
+
+
+def test_plans_are_cached_by_place_set():
+    places = random_spots(10, seed=3)
+    _plan.cache_clear()
+
+    first = allocate_days(places, 3)
+    second = allocate_days(list(reversed(places)), 3)
+
+    assert first == second
+    assert _plan.cache_info().hits == 1
@@ -0,0 +1,93 @@
+import json
+
+import pytest
+
+from services.catalog import Catalog
+from services.fuzzy_match import TrigramIndex, load_aliases, trigrams
+import services.local_db_service as local_db_service
+from services.local_db_service import find_destination
+
+PLACES = [
+    {"place_id": "t1", "place_name": "Mahabaleshwar", "attractions": []},
+    {"place_id": "t2", "place_name": "Lonavala", "attractions": []},
+    {"place_id": "t3", "place_name": "Alibaug", "aliases": ["Alibag"], "attractions": []},
+    {"place_id": "t4", "place_name": "Ganpatipule", "attractions": []},
+]
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    path = tmp_path / "database.json"
+    path.write_text(json.dumps(PLACES))
+    return Catalog(str(path))
+
+
+def test_trigrams_are_normalized_and_padded():
+    assert trigrams("Goa!") == trigrams("goa") == {"  g", " go", "goa", "oa "}
+
+
+def test_search_ranks_closest_first():
+    index = TrigramIndex.from_places(PLACES)
+    matches = index.search("Mahabaleswar")
+    assert matches[0][0]["place_name"] == "Mahabaleshwar"
+    assert 0.45 <= matches[0][1] < 1.0
+    assert index.search("Mahabaleshwar")[0][1] == 1.0
+    assert index.search("Xyzzy") == []
+
+
+def test_name_and_alias_hits_collapse_to_one_result():
+    index = TrigramIndex.from_places(PLACES)
+    matches = index.search("Alibag", threshold=0.1)
+    assert [payload["place_id"] for payload, _, _ in matches].count("t3") == 1
+    # The better of the two spellings is the one reported
+    assert matches[0][1:] == (1.0, "Alibag")
+
+
+def test_find_order(catalog):
+    assert catalog.find("LONAVALA")["place_id"] == "t2"
+    assert catalog.find("Alibag")["place_id"] == "t3"           # alias
+    assert catalog.find("ganpati")["place_id"] == "t4"          # substring
+    assert catalog.find("Lonavla")["place_id"] == "t2"          # misspelling
+    assert catalog.find("Mahabaleswar")["place_id"] == "t1"
+    assert catalog.find("Kathmandu") is None
+    assert catalog.find("") is None
+
+
+def test_index_is_reused_until_the_catalog_changes(catalog):
+    index = catalog.fuzzy_index()
+    catalog.find("Lonavla")
+    catalog.find("Kathmandu")
+    assert catalog.fuzzy_index() is index
+
+    catalog.upsert({"place_name": "Igatpuri", "attractions": []})
+    assert catalog.fuzzy_index() is not index
+    assert catalog.find("Igatpuuri")["place_name"] == "Igatpuri"
+
+
+def test_load_aliases(tmp_path):
+    path = tmp_path / "aliases.txt"
+    path.write_text("alias_id,place_id,alias\n1,t3,Alibag\n2,t3,Alibagh\n3,,Orphan\n")
+    assert load_aliases(str(path)) == {"t3": ["Alibag", "Alibagh"]}
+    assert load_aliases(str(tmp_path / "missing.txt")) == {}
+
+
+def test_find_destination_matches_against_the_db_it_is_given():
+    db = [dict(place) for place in PLACES]
+    assert find_destination(db, "Lonavala") is db[1]
+    assert find_destination(db, "Lonavla") is db[1]
+    assert find_destination(db, "alibag") is db[2]
+    assert find_destination(db, "Kathmandu") is None
+    # Only what is in db: a filtered list never resolves to anything else
+    assert find_destination(db[2:], "Lonavla") is None
+
+
+def test_find_destination_reuses_its_index_until_db_changes():
+    db = [dict(place) for place in PLACES]
+    find_destination(db, "Lonavla")
+    index = local_db_service._fuzzy_cache[2]
+    find_destination(db, "Mahabaleswar")
+    assert local_db_service._fuzzy_cache[2] is index
+
+    local_db_service.upsert_destination(db, {"place_name": "Igatpuri"})
+    assert find_destination(db, "Igatpuuri") is db[-1]
+    assert local_db_service._fuzzy_cache[2] is not index
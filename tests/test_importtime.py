@@ -0,0 +1,26 @@
+import pytest
+
+from loadtest.importtime import LAZY_MODULES, measure, parse_importtime
+
+# Same budget as `python -m loadtest.importtime --budget-ms 1000`
+BUDGET_MS = 1000
+
+STDERR = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        900 |   flask
+import time:        50 |       1100 | app
+"""
+
+
+def test_parse_importtime_reads_depth_and_times():
+    assert parse_importtime(STDERR) == [("_io", 1, 120, 120), ("flask", 1, 300, 900), ("app", 0, 50, 1100)]
+
+
+@pytest.mark.parametrize("module", ["app", "async_app"])
+def test_cold_import_stays_within_budget_and_lazy(module):
+    pytest.importorskip("quart" if module == "async_app" else "flask")
+    report = measure(module, runs=3)
+
+    assert [name for name in LAZY_MODULES if name in report["modules"]] == []
+    assert report["total_ms"] <= BUDGET_MS
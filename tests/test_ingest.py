@@ -0,0 +1,93 @@
+import os
+import pathlib
+
+import pytest
+
+from services.catalog import get_catalog
+from services.ingest import ingest, manifest_path
+
+RAW = {
+    "places.txt": ["place_id,place_name,state,description",
+                   "1,Lonavala,Maharashtra,Hill station",
+                   "2,Matheran,Maharashtra,Car-free hill station"],
+    "spots.txt": ["spot_id,place_id,spot_name,description",
+                  "1,1,Tiger Point,Valley viewpoint",
+                  "2,1,Bhushi Dam,Monsoon spot",
+                  "3,2,Charlotte Lake,Quiet lake"],
+    "food_options.txt": ["food_id,spot_id,food_place_name,price_per_person,budget_range",
+                         "1,1,Point Cafe,250,low"],
+    "stay_options.txt": ["stay_id,spot_id,stay_name,price_per_night,budget_range",
+                         "1,3,Lake Lodge,2200,Mid"],
+    "travel_options.txt": ["travel_id,place_id,source_city,travel_mode,approx_cost,approx_duration_hours",
+                           "1,1,Mumbai,Train,150,2.5",
+                           "2,2,Mumbai,Private Car,2500,2.5"],
+}
+
+
+def write_raw(raw_dir, name, lines):
+    path = pathlib.Path(raw_dir, name)
+    # Later writes always get a newer mtime, however coarse the filesystem clock
+    mtime = os.stat(path).st_mtime_ns + 1_000_000 if path.exists() else None
+    path.write_text("\n".join(lines) + "\n")
+    if mtime is not None:
+        os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def paths(tmp_path):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    for name, lines in RAW.items():
+        write_raw(raw_dir, name, lines)
+    return str(raw_dir), str(tmp_path / "database.json")
+
+
+def test_first_run_builds_every_destination(paths):
+    raw_dir, db_path = paths
+
+    assert ingest(raw_dir, db_path) == {"added": 2, "updated": 0, "removed": 0, "unchanged": 0, "written": True}
+    lonavala = get_catalog(db_path).get_by_name("Lonavala")
+    assert [s["spot_name"] for s in lonavala["attractions"]] == ["Tiger Point", "Bhushi Dam"]
+    assert lonavala["attractions"][0]["dining"] == [
+        {"food_id": "1", "food_place_name": "Point Cafe", "price_per_person": "250", "budget_range": "low"}]
+    assert lonavala["travel_options"] == [
+        {"travel_id": "1", "source_city": "Mumbai", "travel_mode": "Train", "approx_cost": "150",
+         "approx_duration_hours": "2.5"}]
+    assert os.path.exists(manifest_path(db_path))
+
+
+def test_unchanged_raw_data_is_not_rewritten(paths):
+    raw_dir, db_path = paths
+    ingest(raw_dir, db_path)
+    written = os.stat(db_path).st_mtime_ns
+
+    assert ingest(raw_dir, db_path)["unchanged"] == 2
+    # Touched but identical: every destination is re-hashed, none rebuilt
+    write_raw(raw_dir, "spots.txt", RAW["spots.txt"])
+    assert ingest(raw_dir, db_path) == {"added": 0, "updated": 0, "removed": 0, "unchanged": 2, "written": False}
+    assert os.stat(db_path).st_mtime_ns == written
+
+
+def test_only_the_changed_destination_is_rebuilt(paths):
+    raw_dir, db_path = paths
+    ingest(raw_dir, db_path)
+    catalog = get_catalog(db_path)
+    lonavala = catalog.get_by_name("Lonavala")
+
+    write_raw(raw_dir, "stay_options.txt", RAW["stay_options.txt"] + ["2,3,Forest Inn,3200,High"])
+    assert ingest(raw_dir, db_path) == {"added": 0, "updated": 1, "removed": 0, "unchanged": 1, "written": True}
+
+    assert catalog.get_by_name("Lonavala") == lonavala
+    stays = catalog.get_by_name("Matheran")["attractions"][0]["accommodation"]
+    assert [s["stay_name"] for s in stays] == ["Lake Lodge", "Forest Inn"]
+
+
+def test_live_additions_survive_and_removals_are_counted(paths):
+    raw_dir, db_path = paths
+    ingest(raw_dir, db_path)
+    catalog = get_catalog(db_path)
+    catalog.upsert({"place_name": "Bhandardara", "attractions": []})
+
+    write_raw(raw_dir, "places.txt", RAW["places.txt"][:2])
+    assert ingest(raw_dir, db_path) == {"added": 0, "updated": 0, "removed": 1, "unchanged": 1, "written": True}
+    assert [p["place_name"] for p in catalog.places] == ["Lonavala", "Bhandardara"]
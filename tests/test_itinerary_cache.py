@@ -0,0 +1,65 @@
+import time
+
+from services.itinerary_cache import ItineraryCache, extract_itinerary_json, make_trip_key
+
+TRIP = {"destination": "Lonavala", "source": "Mumbai", "budget": 12000, "people": 2,
+        "days": 3, "transport": "car", "preferences": ["nature", "food"]}
+
+
+def test_key_ignores_formatting_and_preference_order():
+    variant = dict(TRIP, destination="  LONAVALA ", preferences="food,nature,", days="3")
+    assert make_trip_key(variant) == make_trip_key(TRIP)
+
+
+def test_key_buckets_budget_but_keeps_source():
+    assert make_trip_key(dict(TRIP, budget=12500)) == make_trip_key(TRIP)
+    assert make_trip_key(dict(TRIP, budget=16000)) != make_trip_key(TRIP)
+    assert make_trip_key(dict(TRIP, source="Pune")) != make_trip_key(TRIP)
+
+
+def test_key_uses_resolved_destination():
+    resolved = {"place_id": "7", "place_name": "Lonavala"}
+    misspelled = dict(TRIP, destination="Lonavla")
+    assert make_trip_key(misspelled, resolved) == make_trip_key(TRIP, resolved)
+
+
+def test_lru_eviction():
+    cache = ItineraryCache(max_size=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"  # a is now most recently used
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry(monkeypatch):
+    cache = ItineraryCache(max_size=4, ttl=10)
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    cache.set("a", "1")
+    assert cache.get("a") == "1"
+    monkeypatch.setattr(time, "time", lambda: now + 11)
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ItineraryCache(max_size=0)
+    cache.set("a", "1")
+    assert cache.get("a") is None
+
+
+def test_disk_tier_survives_a_new_process(tmp_path):
+    ItineraryCache(max_size=2, disk_dir=str(tmp_path)).set("a", "1")
+    fresh = ItineraryCache(max_size=2, disk_dir=str(tmp_path))
+    assert fresh.get("a") == "1"
+    assert fresh.stats()["disk_hits"] == 1
+
+
+def test_extract_itinerary_json():
+    assert extract_itinerary_json('```json\n{"days": []}\n```') == {"days": []}
+    assert extract_itinerary_json("Sorry, I cannot help") is None
+    assert extract_itinerary_json("[1, 2]") is None
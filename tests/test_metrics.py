@@ -0,0 +1,74 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+
+import app as flask_app
+from services import metrics
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics(monkeypatch):
+    for name in ("_stage_histograms", "_provider_histograms", "_provider_calls", "_provider_errors"):
+        monkeypatch.setattr(metrics, name, {})
+
+
+def series(text):
+    """{'name{labels}': value} for every sample line of a Prometheus exposition."""
+    return {line.rsplit(" ", 1)[0]: float(line.rsplit(" ", 1)[1])
+            for line in text.splitlines() if line and not line.startswith("#")}
+
+
+def test_histogram_buckets_are_cumulative_and_inclusive():
+    for seconds in (0.003, 0.005, 0.2, 120):
+        metrics.observe_stage("rag", seconds)
+
+    samples = series(metrics.render_prometheus())
+    name = "tripsync_stage_duration_seconds"
+    assert samples[f'{name}_bucket{{stage="rag",le="0.005"}}'] == 2
+    assert samples[f'{name}_bucket{{stage="rag",le="0.1"}}'] == 2
+    assert samples[f'{name}_bucket{{stage="rag",le="0.25"}}'] == 3
+    assert samples[f'{name}_bucket{{stage="rag",le="60"}}'] == 3
+    assert samples[f'{name}_bucket{{stage="rag",le="+Inf"}}'] == 4
+    assert samples[f'{name}_count{{stage="rag"}}'] == 4
+    assert samples[f'{name}_sum{{stage="rag"}}'] == pytest.approx(120.208)
+
+
+def test_tracked_counts_exceptions_and_http_errors():
+    metrics.tracked("geoapify", lambda: SimpleNamespace(status_code=200))
+    metrics.tracked("geoapify", lambda: SimpleNamespace(status_code=503))
+    with pytest.raises(TimeoutError):
+        metrics.tracked("geoapify", lambda: (_ for _ in ()).throw(TimeoutError()))
+
+    samples = series(metrics.render_prometheus())
+    assert samples['tripsync_provider_requests_total{provider="geoapify"}'] == 3
+    assert samples['tripsync_provider_errors_total{provider="geoapify"}'] == 2
+    assert samples['tripsync_provider_request_duration_seconds_count{provider="geoapify"}'] == 3
+
+
+def test_server_timing_aggregates_repeated_entries():
+    timings = metrics.RequestTimings()
+    timings.add("geoapify", 0.010)
+    timings.add("geoapify", 0.020)
+    timings.add("rag", 0.0054)
+
+    parts = timings.header().split(", ")
+    assert parts[:2] == ['geoapify;desc="2 calls";dur=30.0', "rag;dur=5.4"]
+    assert re.fullmatch(r"total;dur=\d+\.\d", parts[2])
+
+
+def test_place_images_sends_server_timing_and_metrics_exposes_the_stage(monkeypatch):
+    monkeypatch.setattr(flask_app, "get_place_images", lambda places, destination: {"Fort": "fort.jpg"})
+    client = flask_app.app.test_client()
+
+    response = client.post("/api/place-images", json={"places": ["Fort"], "destination": "Town 0"})
+    assert response.get_json() == {"images": {"Fort": "fort.jpg"}}
+    header = response.headers["Server-Timing"]
+    assert re.fullmatch(r"place_images;dur=\d+\.\d, total;dur=\d+\.\d", header)
+
+    response = client.get("/metrics")
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    samples = series(response.get_data(as_text=True))
+    assert samples['tripsync_stage_duration_seconds_count{stage="place_images"}'] == 1
+    assert "tripsync_itinerary_cache_hits_total" in samples
+    assert "tripsync_plan_trip_in_flight" in samples
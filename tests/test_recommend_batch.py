@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+import ml_engine.recommender as recommender_module
+from services.catalog import Catalog
+
+
+def spot(spot_id, name, category, description, lat, lon):
+    return {"spot_id": spot_id, "spot_name": name, "category": category, "description": description,
+            "lat": lat, "lon": lon}
+
+
+PLACES = [
+    {"place_id": "1", "place_name": "Lonavala", "attractions": [
+        spot("11", "Tiger Point", "Viewpoint", "Valley view and waterfalls in the monsoon", 18.73, 73.38),
+        spot("12", "Karla Caves", "Heritage", "Ancient Buddhist rock-cut caves", 18.78, 73.47),
+        spot("13", "Bhushi Dam", "Nature", "Dam with water steps and waterfalls", 18.76, 73.40),
+    ]},
+    {"place_id": "2", "place_name": "Alibaug", "aliases": ["Alibag"], "attractions": [
+        spot("21", "Kolaba Fort", "Heritage", "Sea fort reachable at low tide", 18.63, 72.87),
+        spot("22", "Varsoli Beach", "Beach", "Quiet beach with water sports", 18.65, 72.87),
+    ]},
+]
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    path = tmp_path / "database.json"
+    path.write_text(json.dumps(PLACES))
+    catalog = Catalog(str(path))
+    monkeypatch.setattr(recommender_module, "get_catalog", lambda: catalog)
+    monkeypatch.setattr(recommender_module, "_model", (None, None))
+    return catalog
+
+
+def test_batch_matches_single_requests(catalog):
+    requests = [
+        {"destination": "Lonavala", "preferences": ["waterfalls"], "days": 2, "budget": 8000},
+        {"destination": "Alibag", "preferences": ["beach"]},
+        {"destination": "lonavala", "preferences": ["caves heritage"]},
+    ]
+    results = list(recommender_module.get_recommendations_batch(requests, top_n=15))
+
+    # Grouped by destination: both Lonavala requests come out together
+    assert [r["index"] for r in results] == [0, 2, 1]
+    for result in results:
+        req = requests[result["index"]]
+        single = recommender_module.get_recommendations(req["destination"], req["preferences"],
+                                                        req.get("days", 3), req.get("budget", 5000))
+        assert result["recommendations"] == single
+        assert result["destination"] == req["destination"]
+    assert results[2]["place_name"] == "Alibaug"
+    assert results[0]["recommendations"][0]["spot_name"] in ("Tiger Point", "Bhushi Dam")
+
+
+def test_batch_top_n_and_unknown_destination(catalog):
+    results = list(recommender_module.get_recommendations_batch(
+        [{"destination": "Kathmandu"}, {"destination": "Lonavala", "preferences": []}], top_n=1))
+    by_index = {r["index"]: r for r in results}
+    assert by_index[0]["error"] == "Unknown destination"
+    assert by_index[0]["recommendations"] == []
+    assert len(by_index[1]["recommendations"]) == 1
+
+
+@pytest.fixture
+def client(catalog):
+    from app import app
+    return app.test_client()
+
+
+def test_batch_endpoint_streams_ndjson(client):
+    response = client.post("/api/recommend/batch", json={
+        "requests": [{"destination": "Alibaug", "preferences": ["fort"]}], "top_n": 500})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line["index"] for line in lines] == [0]
+    assert len(lines[0]["recommendations"]) == 2
+
+
+@pytest.mark.parametrize("body", [
+    {"requests": "Lonavala"},
+    {"requests": [{"destination": 5}]},
+    {"requests": [{"destination": "Lonavala"}], "top_n": "ten"},
+    {"requests": [{"destination": "Lonavala"}], "top_n": None},
+])
+def test_batch_endpoint_rejects_bad_input(client, body):
+    assert client.post("/api/recommend/batch", json=body).status_code == 400
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+from conftest import make_place
+
+import ml_engine.recommender as recommender_module
+from ml_engine.recommender import ContentRecommender
+
+
+@pytest.fixture
+def catalog(scratch_catalog):
+    return scratch_catalog([make_place(i, spots=5) for i in range(6)])
+
+
+def test_requests_score_a_slice_of_one_shared_model(catalog, monkeypatch):
+    def per_request_training(self, places_data, fit=True):
+        raise AssertionError("a known destination must not be trained per request")
+
+    model = recommender_module.get_catalog_recommender()
+    monkeypatch.setattr(ContentRecommender, "train", per_request_training)
+
+    for name in ("Town 1", "town 4", "Town 5"):
+        recs = recommender_module.get_recommendations(name, ["waterfall"], 2, 20000, 2)
+        assert {r["place_id"] for r in recs} == {catalog.find(name)["place_id"]}
+        assert recs[0]["spot_name"].endswith("Waterfall")
+    assert recommender_module.get_catalog_recommender() is model
+    assert model.ranges["town 4"] == (20, 25)
+
+
+def test_catalog_model_matches_the_single_destination_ranking(catalog):
+    model = recommender_module.get_catalog_recommender()
+    place = catalog.get_by_name("Town 2")
+    context = {"budget": 9000, "days": 3, "people": 2}
+
+    shared = model.recommend("lake fort views", context, rows=model.ranges["town 2"], records=place["attractions"])
+    alone = ContentRecommender().train(place["attractions"]).recommend("lake fort views", context)
+    # IDF differs between the two fits, so compare what the rows point at
+    assert {r["spot_id"] for r in shared[:2]} == {r["spot_id"] for r in alone[:2]}
+    assert [r["scores"]["budget"] for r in shared] == pytest.approx(
+        [next(a["scores"]["budget"] for a in alone if a["spot_id"] == r["spot_id"]) for r in shared])
+
+
+@pytest.mark.parametrize("top_n", [1, 3, 7, 40, 41, 100])
+def test_top_n_matches_a_stable_full_sort(top_n):
+    rng = np.random.default_rng(7)
+    # Few distinct values, so the cut falls inside runs of ties
+    scores = rng.integers(0, 6, size=40).astype(float) / 5
+
+    expected = np.argsort(-scores, kind="stable")[:top_n]
+    assert ContentRecommender._top_n(scores, top_n).tolist() == expected.tolist()
+
+
+def test_recommend_orders_by_blended_score(catalog):
+    model = recommender_module.get_catalog_recommender()
+    place = catalog.get_by_name("Town 3")
+    spot_ids = [spot["spot_id"] for spot in place["attractions"]]
+    context = {"budget": 6000, "days": 2, "people": 1}
+
+    def recommend(profile, top_n):
+        return model.recommend(profile, context, top_n=top_n, rows=model.ranges["town 3"],
+                               records=place["attractions"])
+
+    recs = recommend("temple market", 10)
+    assert len(recs) == 5
+    for rec in recs:
+        parts = rec["scores"]
+        assert rec["ml_score"] == pytest.approx(0.6 * parts["preference"] + 0.2 * parts["distance"]
+                                                + 0.2 * parts["budget"])
+    # Best first; equal scores keep catalog order
+    ranked = [(-rec["ml_score"], spot_ids.index(rec["spot_id"])) for rec in recs]
+    assert ranked == sorted(ranked)
+    assert {rec["spot_name"] for rec in recs[:2]} == {"Town 3 Temple", "Town 3 Market"}
+
+    assert recommend("temple market", 2) == recs[:2]
+    assert recommend("temple market", 0) == []
+
+
+def priced(spot_id, meal, room):
+    spot = {"spot_id": spot_id, "spot_name": f"Spot {spot_id}", "description": "viewpoint"}
+    if meal is not None:
+        spot["dining"] = [{"price_per_person": str(meal)}, {"price_per_person": str(meal * 2)}]
+    if room is not None:
+        spot["accommodation"] = [{"price_per_night": str(room)}, {"price_per_night": "n/a"}]
+    return spot
+
+
+def test_fit_scores_by_how_much_of_the_price_range_fits():
+    low, avg = np.array([100., 100., 100., 400., np.nan]), np.array([200., 200., 200., 600., np.nan])
+
+    scores = recommender_module._fit_scores(200, low, avg)
+
+    assert scores[:4].tolist() == [1.0, 1.0, 1.0, 0.25]
+    assert np.isnan(scores[4])
+    partial = recommender_module._fit_scores(np.array([100., 150., 199.]), np.full(3, 100.), np.full(3, 200.))
+    assert partial.tolist() == pytest.approx([0.5, 0.75, 0.995])
+
+
+def test_budget_scores_fall_as_prices_rise():
+    spots = [priced("1", 100, 1000), priced("2", 300, 3000), priced("3", 900, 9000),
+             priced("4", None, None), priced("5", 100, None)]
+    model = ContentRecommender().train(spots)
+
+    def budget(amount, people=1):
+        return model._budget_scores({"budget": amount, "days": 2, "people": people}, 0, len(spots))
+
+    tight = budget(6000)
+    assert tight[0] > tight[1] > tight[2]
+    assert tight[3] == 0.5
+    assert tight[4] == 1.0
+    assert budget(200000).tolist() == [1.0, 1.0, 1.0, 0.5, 1.0]
+    assert budget(None).tolist() == budget("lots").tolist() == [1.0] * 5
+    # Two travellers share one room: the per-person stay cost halves
+    assert budget(12000, people=2)[1] > budget(6000)[1]
+
+
+def test_tight_budget_ranks_the_cheaper_of_equal_spots_first():
+    spots = [priced("1", 900, 9000), priced("2", 300, 3000), priced("3", 100, 1000)]
+    model = ContentRecommender().train(spots)
+
+    recs = model.recommend("viewpoint", {"budget": 5000, "days": 2, "people": 1})
+    assert [r["spot_id"] for r in recs] == ["3", "2", "1"]
+    recs = model.recommend("viewpoint", {"budget": 500000, "days": 2, "people": 1})
+    assert [r["spot_id"] for r in recs] == ["1", "2", "3"]
@@ -0,0 +1,158 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+import ml_engine.recommender as recommender_module
+from ml_engine.recommender import ContentRecommender, _sync, attractions_fingerprint
+from services.binary_catalog import MmapCatalog
+from services.catalog import Catalog
+
+
+def place(name, *descriptions):
+    return {"place_name": name, "attractions": [
+        {"spot_id": f"{name}-{i}", "spot_name": f"{name} {i}", "description": text, "lat": 18.5 + i / 100, "lon": 73.8}
+        for i, text in enumerate(descriptions)]}
+
+
+BASE = [
+    place("Lonavala", "waterfalls and valley views", "ancient caves"),
+    place("Alibaug", "beach and sea fort"),
+]
+
+
+@pytest.fixture
+def model():
+    return ContentRecommender().train_catalog(BASE)
+
+
+def write_catalog(tmp_path, places):
+    path = tmp_path / "database.json"
+    path.write_text(json.dumps(places))
+    return str(path)
+
+
+@pytest.fixture
+def use_catalog(monkeypatch):
+    def use(catalog):
+        monkeypatch.setattr(recommender_module, "get_catalog", lambda: catalog)
+        monkeypatch.setattr(recommender_module, "_model", (None, None))
+        return catalog
+    return use
+
+
+def test_train_catalog_streams_and_keeps_no_records(model):
+    streamed = ContentRecommender().train_catalog(iter(BASE))
+    assert streamed.records is None
+    assert (streamed.tfidf_matrix != model.tfidf_matrix).nnz == 0
+    assert streamed.ranges == {"lonavala": (0, 2), "alibaug": (2, 3)}
+    with pytest.raises(ValueError):
+        streamed.recommend("caves", {})
+    recs = streamed.recommend("caves", {}, rows=(0, 2), records=BASE[0]["attractions"])
+    assert recs[0]["spot_name"] == "Lonavala 1"
+
+
+def test_extend_appends_rows_with_frozen_vocabulary(model):
+    vocabulary = dict(model.tfidf.vocabulary_)
+    grown = model.extend([place("Matheran", "toy train and valley views", "zorbing")])
+
+    assert grown is not model
+    assert grown.tfidf_matrix.shape == (5, model.tfidf_matrix.shape[1])
+    assert grown.tfidf_matrix.dtype == np.float32
+    assert grown.tfidf.vocabulary_ == vocabulary
+    assert grown.ranges["matheran"] == (3, 5)
+    assert grown.appended_rows == 2
+    assert len(grown.content) == len(grown.lat) == len(grown.dining_prices) == 5
+    # Existing rows are shared unchanged; the original model is untouched
+    assert (grown.tfidf_matrix[:3] != model.tfidf_matrix).nnz == 0
+    assert "matheran" not in model.ranges and model.tfidf_matrix.shape[0] == 3
+
+
+def test_changed_destination_gets_a_new_block(model):
+    changed = place("Alibaug", "beach and sea fort", "lighthouse")
+    grown = model.extend([changed])
+    assert grown.ranges["alibaug"] == (3, 5)
+    assert grown.ranges["lonavala"] == model.ranges["lonavala"]
+    assert grown.fingerprints["alibaug"] == attractions_fingerprint(changed["attractions"])
+
+
+def test_extend_with_nothing_new_returns_the_same_model(model):
+    assert model.extend([{"place_name": "Empty", "attractions": []}]) is model
+
+
+def test_appended_rows_score_like_a_full_fit(model):
+    new = place("Matheran", "valley views from the toy train")
+    grown = model.extend([new])
+    recs = grown.recommend("valley views", {"budget": 5000, "days": 1, "people": 1},
+                           rows=grown.ranges["matheran"], records=new["attractions"])
+    assert [r["spot_name"] for r in recs] == ["Matheran 0"]
+
+
+def test_sync_appends_only_what_the_change_log_touched(tmp_path):
+    catalog = Catalog(write_catalog(tmp_path, BASE))
+    model = ContentRecommender().train_catalog(catalog.iter_places())
+    version = catalog.version()
+    assert _sync(model, catalog, version) == (version, model)
+
+    catalog.upsert(place("Matheran", "toy train"))
+    # Same attractions, other fields changed: nothing for the model to do
+    catalog.upsert({"place_name": "Lonavala", "description": "Hill station"})
+    version, synced = _sync(model, catalog, version)
+    assert synced.appended_rows == 1
+    assert set(synced.ranges) == {"lonavala", "alibaug", "matheran"}
+    assert _sync(synced, catalog, version) == (version, synced)
+
+    # A compaction starts a new base snapshot; nothing actually changed
+    catalog.compact()
+    version, after = _sync(synced, catalog, version)
+    assert after is synced
+
+
+def test_sync_on_the_mmap_backend_decodes_only_changes(tmp_path):
+    places = [place(f"Town {i}", "temple", "lake view") for i in range(40)]
+    catalog = MmapCatalog(write_catalog(tmp_path, places))
+    model = ContentRecommender().train_catalog(catalog.iter_places())
+    assert catalog.snapshot().view.decoded == 0
+
+    # Fresh worker with a trained model: compared via the stored fingerprints
+    version, synced = _sync(model, catalog, None)
+    assert synced is model
+    assert catalog.snapshot().view.decoded == 0
+
+    catalog.upsert(place("Town 3", "temple", "lake view", "new fort"))
+    catalog.upsert(place("Newtown", "market"))
+    version, synced = _sync(model, catalog, version)
+    assert synced.appended_rows == 4
+    assert catalog.snapshot().view.decoded <= 1  # upsert merged into Town 3
+
+    catalog.compact()
+    assert _sync(synced, catalog, version)[1] is synced
+    assert catalog.snapshot().view.decoded == 0
+
+
+def test_recommendation_on_mmap_decodes_one_destination(tmp_path, use_catalog):
+    from ml_engine.recommender import get_recommendations
+    places = [place(f"Town {i}", "temple", "lake view") for i in range(40)]
+    catalog = use_catalog(MmapCatalog(write_catalog(tmp_path, places)))
+    assert len(get_recommendations("Town 7", ["lake"], 2, 5000)) == 2
+    catalog.upsert(place("Newtown", "market"))
+    assert len(get_recommendations("Newtown", ["market"], 1, 5000)) == 1
+    assert catalog.snapshot().view.decoded == 1
+
+
+def test_background_refit_past_the_row_limit(tmp_path, use_catalog, monkeypatch):
+    catalog = use_catalog(Catalog(write_catalog(tmp_path, BASE)))
+    monkeypatch.setattr(recommender_module, "RECOMMENDER_MAX_APPENDED_ROWS", 1)
+
+    assert recommender_module.get_catalog_recommender().appended_rows == 0
+    catalog.upsert(place("Matheran", "toy train", "valley views"))
+    grown = recommender_module.get_catalog_recommender()
+    assert grown.appended_rows == 2  # served right away, refit starts behind it
+
+    for thread in threading.enumerate():
+        if thread.name == "recommender-refit":
+            thread.join(30)
+    refitted = recommender_module.get_catalog_recommender()
+    assert refitted.appended_rows == 0
+    assert refitted.ranges["matheran"] == (3, 5)
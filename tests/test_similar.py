@@ -0,0 +1,45 @@
+from conftest import make_place
+
+from ml_engine.recommender import ContentRecommender
+from ml_engine.similar import GEO_WEIGHT, build_similarity_index
+
+
+def fitted(places):
+    return build_similarity_index(ContentRecommender().train_catalog(places), places, k=3, workers=1)
+
+
+def test_neighbours_are_best_first_and_exclude_the_spot_itself():
+    index = fitted([make_place(i) for i in range(3)])
+
+    results = index.similar("101")
+    assert [r["spot_id"] for r in results] != []
+    assert "101" not in [r["spot_id"] for r in results]
+    scores = [r["score"] for r in results]
+    assert scores == sorted(scores, reverse=True)
+    assert index.similar("missing") is None
+
+
+def test_unlocated_attractions_get_a_flat_same_destination_bonus():
+    places = [make_place(i) for i in range(3)]
+    for place in places:
+        for spot in place["attractions"]:
+            spot["spot_name"] = f"spot{spot['spot_id']}"
+            spot["description"] = f"unique{spot['spot_id']} words{spot['spot_id']}"
+    index = fitted(places)
+
+    # No shared text and no coordinates: only the destination's own spots
+    # score, and all of them exactly GEO_WEIGHT
+    results = index.similar("101")
+    assert {r["place_name"] for r in results} == {"Town 0"}
+    assert {r["score"] for r in results} == {round(GEO_WEIGHT, 4)}
+
+
+def test_attractions_without_spot_id_are_skipped():
+    places = [make_place(i) for i in range(2)]
+    places[0]["attractions"][1]["spot_id"] = None
+    index = fitted(places)
+
+    assert len(index) == 6
+    assert "None" not in index.rows
+    for spot_id in index.rows:
+        assert all(r["spot_id"] is not None for r in index.similar(spot_id))
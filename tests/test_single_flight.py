@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+from services.single_flight import AsyncSingleFlight, SingleFlight
+
+
+def test_duplicates_share_one_producer():
+    flight = SingleFlight("test")
+    release = threading.Event()
+    calls = []
+
+    def producer():
+        calls.append(1)
+        yield "a"
+        release.wait(5)
+        yield "b"
+
+    leader = flight.stream("key", producer)
+    follower = flight.stream("key", producer)
+    release.set()
+    assert list(leader) == ["a", "b"]
+    # Joined mid-stream, but still replays from the first chunk
+    assert list(follower) == ["a", "b"]
+    assert len(calls) == 1
+    assert flight.stats() == {"in_flight": 0, "started": 1, "collapsed": 1}
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+    assert list(flight.stream("a", lambda: iter(["1"]))) == ["1"]
+    assert list(flight.stream("b", lambda: iter(["2"]))) == ["2"]
+    assert flight.stats()["started"] == 2
+
+
+def test_finished_flight_is_not_replayed():
+    flight = SingleFlight("test")
+    assert list(flight.stream("key", lambda: iter(["old"]))) == ["old"]
+    assert list(flight.stream("key", lambda: iter(["new"]))) == ["new"]
+    assert flight.stats()["collapsed"] == 0
+
+
+def test_producer_error_ends_every_stream():
+    flight = SingleFlight("test")
+    release = threading.Event()
+
+    def producer():
+        yield "a"
+        release.wait(5)
+        raise RuntimeError("provider down")
+
+    leader = flight.stream("key", producer)
+    follower = flight.stream("key", producer)
+    release.set()
+    assert list(leader) == ["a"]
+    assert list(follower) == ["a"]
+
+
+def test_async_duplicates_share_one_producer():
+    async def scenario():
+        flight = AsyncSingleFlight("test")
+        release = asyncio.Event()
+        calls = []
+
+        async def producer():
+            calls.append(1)
+            yield "a"
+            await release.wait()
+            yield "b"
+
+        async def collect(stream):
+            return [chunk async for chunk in stream]
+
+        streams = [flight.stream("key", producer) for _ in range(3)]
+        tasks = [asyncio.create_task(collect(s)) for s in streams]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*tasks)
+        return results, calls, flight.stats()
+
+    results, calls, stats = asyncio.run(scenario())
+    assert results == [["a", "b"]] * 3
+    assert len(calls) == 1
+    assert stats == {"in_flight": 0, "started": 1, "collapsed": 2}
@@ -0,0 +1,100 @@
+import json
+from types import SimpleNamespace
+
+import groq
+from conftest import make_place
+
+import app as flask_app
+from services.llm_service import generate_fallback_itinerary, stream_llm
+
+TRIP = {"destination": "Town 0", "source": "Pune", "budget": 15000, "people": 2, "days": 2,
+        "transport": "bus", "preferences": ["nature"]}
+
+
+def chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def fake_groq(monkeypatch, stream):
+    class Completions:
+        def create(self, **kwargs):
+            assert kwargs["stream"] is True
+            return stream()
+
+    class Client:
+        def __init__(self, api_key):
+            self.chat = SimpleNamespace(completions=Completions())
+
+    monkeypatch.setenv("GROQ_API_KEY", "test")
+    monkeypatch.setattr(groq, "Groq", Client)
+
+
+def test_stream_llm_yields_deltas_in_order(monkeypatch):
+    fake_groq(monkeypatch, lambda: iter([chunk('{"a"'), SimpleNamespace(choices=[]), chunk(None),
+                                         chunk(": 1"), chunk("}")]))
+
+    assert list(stream_llm("prompt")) == ['{"a"', ": 1", "}"]
+
+
+def test_stream_error_before_any_output_falls_back(monkeypatch):
+    def failing():
+        raise RuntimeError("connection reset")
+        yield
+
+    fake_groq(monkeypatch, failing)
+
+    assert list(stream_llm("prompt")) == [generate_fallback_itinerary("prompt")]
+
+
+def test_stream_error_after_partial_output_stops_without_fallback(monkeypatch):
+    def failing():
+        yield chunk('{"days": [')
+        raise RuntimeError("connection reset")
+
+    fake_groq(monkeypatch, failing)
+
+    assert list(stream_llm("prompt")) == ['{"days": [']
+
+
+def plan_trip_chunks(trip):
+    response = flask_app.app.test_client().post("/api/plan-trip", json=trip, buffered=False)
+    assert response.status_code == 200
+    assert response.headers["X-Accel-Buffering"] == "no"
+    chunks = [part.decode("utf-8") for part in response.response]
+    response.close()
+    return chunks
+
+
+def test_plan_trip_forwards_chunks_in_order_then_serves_the_cache(scratch_catalog, monkeypatch):
+    scratch_catalog([make_place(0)])
+    monkeypatch.setattr(flask_app, "query_rag", lambda query: "")
+    calls = []
+
+    def llm(prompt, stream=False):
+        calls.append(stream)
+        return iter(['{"itinerary": ', '[{"day": 1}', "]}"])
+
+    monkeypatch.setattr(flask_app, "call_llm", llm)
+
+    assert plan_trip_chunks(TRIP) == ['{"itinerary": ', '[{"day": 1}', "]}"]
+    assert calls == [True]
+    # Complete JSON was cached and is served whole without calling the LLM
+    assert plan_trip_chunks(TRIP) == ['{"itinerary": [{"day": 1}]}']
+    assert calls == [True]
+
+
+def test_plan_trip_reports_a_mid_stream_failure_as_a_json_error(scratch_catalog, monkeypatch):
+    scratch_catalog([make_place(0)])
+    monkeypatch.setattr(flask_app, "query_rag", lambda query: "")
+
+    def llm(prompt, stream=False):
+        yield '{"itinerary": '
+        raise RuntimeError("provider went away")
+
+    monkeypatch.setattr(flask_app, "call_llm", llm)
+
+    chunks = plan_trip_chunks(TRIP)
+    assert chunks[0] == '{"itinerary": '
+    assert json.loads(chunks[-1]) == {"error": "provider went away"}
+    # A broken itinerary is never cached
+    assert plan_trip_chunks(TRIP)[0] == '{"itinerary": '
@@ -0,0 +1,70 @@
+import json
+import random
+
+import pytest
+
+import services.travel_index as travel_index
+from services.binary_catalog import MmapCatalog
+from services.travel_index import find_travel_options, pareto_front
+
+
+def option(cost, hours, mode="bus"):
+    return {"mode": mode, "cost": cost, "duration_hours": hours}
+
+
+def test_pareto_front_drops_dominated_options():
+    options = [option(100, 5, "bus"), option(200, 3, "train"), option(250, 4, "cab"),
+               option(300, 1, "flight"), option(100, 6, "slow bus")]
+    assert [o["mode"] for o in pareto_front(options)] == ["bus", "train", "flight"]
+
+
+def test_pareto_front_matches_brute_force():
+    rng = random.Random(7)
+    for _ in range(200):
+        options = [option(rng.randint(1, 20), rng.randint(1, 20)) for _ in range(rng.randint(0, 12))]
+        dominated = lambda o: any(p["cost"] <= o["cost"] and p["duration_hours"] <= o["duration_hours"]
+                                  and (p["cost"], p["duration_hours"]) != (o["cost"], o["duration_hours"])
+                                  for p in options)
+        expected = {(o["cost"], o["duration_hours"]) for o in options if not dominated(o)}
+        front = pareto_front(options)
+        assert {(o["cost"], o["duration_hours"]) for o in front} == expected
+        assert [o["cost"] for o in front] == sorted(o["cost"] for o in front)
+
+
+def destination(i):
+    return {"place_id": str(i), "place_name": f"Town {i}", "attractions": [], "travel_options": [
+        {"source_city": "Pune", "travel_mode": "private_car", "approx_cost": 3000, "approx_duration_hours": 3},
+        {"source_city": "Pune", "travel_mode": "bus", "approx_cost": 400, "approx_duration_hours": 5},
+        {"source_city": "Pune", "travel_mode": "train", "approx_cost": 500, "approx_duration_hours": 6},
+        {"source_city": "Mumbai", "travel_mode": "bus", "approx_cost": "n/a", "approx_duration_hours": 4},
+    ]}
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    path = tmp_path / "database.json"
+    path.write_text(json.dumps([destination(i) for i in range(50)]))
+    catalog = MmapCatalog(str(path))
+    monkeypatch.setattr(travel_index, "get_catalog", lambda: catalog)
+    monkeypatch.setattr(travel_index, "_index", None)
+    return catalog
+
+
+def test_lookup_decodes_only_the_destination(catalog):
+    route = find_travel_options(" pune", "town 7")
+    assert [o["mode"] for o in route["options"]] == ["bus", "train", "private car"]
+    assert [o["mode"] for o in route["pareto"]] == ["bus", "private car"]
+    assert find_travel_options("Mumbai", "Town 7") is None  # unparseable cost
+    assert find_travel_options("Nagpur", "Town 7") is None
+    assert catalog.snapshot().view.decoded == 1
+
+
+def test_misspelled_destination_and_upsert(catalog):
+    assert find_travel_options("Pune", "Twn 12") is not None
+    changed = destination(12)
+    changed["travel_options"] = [{"source_city": "Nagpur", "travel_mode": "flight",
+                                  "approx_cost": 6000, "approx_duration_hours": 1.5}]
+    catalog.upsert(changed)
+    assert find_travel_options("Pune", "Town 12") is None
+    assert find_travel_options("Nagpur", "Town 12")["pareto"][0]["mode"] == "flight"
+    assert catalog.snapshot().view.decoded <= 2
@@ -0,0 +1,82 @@
+from conftest import make_place
+
+import app as flask_app
+import services.warmup as warmup
+
+TRIP = {"destination": "Town 1", "source": "Pune", "budget": 15000, "people": 2, "days": 2,
+        "transport": "bus", "preferences": ["nature"]}
+
+
+def binary_view(catalog):
+    return catalog.snapshot().view
+
+
+def test_warmup_and_plan_trip_decode_only_the_destinations_they_touch(scratch_catalog, monkeypatch):
+    catalog = scratch_catalog([make_place(i) for i in range(30)], backend="mmap")
+    view = binary_view(catalog)
+    monkeypatch.setattr(flask_app, "query_rag", lambda query: "")
+
+    assert warmup._warm_catalog() == "30 destinations"
+    assert warmup._warm_models().endswith("for Town 0")
+    assert view.decoded <= 1
+
+    response = flask_app.app.test_client().post("/api/plan-trip", json=TRIP)
+    assert response.status_code == 200
+    assert response.get_data(as_text=True)
+    # The sample destination and the planned one
+    assert view.decoded <= 2
+
+
+def test_ready_reports_503_until_warmup_has_run(scratch_catalog, monkeypatch):
+    scratch_catalog([make_place(i) for i in range(3)])
+    monkeypatch.setattr(warmup, "_ready", warmup.threading.Event())
+    monkeypatch.setattr(warmup, "_steps", {})
+    monkeypatch.setattr(warmup, "_warm_rag", lambda: "skipped")
+    client = flask_app.app.test_client()
+
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.get_json()["status"] == "warming"
+
+    warmup.run_warmup()
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["status"] == "ready"
+    assert body["steps"]["catalog"] == {"ok": True, "seconds": body["steps"]["catalog"]["seconds"],
+                                        "detail": "3 destinations"}
+    assert set(body["steps"]) == {"catalog", "models", "llm", "rag"}
+
+
+def test_failed_step_is_reported_without_blocking_readiness(monkeypatch):
+    monkeypatch.setattr(warmup, "_ready", warmup.threading.Event())
+    monkeypatch.setattr(warmup, "_steps", {})
+    monkeypatch.setattr(warmup, "_warm_catalog", lambda: "0 destinations")
+    monkeypatch.setattr(warmup, "_warm_models", lambda: "skipped")
+    monkeypatch.setattr(warmup, "_warm_llm", lambda: "skipped")
+
+    def broken_rag():
+        raise ConnectionError("embedding provider unreachable")
+
+    monkeypatch.setattr(warmup, "_warm_rag", broken_rag)
+
+    warmup.run_warmup()
+
+    status = warmup.warmup_status()
+    assert status["status"] == "ready"
+    assert status["steps"]["rag"]["ok"] is False
+    assert status["steps"]["rag"]["error"] == "embedding provider unreachable"
+    assert all(status["steps"][name]["ok"] for name in ("catalog", "models", "llm"))
+
+
+def test_disabled_warmup_is_ready_at_once(monkeypatch):
+    monkeypatch.setenv("WARMUP_ENABLED", "false")
+    monkeypatch.setattr(warmup, "_started", False)
+    monkeypatch.setattr(warmup, "_ready", warmup.threading.Event())
+    monkeypatch.setattr(warmup, "_steps", {})
+
+    warmup.start_warmup()
+
+    assert warmup.is_ready()
+    assert warmup.warmup_status() == {"status": "ready", "steps": {}}